@@ -0,0 +1,105 @@
+import asyncio
+import json
+import random
+import re
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+from google.genai import errors
+from src.LLMClient import AdmissionController, LLMClient, lane_circuit_breakers
+
+_BATCH_ITEM_RE = re.compile(r"^Item (\d+):", re.MULTILINE)
+
+
+@dataclass
+class FakeLLMProfile:
+    """Latency and failure behaviour of the stub Gemini API."""
+
+    # Log-normal latency: median in milliseconds and the sigma of its log
+    median_latency_ms: float = 400.0
+    latency_sigma: float = 0.5
+    # Share of calls failing with a retryable 503 (exercises retries and the breaker)
+    error_rate: float = 0.0
+    # Share of answers the stub grades "Correct"
+    correct_rate: float = 0.7
+    # Streamed calls: share of the latency before the first chunk (the verdict)
+    first_chunk_share: float = 0.3
+    seed: int | None = None
+
+
+@dataclass
+class _FakeResponse:
+    text: str
+    usage_metadata: Any = None
+
+
+class _FakeModels:
+    def __init__(self, profile: FakeLLMProfile) -> None:
+        self.profile = profile
+        self.rng = random.Random(profile.seed)
+        self.calls = 0
+
+    def _latency(self) -> float:
+        return self.profile.median_latency_ms / 1000 * self.rng.lognormvariate(
+            0, self.profile.latency_sigma
+        )
+
+    def _overloaded(self) -> errors.ServerError:
+        return errors.ServerError(
+            503, {"error": {"code": 503, "message": "fake overload", "status": "UNAVAILABLE"}}
+        )
+
+    async def generate_content(self, model: str, contents: str, config: Any = None) -> _FakeResponse:
+        self.calls += 1
+        await asyncio.sleep(self._latency())
+        if self.rng.random() < self.profile.error_rate:
+            raise self._overloaded()
+        items = _BATCH_ITEM_RE.findall(contents)
+        if items:
+            return _FakeResponse(
+                json.dumps(
+                    [{"index": int(index), "verdict": self._verdict()} for index in items]
+                )
+            )
+        return _FakeResponse(self._verdict())
+
+    async def generate_content_stream(
+        self, model: str, contents: str, config: Any = None
+    ) -> AsyncIterator[_FakeResponse]:
+        """The verdict arrives in the first chunk; the stream ends after the full latency."""
+        self.calls += 1
+        latency = self._latency()
+        failed = self.rng.random() < self.profile.error_rate
+        verdict = self._verdict()
+
+        async def chunks() -> AsyncIterator[_FakeResponse]:
+            await asyncio.sleep(latency * self.profile.first_chunk_share)
+            if failed:
+                raise self._overloaded()
+            yield _FakeResponse(verdict)
+            await asyncio.sleep(latency * (1 - self.profile.first_chunk_share))
+            yield _FakeResponse("")
+
+        return chunks()
+
+    def _verdict(self) -> str:
+        return "Correct" if self.rng.random() < self.profile.correct_rate else "Incorrect"
+
+
+class _FakeGenAIClient:
+    """Just enough of `genai.Client` for `LLMClient`: `client.aio.models.generate_content`."""
+
+    def __init__(self, profile: FakeLLMProfile) -> None:
+        self.models = _FakeModels(profile)
+        self.aio = self
+
+
+class FakeLLMClient(LLMClient):
+    """
+    An LLMClient whose Gemini API is replaced by a local stub, so admission
+    control, retries, hedging and the circuit breaker all run for real.
+    """
+
+    def __init__(self, profile: FakeLLMProfile) -> None:
+        super().__init__(admission=AdmissionController(), breakers=lane_circuit_breakers())
+        self.fake = _FakeGenAIClient(profile)
+        self.client = self.fake  # type: ignore[assignment]
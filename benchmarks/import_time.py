@@ -0,0 +1,121 @@
+"""
+Import-time budget for the app.
+
+Imports `main` in fresh interpreters with `-X importtime`, reports the median
+total and the slowest direct imports, and exits non-zero when the median is
+over the budget or a module that must stay lazy (the Gemini SDK) was imported.
+
+    python -m benchmarks.import_time --budget-ms 600
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.results import compare_results, write_results
+
+# Imported on first use (see `LLMClient.client`); importing them with the app is a regression
+LAZY_MODULES = ("google.genai",)
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, depth, self µs, cumulative µs) for each `-X importtime` line."""
+    entries: List[Tuple[str, int, int, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def measure_once(module: str, log_dir: str) -> List[Tuple[str, int, int, int]]:
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": os.environ.get("GEMINI_API_KEY", "import-time-benchmark"),
+        # Keep the benchmark's log files out of the working tree
+        "LOG_FILE": os.path.join(log_dir, "app.log"),
+        "GRADING_LOG_FILE": os.path.join(log_dir, "grading.log"),
+    }
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=600.0)
+    parser.add_argument("--top", type=int, default=10, help="slowest direct imports to list")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/)")
+    parser.add_argument("--baseline", help="previous JSON results to compare against")
+    args = parser.parse_args()
+
+    totals: List[float] = []
+    by_import: Dict[str, List[float]] = {}
+    imported: set[str] = set()
+    with tempfile.TemporaryDirectory() as log_dir:
+        for _ in range(args.repeat):
+            entries = measure_once(args.module, log_dir)
+            imported.update(name for name, _, _, _ in entries)
+            # Children are listed before their parent; keep those of the measured module
+            children: List[Tuple[str, int]] = []
+            for name, depth, _, cumulative_us in entries:
+                if depth == 1:
+                    children.append((name, cumulative_us))
+                elif depth == 0:
+                    if name == args.module:
+                        totals.append(cumulative_us / 1000)
+                        for child, child_us in children:
+                            by_import.setdefault(child, []).append(child_us / 1000)
+                    children = []
+
+    total_ms = statistics.median(totals)
+    slowest = sorted(
+        ((name, statistics.median(samples)) for name, samples in by_import.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[: args.top]
+    lazy_imported = [name for name in LAZY_MODULES if name in imported]
+
+    print(f"import {args.module}: median {total_ms:.1f} ms over {args.repeat} runs (budget {args.budget_ms:g} ms)")
+    for name, ms in slowest:
+        print(f"  {name:40} {ms:8.1f} ms")
+    for name in lazy_imported:
+        print(f"  {name} was imported at startup but should be imported on first use")
+
+    results: Dict[str, Any] = {
+        f"import[{args.module}]": {
+            "totalMs": round(total_ms, 3),
+            "budgetMs": args.budget_ms,
+            "slowestImportsMs": {name: round(ms, 3) for name, ms in slowest},
+            "lazyModulesImported": lazy_imported,
+        }
+    }
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"import-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    write_results(output, "import", vars(args), results)
+    print(f"\nResults written to {output}")
+    if args.baseline:
+        compare_results(args.baseline, results, ["totalMs"])
+
+    if total_ms > args.budget_ms or lazy_imported:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,250 @@
+"""
+Offline load test for the API.
+
+Boots `main:app` in-process behind an httpx ASGI transport, with Gemini replaced
+by a stub (`FakeLLMClient`) through the `get_gemini_client` dependency, and
+drives each endpoint with concurrent clients for a fixed duration. Reports
+latency percentiles, throughput and event loop lag per endpoint, and writes
+them as JSON for run-to-run comparison.
+
+    python -m benchmarks.load_test --duration 10 --concurrency 32
+    python -m benchmarks.load_test --baseline benchmarks/results/load-<previous>.json
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+
+import httpx
+
+from benchmarks.fake_llm import FakeLLMClient, FakeLLMProfile
+from benchmarks.results import compare_results, summarize_ms, write_results
+
+# method, URL, JSON body
+Request = Tuple[str, str, Dict[str, Any] | None]
+
+
+@dataclass
+class Scenario:
+    name: str
+    make_request: Callable[[random.Random], Request]
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task that sleeps for a fixed interval."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: asyncio.Task[None] | None = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(time.perf_counter() - started - self.interval, 0.0))
+
+    def start(self) -> None:
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> List[float]:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        return self.samples
+
+
+def build_scenarios(questions_service: Any, test_type: str) -> List[Scenario]:
+    from src.QuestionsService import TestType
+
+    bank = questions_service.get_bank(TestType(test_type))
+    question_ids = [q.id for q in bank.questions]
+    dynamic_ids = [q.id for q in bank.dynamic_questions]
+    # Per question: an accepted answer (local tier), a hedged variant and a wrong
+    # answer (both usually need the LLM, then hit the verdict cache)
+    answers = {
+        q.id: [q.answers[0].split("\n")[0], f"I think {q.answers[0][:40]}", "I am not sure"]
+        for q in bank.questions
+    }
+
+    def submit(rng: random.Random) -> Request:
+        question_id = rng.choice(question_ids)
+        return (
+            "POST",
+            f"/api/submit-answer/{question_id}?testType={test_type}",
+            {"answer": rng.choice(answers[question_id])},
+        )
+
+    return [
+        Scenario(
+            "questions",
+            lambda rng: ("GET", f"/api/questions?n=20&testType={test_type}", None),
+        ),
+        Scenario(
+            "question",
+            lambda rng: (
+                "GET",
+                f"/api/questions/{rng.choice(question_ids)}?testType={test_type}",
+                None,
+            ),
+        ),
+        Scenario(
+            "dynamic-question",
+            lambda rng: (
+                "GET",
+                f"/api/questions/{rng.choice(dynamic_ids)}?testType={test_type}",
+                None,
+            ),
+        ),
+        Scenario("submit-answer", submit),
+        Scenario(
+            "dynamic-questions",
+            lambda rng: ("GET", f"/api/dynamic-questions?testType={test_type}", None),
+        ),
+    ]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    duration: float,
+    concurrency: int,
+    seed: int,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            method, url, body = scenario.make_request(rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+                status = str(response.status_code)
+            except Exception:
+                status = "exception"
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not status.startswith("2") and status != "304":
+                errors += 1
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(i) for i in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    lag = await monitor.stop()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latencyMs": summarize_ms(latencies),
+        "loopLagMs": summarize_ms(lag),
+    }
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    if not args.rate_limit:
+        # Every simulated user shares one client address, so per-client limits would cap the run
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+    import main
+    from src.Dependencies import get_gemini_client, get_questions_service, verdict_cache
+
+    logging.getLogger().setLevel(logging.WARNING)
+    profile = FakeLLMProfile(
+        median_latency_ms=args.llm_median_ms,
+        latency_sigma=args.llm_sigma,
+        error_rate=args.llm_error_rate,
+        first_chunk_share=args.llm_first_chunk_share,
+        seed=args.seed,
+    )
+    fake_llm = FakeLLMClient(profile)
+    main.app.dependency_overrides[get_gemini_client] = lambda: fake_llm
+    if args.no_verdict_cache:
+        verdict_cache.max_entries = 0
+
+    # The ASGI transport does not run the app's lifespan, which loads the banks
+    get_questions_service().load_banks()
+    scenarios = build_scenarios(get_questions_service(), args.test_type)
+    if args.scenarios:
+        wanted = set(args.scenarios.split(","))
+        scenarios = [s for s in scenarios if s.name in wanted]
+
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for scenario in scenarios:
+            result = await run_scenario(
+                client, scenario, args.duration, args.concurrency, args.seed
+            )
+            if scenario.name == "submit-answer":
+                result["llmCalls"] = fake_llm.fake.models.calls
+                result["llm"] = fake_llm.get_stats()
+            results[scenario.name] = result
+            latency = result["latencyMs"]
+            print(
+                f"{scenario.name:18} {result['requests']:7d} req {result['rps']:9.1f} rps  "
+                f"p50 {latency['p50']:8.2f}  p90 {latency['p90']:8.2f}  p99 {latency['p99']:8.2f} ms  "
+                f"loop lag p99 {result['loopLagMs']['p99']:6.2f} ms  errors {result['errors']}"
+            )
+    main.app.dependency_overrides.clear()
+    return {"profile": asdict(profile), "results": results}
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--test-type", default="2008", choices=["2008", "2025"])
+    parser.add_argument("--scenarios", help="comma-separated subset of scenario names")
+    parser.add_argument("--llm-median-ms", type=float, default=400.0)
+    parser.add_argument("--llm-sigma", type=float, default=0.5)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--llm-first-chunk-share",
+        type=float,
+        default=0.3,
+        help="share of a streamed call's latency before its first chunk",
+    )
+    parser.add_argument("--no-verdict-cache", action="store_true")
+    parser.add_argument(
+        "--rate-limit", action="store_true", help="keep the per-client rate limits (RATE_LIMIT_*) on"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/)")
+    parser.add_argument("--baseline", help="previous JSON results to compare against")
+    args = parser.parse_args()
+
+    run = asyncio.run(main_async(args))
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    config = {**vars(args), "llmProfile": run["profile"]}
+    write_results(output, "load", config, run["results"])
+    print(f"\nResults written to {output}")
+    if args.baseline:
+        compare_results(
+            args.baseline, run["results"], ["rps", "latencyMs.p50", "latencyMs.p99", "loopLagMs.p99"]
+        )
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,161 @@
+"""
+Microbenchmarks for the hot offline paths: loading a question bank from
+JSON, building a bank, grading locally, drawing an exam, turning a
+source page into LLM context, and the rate limiter's per-request overhead.
+Results are written as JSON like the load test.
+
+    python -m benchmarks.microbenchmarks --repeat 50
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+
+from bs4 import BeautifulSoup
+
+from benchmarks.results import compare_results, summarize_ms, write_results
+from src.AnswersToDynamicQuestions import extract_page_context
+from src.LLMClient import LLMClient
+from src.LocalGrader import grade_locally
+from src.QuestionsService import TEST_CONFIGS, QuestionBank, QuestionsService, TestType
+from src.RateLimiter import RateLimitMiddleware, TokenBuckets
+from src.SourcePageParsers import US_STATES
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    func()  # warm up
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return {"repeat": repeat, "latencyMs": summarize_ms(samples)}
+
+
+def measure_rate_limit_overhead(repeat: int, clients: int = 1000) -> Dict[str, Any]:
+    """Per-request cost of the rate limit middleware on a read route, against a no-op app."""
+
+    async def noop_app(scope: Any, receive: Any, send: Any) -> None:
+        pass
+
+    # Limits high enough that every request passes, spread over many clients
+    limited = RateLimitMiddleware(
+        noop_app,
+        grading=TokenBuckets(1e9, 10**9),
+        read=TokenBuckets(1e9, 10**9),
+        trusted_proxies="10.0.0.0/8",
+    )
+    scopes = [
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/questions/1",
+            "client": ("10.0.0.1", 1234),
+            "headers": [(b"x-forwarded-for", f"198.51.{i // 256}.{i % 256}".encode())],
+        }
+        for i in range(clients)
+    ]
+
+    async def run(app: Any) -> List[float]:
+        samples: List[float] = []
+        for i in range(repeat):
+            scope = scopes[i % clients]
+            started = time.perf_counter()
+            await app(scope, None, None)
+            samples.append(time.perf_counter() - started)
+        return samples
+
+    baseline = asyncio.run(run(noop_app))
+    with_limit = asyncio.run(run(limited))
+    return {
+        "repeat": repeat,
+        "latencyMs": summarize_ms(with_limit),
+        "noopLatencyMs": summarize_ms(baseline),
+    }
+
+
+def synthetic_source_page(rows_per_state: int = 9) -> str:
+    """A page shaped like the per-state source pages: boilerplate plus a large table."""
+    rows = "".join(
+        f"<tr><td>{state}</td><td>{district}</td><td>Person {district} of {state}</td>"
+        f"<td>Party</td><td>Office {district}</td></tr>"
+        for state in US_STATES
+        for district in range(1, rows_per_state + 1)
+    )
+    boilerplate = "<script>var x = 1;</script><style>.a{}</style>" * 50
+    return (
+        f"<html><head>{boilerplate}</head><body><nav>{'<a>link</a>' * 200}</nav>"
+        f"<table><tr><th>State</th><th>District</th><th>Name</th><th>Party</th>"
+        f"<th>Office</th></tr>{rows}</table></body></html>"
+    )
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/)")
+    parser.add_argument("--baseline", help="previous JSON results to compare against")
+    args = parser.parse_args()
+
+    service = QuestionsService(LLMClient())
+    service.load_banks()
+    results: Dict[str, Any] = {}
+
+    for test_type, config in TEST_CONFIGS.items():
+        results[f"load_questions_json[{test_type.value}]"] = measure(
+            lambda: service._load_questions(test_type, config.questions_file), args.repeat
+        )
+
+    bank = service.get_bank(TestType.TEST_2025)
+    results["build_question_bank[2025]"] = measure(
+        lambda: QuestionBank.build(TestType.TEST_2025, bank.questions), args.repeat
+    )
+
+    rng = random.Random(1)
+    results["draw_exam[2025,n=20,stratified]"] = measure(
+        lambda: service.draw_exam(
+            TestType.TEST_2025, 20, seed=rng.randrange(1 << 30), stratified=True
+        ),
+        args.repeat * 10,
+    )
+
+    representatives = next(
+        q for q in bank.dynamic_questions if len(q.answers[0]) > 5000
+    )
+    prepared = bank.prepared[representatives.id]
+    results["grade_locally[representatives]"] = measure(
+        lambda: grade_locally(prepared, "Nancy Pelosy"), args.repeat * 10
+    )
+
+    html = synthetic_source_page()
+    results["extract_page_context[synthetic]"] = {
+        **measure(
+            lambda: extract_page_context(BeautifulSoup(html, "html.parser")), args.repeat
+        ),
+        "htmlBytes": len(html),
+    }
+
+    results["rate_limit_middleware[read,xff]"] = measure_rate_limit_overhead(args.repeat * 100)
+
+    for name, result in results.items():
+        latency = result["latencyMs"]
+        print(f"{name:40} p50 {latency['p50']:9.3f}  p99 {latency['p99']:9.3f} ms")
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"micro-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    write_results(output, "micro", vars(args), results)
+    print(f"\nResults written to {output}")
+    if args.baseline:
+        compare_results(args.baseline, results, ["latencyMs.p50", "latencyMs.p99"])
+
+
+if __name__ == "__main__":
+    main_cli()
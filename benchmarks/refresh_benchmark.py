@@ -0,0 +1,256 @@
+"""
+Offline benchmark of the dynamic question refresh.
+
+Runs `QuestionsService.update_dynamic_questions` end to end against recorded
+source pages and LLM replies (see `benchmarks.refresh_fixtures`), on a scratch
+copy of db/ whose dynamic answers are marked stale so every fetcher runs.
+Reports the end-to-end time, the time spent per stage (page download, parsing,
+LLM calls) and event loop lag, and checks the refreshed answers against the
+ones produced while recording.
+
+Record once, with network access and a real GEMINI_API_KEY:
+
+    python -m benchmarks.refresh_benchmark --record benchmarks/fixtures/refresh
+
+Then replay offline, as often as needed:
+
+    python -m benchmarks.refresh_benchmark --fixtures benchmarks/fixtures/refresh \\
+        --http-latency-ms 150 --llm-latency-ms 1200 --repeat 3
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+
+import httpx
+
+from benchmarks.load_test import LoopLagMonitor
+from benchmarks.refresh_fixtures import (
+    FixtureStore,
+    GenAIStub,
+    Latency,
+    RecordingModels,
+    RecordingTransport,
+    ReplayModels,
+    ReplayTransport,
+)
+from benchmarks.results import compare_results, summarize_ms, write_results
+
+# Answers of the dynamic questions after the recorded refresh, for the replay check
+EXPECTED_ANSWERS_FILE = "answers.json"
+
+
+def prepare_scratch_db(source_dir: str, scratch: str) -> None:
+    """Copy the question banks, forgetting when and from what each dynamic answer was made."""
+    os.makedirs(os.path.join(scratch, "db"))
+    for name in os.listdir(source_dir):
+        if not name.endswith(".json") or name == "http_validators.json":
+            continue
+        with open(os.path.join(source_dir, name)) as file:
+            data = json.load(file)
+        for question in data.get("questions", []):
+            question.pop("lastTimeUpdated", None)
+            question.pop("sourceFingerprint", None)
+        with open(os.path.join(scratch, "db", name), "w") as file:
+            json.dump(data, file, indent=2, ensure_ascii=False)
+
+
+def stage_totals() -> Dict[str, Tuple[float, int]]:
+    """Cumulative (seconds, observations) per refresh stage, from the app's metrics."""
+    from src.Metrics import (
+        DYNAMIC_PAGE_FETCH_DURATION,
+        DYNAMIC_PAGE_PARSE_DURATION,
+        LLM_CALL_DURATION,
+    )
+
+    totals: Dict[str, Tuple[float, int]] = {}
+
+    def add(stage: str, seconds: float, count: int) -> None:
+        previous = totals.get(stage, (0.0, 0))
+        totals[stage] = (previous[0] + seconds, previous[1] + count)
+
+    for _, child in DYNAMIC_PAGE_FETCH_DURATION.children().items():
+        add("fetch", child.sum, child.count)
+    for (kind,), child in DYNAMIC_PAGE_PARSE_DURATION.children().items():
+        add(f"parse[{kind}]", child.sum, child.count)
+    for (caller, _), child in LLM_CALL_DURATION.children().items():
+        if caller != "grading":
+            add("llm", child.sum, child.count)
+    return totals
+
+
+def dynamic_answers(questions_service: Any) -> Dict[str, Dict[str, List[str]]]:
+    from src.QuestionsService import TestType
+
+    return {
+        test_type.value: {
+            str(q.id): list(q.answers) for q in questions_service.get_dynamic_questions(test_type)
+        }
+        for test_type in TestType
+    }
+
+
+async def run_refresh(
+    args: argparse.Namespace, fixtures: FixtureStore, seed: int
+) -> Dict[str, Any]:
+    from src.AnswersToDynamicQuestions import HEADERS, PageFetcher, ValidatorStore
+    from src.LLMClient import AdmissionController, LLMClient, lane_circuit_breakers
+    from src.QuestionsService import QuestionsService
+
+    llm_client = LLMClient(admission=AdmissionController(), breakers=lane_circuit_breakers())
+    transport: httpx.AsyncBaseTransport
+    if args.record:
+        transport = RecordingTransport(fixtures)
+        llm_client.client = GenAIStub(RecordingModels(llm_client.client.aio.models, fixtures))  # type: ignore[assignment]
+    else:
+        transport = ReplayTransport(fixtures, Latency(args.http_latency_ms, args.sigma), seed)
+        models = ReplayModels(fixtures, Latency(args.llm_latency_ms, args.sigma), seed)
+        llm_client.client = GenAIStub(models)  # type: ignore[assignment]
+
+    http_client = httpx.AsyncClient(
+        transport=transport, headers=HEADERS, follow_redirects=True, timeout=30.0
+    )
+    questions_service = QuestionsService(
+        llm_client,
+        # Start without validators, so no request is conditional on an earlier run
+        page_fetcher_factory=lambda: PageFetcher(
+            client=http_client, validator_store=ValidatorStore("./db/http_validators.json")
+        ),
+    )
+    questions_service.load_banks()
+
+    before = stage_totals()
+    lag = LoopLagMonitor()
+    lag.start()
+    started = time.perf_counter()
+    try:
+        report = await questions_service.update_dynamic_questions(0)
+    finally:
+        elapsed = time.perf_counter() - started
+        lag_samples = await lag.stop()
+        await http_client.aclose()
+    after = stage_totals()
+
+    stages: Dict[str, Dict[str, float]] = {}
+    for stage, (seconds, count) in after.items():
+        seconds -= before.get(stage, (0.0, 0))[0]
+        count -= before.get(stage, (0.0, 0))[1]
+        if count:
+            stages[stage] = {
+                "count": count,
+                "totalMs": round(seconds * 1000, 3),
+                "meanMs": round(seconds / count * 1000, 3),
+            }
+
+    result: Dict[str, Any] = {
+        "elapsed": elapsed,
+        "stages": stages,
+        "loopLag": lag_samples,
+        "report": {
+            "extracted": report.extracted,
+            "skippedUnchanged": report.skipped_unchanged,
+            "notModified": report.not_modified,
+            "failed": report.failed,
+        },
+        "answers": dynamic_answers(questions_service),
+    }
+    if isinstance(transport, ReplayTransport):
+        result["fixtureMisses"] = {"http": transport.misses, "llm": models.misses}
+    return result
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    logging.getLogger().setLevel(logging.WARNING)
+    fixtures = FixtureStore(os.path.abspath(args.record or args.fixtures))
+    expected = None if args.record else fixtures.load_json(EXPECTED_ANSWERS_FILE)
+    source_dir = os.path.abspath("db")
+    workdir = os.getcwd()
+
+    runs: List[Dict[str, Any]] = []
+    for repeat in range(1 if args.record else args.repeat):
+        with tempfile.TemporaryDirectory() as scratch:
+            prepare_scratch_db(source_dir, scratch)
+            # The banks and the validators all live under ./db
+            os.chdir(scratch)
+            try:
+                run = await run_refresh(args, fixtures, args.seed + repeat)
+            finally:
+                os.chdir(workdir)
+        if expected is not None:
+            run["mismatchedAnswers"] = sorted(
+                f"{test_type}#{question_id}"
+                for test_type, answers in expected.items()
+                for question_id, expected_answers in answers.items()
+                if run["answers"].get(test_type, {}).get(question_id) != expected_answers
+            )
+        runs.append(run)
+        print(
+            f"run {repeat + 1}: {run['elapsed'] * 1000:9.1f} ms  "
+            + "  ".join(f"{stage} {s['count']}x {s['totalMs']:.1f} ms" for stage, s in run["stages"].items())
+            + f"  loop lag max {max(run['loopLag'], default=0.0) * 1000:.2f} ms  {run['report']}"
+        )
+
+    if args.record:
+        fixtures.save_json(EXPECTED_ANSWERS_FILE, runs[0]["answers"])
+        print(f"Recorded fixtures to {fixtures.directory}")
+
+    last = runs[-1]
+    result: Dict[str, Any] = {
+        "runs": len(runs),
+        "endToEndMs": summarize_ms([run["elapsed"] for run in runs]),
+        # Summed over concurrent fetchers, so stages can add up to more than end to end
+        "stagesMs": last["stages"],
+        "loopLagMs": summarize_ms([sample for run in runs for sample in run["loopLag"]]),
+        "report": last["report"],
+    }
+    if "fixtureMisses" in last:
+        result["fixtureMisses"] = last["fixtureMisses"]
+    if expected is not None:
+        result["mismatchedAnswers"] = sorted({key for run in runs for key in run["mismatchedAnswers"]})
+    return result
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--record", metavar="DIR", help="refresh live and record fixtures into DIR")
+    source.add_argument("--fixtures", metavar="DIR", help="replay the fixtures recorded in DIR")
+    parser.add_argument("--http-latency-ms", type=float, default=150.0, help="median injected page latency")
+    parser.add_argument("--llm-latency-ms", type=float, default=1200.0, help="median injected LLM latency")
+    parser.add_argument("--sigma", type=float, default=0.5, help="sigma of the log-normal latencies")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/)")
+    parser.add_argument("--baseline", help="previous JSON results to compare against")
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    results = {"refresh": result}
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"refresh-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    write_results(output, "refresh", vars(args), results)
+    print(f"\nResults written to {output}")
+    if args.baseline:
+        compare_results(
+            args.baseline, results, ["endToEndMs.p50", "endToEndMs.max", "loopLagMs.p99", "loopLagMs.max"]
+        )
+
+    if result.get("mismatchedAnswers") or result["report"]["failed"]:
+        print(f"Refresh failures: {result['report']['failed']}, mismatched answers: {result.get('mismatchedAnswers', [])}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
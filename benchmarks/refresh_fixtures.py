@@ -0,0 +1,202 @@
+"""
+Record/replay of the dynamic refresh's outside world.
+
+Recording wraps a live httpx transport and the Gemini client and writes every
+HTTP response and LLM exchange into a fixture directory:
+
+    <fixtures>/http/<key>.json   method, URL, status, a few headers and the body
+    <fixtures>/llm/<key>.json    model, system instruction, prompt, reply and usage
+
+Replaying serves them back from a local transport and a stub Gemini client,
+with injected log-normal latency, so a refresh runs fully offline.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict
+
+import httpx
+
+# Response headers kept in fixtures; the body is stored decoded, so no encodings
+RECORDED_HEADERS = ("content-type", "etag", "last-modified", "location")
+
+
+@dataclass
+class Latency:
+    """Log-normal latency: median in milliseconds and the sigma of its log."""
+
+    median_ms: float = 0.0
+    sigma: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median_ms <= 0:
+            return 0.0
+        return self.median_ms / 1000 * rng.lognormvariate(0, self.sigma)
+
+
+def _key(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()[:24]
+
+
+def llm_key(model: str, contents: Any, config: Any) -> str:
+    """Identifies an LLM exchange by everything that shapes its reply."""
+    return _key(
+        model,
+        getattr(config, "system_instruction", None),
+        getattr(config, "response_mime_type", None),
+        contents,
+    )
+
+
+class FixtureStore:
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, f"{key}.json")
+
+    def _write(self, kind: str, key: str, entry: Dict[str, Any]) -> None:
+        os.makedirs(os.path.join(self.directory, kind), exist_ok=True)
+        with open(self._path(kind, key), "w") as file:
+            json.dump(entry, file, indent=2, ensure_ascii=False)
+
+    def _read(self, kind: str, key: str) -> Dict[str, Any] | None:
+        try:
+            with open(self._path(kind, key)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def save_http(self, method: str, url: str, entry: Dict[str, Any]) -> None:
+        self._write("http", _key(method, url), {"method": method, "url": url, **entry})
+
+    def load_http(self, method: str, url: str) -> Dict[str, Any] | None:
+        return self._read("http", _key(method, url))
+
+    def save_llm(self, key: str, entry: Dict[str, Any]) -> None:
+        self._write("llm", key, entry)
+
+    def load_llm(self, key: str) -> Dict[str, Any] | None:
+        return self._read("llm", key)
+
+    def save_json(self, name: str, data: Any) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, name), "w") as file:
+            json.dump(data, file, indent=2, ensure_ascii=False)
+
+    def load_json(self, name: str) -> Any:
+        try:
+            with open(os.path.join(self.directory, name)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests to a live transport and records every response."""
+
+    def __init__(self, fixtures: FixtureStore, inner: httpx.AsyncBaseTransport | None = None) -> None:
+        self.fixtures = fixtures
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        # Reading through a Response decodes any Content-Encoding
+        body = await httpx.Response(
+            response.status_code, headers=response.headers, stream=response.stream
+        ).aread()
+        headers = {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers}
+        self.fixtures.save_http(
+            request.method,
+            str(request.url),
+            {"status": response.status_code, "headers": headers, "body": body.decode("utf-8", "replace")},
+        )
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves recorded responses after an injected latency; unknown URLs fail to connect."""
+
+    def __init__(self, fixtures: FixtureStore, latency: Latency, seed: int | None = None) -> None:
+        self.fixtures = fixtures
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.misses = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency.sample(self.rng))
+        entry = self.fixtures.load_http(request.method, str(request.url))
+        if entry is None:
+            self.misses += 1
+            raise httpx.ConnectError(f"No recorded response for {request.url}", request=request)
+        return httpx.Response(
+            entry["status"],
+            headers=entry["headers"],
+            content=entry["body"].encode("utf-8"),
+            request=request,
+        )
+
+
+class GenAIStub:
+    """Just enough of `genai.Client` for `LLMClient`: `client.aio.models.generate_content`."""
+
+    def __init__(self, models: Any) -> None:
+        self.models = models
+        self.aio = self
+
+
+class RecordingModels:
+    """Wraps the live `client.aio.models` and records each exchange."""
+
+    def __init__(self, inner: Any, fixtures: FixtureStore) -> None:
+        self.inner = inner
+        self.fixtures = fixtures
+
+    async def generate_content(self, model: str, contents: Any, config: Any = None) -> Any:
+        response = await self.inner.generate_content(model=model, contents=contents, config=config)
+        usage = getattr(response, "usage_metadata", None)
+        self.fixtures.save_llm(
+            llm_key(model, contents, config),
+            {
+                "model": model,
+                "systemInstruction": getattr(config, "system_instruction", None),
+                "prompt": contents,
+                "text": response.text,
+                "usage": {
+                    name: getattr(usage, name, None)
+                    for name in ("prompt_token_count", "candidates_token_count", "total_token_count")
+                },
+            },
+        )
+        return response
+
+
+class ReplayModels:
+    """Answers with recorded replies after an injected latency."""
+
+    def __init__(self, fixtures: FixtureStore, latency: Latency, seed: int | None = None) -> None:
+        self.fixtures = fixtures
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.misses = 0
+
+    async def generate_content(self, model: str, contents: Any, config: Any = None) -> Any:
+        self.calls += 1
+        await asyncio.sleep(self.latency.sample(self.rng))
+        entry = self.fixtures.load_llm(llm_key(model, contents, config))
+        if entry is None:
+            self.misses += 1
+            # Not retryable, so a prompt that changed since recording fails fast
+            raise ValueError("No recorded LLM exchange for this prompt")
+        return SimpleNamespace(text=entry["text"], usage_metadata=SimpleNamespace(**entry["usage"]))
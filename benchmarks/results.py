@@ -0,0 +1,85 @@
+import json
+import math
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Sequence
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of unsorted samples (q in 0..100); 0.0 when empty."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(math.ceil(q / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize_ms(samples_seconds: Sequence[float]) -> Dict[str, float]:
+    """p50/p90/p99/max/mean of durations given in seconds, reported in milliseconds."""
+    samples = [s * 1000 for s in samples_seconds]
+    return {
+        "p50": round(percentile(samples, 50), 3),
+        "p90": round(percentile(samples, 90), 3),
+        "p99": round(percentile(samples, 99), 3),
+        "max": round(max(samples, default=0.0), 3),
+        "mean": round(sum(samples) / len(samples), 3) if samples else 0.0,
+    }
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: str, kind: str, config: Dict[str, Any], results: Dict[str, Any]) -> None:
+    """Write one run as JSON, with enough context to compare it against other runs."""
+    document = {
+        "kind": kind,
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+        "gitRevision": _git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }
+    with open(path, "w") as file:
+        json.dump(document, file, indent=2)
+
+
+def compare_results(baseline_path: str, results: Dict[str, Any], metrics: List[str]) -> None:
+    """Print the relative change of selected metrics against a previous run."""
+    with open(baseline_path) as file:
+        baseline: Dict[str, Any] = json.load(file)["results"]
+    print(f"\nCompared with {baseline_path}:")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not isinstance(previous, dict) or not isinstance(current, dict):
+            continue
+        changes: List[str] = []
+        for metric in metrics:
+            old = _lookup(previous, metric)
+            new = _lookup(current, metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            changes.append(f"{metric} {old:g} -> {new:g} ({change:+.1f}%)")
+        if changes:
+            print(f"  {name}: " + ", ".join(changes))
+
+
+def _lookup(entry: Dict[str, Any], dotted: str) -> float | None:
+    value: Any = entry
+    for part in dotted.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return float(value) if isinstance(value, (int, float)) else None
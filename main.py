@@ -1,30 +1,44 @@
 import asyncio
+import json
 import logging
+import time
 from random import sample
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 import os
-from pydantic import BaseModel
-from src.Dependencies import get_gemini_client, get_questions_service
-from src.LLMClient import LLMClient
-from src.QuestionsService import QuestionsService, TestType
-from typing import Annotated
+from pydantic import BaseModel, Field
+from src.Dependencies import (
+    get_exam_session_service,
+    get_gemini_client,
+    get_grading_service,
+    get_questions_service,
+    get_verdict_cache,
+)
+from src.ExamSessions import (
+    AlreadyAnsweredError,
+    ExamSessionNotFoundError,
+    ExamSessionService,
+    QuestionNotInSessionError,
+)
+from src.EncodedResponses import encoded_response, join_json_array, raw_json_response
+from src.GradingService import GradingResult, GradingService
+from src.LLMClient import LLMClient, LLMOverloadedError, LLMTimeoutError
+from src.LogPipeline import LogContextMiddleware, configure_logging, log_graded_answer
+from src.Metrics import MetricsMiddleware, monitor_event_loop_lag, render_metrics
+from src.QuestionsService import TEST_CONFIGS, Question, QuestionsService, TestType
+from src.RateLimiter import RateLimitMiddleware, charge_request
+from src.RefreshLeader import BANK_RELOAD_POLL_SECONDS, RefreshLeaderLock
+from src.RefreshScheduler import RefreshScheduler
+from src.VerdictCache import VerdictCache
+from typing import Annotated, Any, AsyncIterator, Dict, List
 from contextlib import asynccontextmanager
 
-# Configure logging to output to both the console and a file
-logging.basicConfig(
-    level=logging.INFO,  # Adjust the logging level as needed
-    format="%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d - %(funcName)s()] - %(message)s",
-    handlers=[
-        logging.StreamHandler(),  # Log to console
-        logging.FileHandler(
-            "app.log", mode="a"
-        ),  # Log to file; 'a' appends to the file
-    ],
-)
+# Log through a queue: the console, the rotating app.log and the grading JSON
+# lines are written by a background thread
+configure_logging()
 
 # Load environment variables
 load_dotenv()
@@ -36,52 +50,123 @@ ENABLE_DYNAMIC_QUESTION_UPDATES = (
 RUN_DYNAMIC_UPDATE_ON_STARTUP = (
     os.getenv("RUN_DYNAMIC_UPDATE_ON_STARTUP", "false").lower() == "true"
 )
+# Longer answers are rejected with 422 before any grading work
+MAX_ANSWER_CHARS = int(os.getenv("MAX_ANSWER_CHARS", "500"))
 
 
 # Task do update questions periodically
-async def scheduled_dynamic_questions_update_task(questions_service: QuestionsService):
-    update_interval_days = DYNAMIC_UPDATE_INTERVAL_DAYS
-    if not RUN_DYNAMIC_UPDATE_ON_STARTUP:
-        await asyncio.sleep(update_interval_days * 24 * 60 * 60)
+async def scheduled_dynamic_questions_update_task(
+    questions_service: QuestionsService, leader_lock: RefreshLeaderLock
+):
+    # With several workers only the lock holder refreshes; the others reload the
+    # banks it publishes, and one of them takes over if the leader goes away
+    while not leader_lock.try_acquire():
+        try:
+            await questions_service.reload_changed_banks()
+        except Exception as e:
+            logging.exception("Error reloading published question banks: %s", e)
+        await asyncio.sleep(BANK_RELOAD_POLL_SECONDS)
+    # Catch up with whatever the previous leader published
+    await questions_service.reload_changed_banks()
+
+    # Each fetcher runs when its answers go stale, one at a time; see RefreshScheduler
+    scheduler = RefreshScheduler(default_ttl_days=DYNAMIC_UPDATE_INTERVAL_DAYS)
+    scheduler.load(
+        questions_service.dynamic_fetcher_last_updates(),
+        time.time(),
+        run_all_now=RUN_DYNAMIC_UPDATE_ON_STARTUP,
+    )
     while True:
-        logging.info("Running scheduled task to update dynamic questions")
+        delay = scheduler.seconds_until_next(time.time())
+        if delay is None:
+            logging.info("No dynamic question fetchers to schedule")
+            return
+        await asyncio.sleep(delay)
+        fetcher = scheduler.pop_due(time.time())
+        if fetcher is None:
+            continue
+        logging.info("Running scheduled refresh of %s", fetcher)
         try:
-            await questions_service.update_dynamic_questions(update_interval_days)
+            report = await questions_service.update_dynamic_questions(fetchers=[fetcher])
+            succeeded = fetcher not in report.failed_fetchers
         except Exception as e:
-            logging.exception(f"Error updating dynamic questions. Error message: {e}")
-        await asyncio.sleep(
-            (update_interval_days + 1) * 24 * 60 * 60
-        )  # run this task every 31 days
+            logging.exception("Error updating dynamic questions. Error message: %s", e)
+            succeeded = False
+        next_run = scheduler.record_run(fetcher, succeeded, time.time())
+        scheduler.save()
+        logging.info(
+            "Next refresh of %s in %.1f day(s)", fetcher, (next_run - time.time()) / (24 * 60 * 60)
+        )
+        # Spread overdue fetchers out instead of running them back to back
+        await asyncio.sleep(scheduler.min_spacing_seconds)
+
+
+async def warm_up_llm_client(llm_client: LLMClient) -> None:
+    """Import the Gemini SDK in the background so the first graded answer does not pay for it."""
+    started = time.perf_counter()
+    try:
+        await llm_client.warm_up()
+        logging.info("LLM client ready in %.2fs", time.perf_counter() - started)
+    except Exception as e:
+        logging.exception("LLM client warm-up failed; it will be retried on first use: %s", e)
 
 
 class Answer(BaseModel):
-    answer: str
+    answer: str = Field(max_length=MAX_ANSWER_CHARS)
+
+
+class QuestionAnswer(BaseModel):
+    question_id: int = Field(alias="questionId")
+    answer: str = Field(max_length=MAX_ANSWER_CHARS)
+
+
+MAX_BATCH_ANSWERS = max(config.total_questions for config in TEST_CONFIGS.values())
+
+
+class BatchAnswers(BaseModel):
+    answers: list[QuestionAnswer] = Field(min_length=1, max_length=MAX_BATCH_ANSWERS)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logging.info("Application startup: initializing services")
+    started = time.perf_counter()
     questions_service: QuestionsService = get_questions_service()
+    await asyncio.to_thread(questions_service.load_banks)
+    logging.info("Question banks loaded in %.3fs", time.perf_counter() - started)
+    warm_up_task = asyncio.create_task(warm_up_llm_client(get_gemini_client()))
+    exam_session_service: ExamSessionService = get_exam_session_service()
+    exam_session_service.start_workers()
     background_task: asyncio.Task[None] | None = None
+    leader_lock = RefreshLeaderLock()
     if ENABLE_DYNAMIC_QUESTION_UPDATES:
         background_task = asyncio.create_task(
-            scheduled_dynamic_questions_update_task(questions_service)
+            scheduled_dynamic_questions_update_task(questions_service, leader_lock)
         )
     else:
         logging.info("Dynamic question background updates are disabled")
+    loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
     try:
         yield
     finally:
+        loop_lag_task.cancel()
+        warm_up_task.cancel()
+        # Let both finish unwinding before the rest shuts down
+        await asyncio.gather(loop_lag_task, warm_up_task, return_exceptions=True)
+        await exam_session_service.stop_workers()
         if background_task:
             background_task.cancel()  # Cancel the task
             try:
                 await background_task  # Ensure it exits cleanly
             except asyncio.CancelledError:
                 logging.info("Background task stopped.")
+        leader_lock.release()
 
 
 app = FastAPI(lifespan=lifespan)
 
+# Innermost, so rate-limited responses still get the CORS headers
+app.add_middleware(RateLimitMiddleware.from_env)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # or more restricted
@@ -89,6 +174,26 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(LogContextMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(LLMOverloadedError)
+async def llm_overloaded_handler(request: Request, exc: LLMOverloadedError):
+    """Shed load quickly when the LLM wait queue is full."""
+    logging.warning("Shedding request to %s: %s", request.url.path, exc)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Answer grading is busy, please retry shortly"},
+        headers={"Retry-After": str(int(exc.retry_after))},
+    )
+
+
+@app.exception_handler(LLMTimeoutError)
+async def llm_timeout_handler(request: Request, exc: LLMTimeoutError):
+    logging.warning("LLM call timed out for %s: %s", request.url.path, exc)
+    return JSONResponse(status_code=504, content={"detail": "Answer grading timed out"})
+
 
 # Get PRODUCTION value from environment variables
 PRODUCTION = os.getenv("PRODUCTION", "False").lower() == "true"
@@ -97,40 +202,67 @@ STATIC_DIR = "client/dist"
 
 @app.get("/api/test-configs")
 def get_test_configs(
+    request: Request,
     questions_service: Annotated[QuestionsService, Depends(get_questions_service)],
-):
+) -> Response:
     """Return all available test configurations."""
     logging.info("Retrieving test configurations")
-    return {"configs": questions_service.get_test_configs()}
+    return encoded_response(request, questions_service.encoded_test_configs)
 
 
 @app.get("/api/questions")
 def read_questions(
     n: int,
+    request: Request,
     questions_service: Annotated[QuestionsService, Depends(get_questions_service)],
     test_type: Annotated[TestType, Query(alias="testType")] = TestType.TEST_2008,
-):
-    """Get n random questions for a specific test type."""
-    all_questions = questions_service.get_all_questions(test_type)
-    if len(all_questions) < n:
+    seed: int | None = None,
+    stratified: bool = False,
+    for_65_plus: Annotated[bool, Query(alias="for65Plus")] = False,
+    exclude_ids: Annotated[List[int], Query(alias="excludeIds")] = [],
+) -> Response:
+    """
+    Get n random questions for a specific test type. The same seed gives the
+    same questions; stratified spreads them across sections; for65Plus limits
+    them to the 65/20 questions; excludeIds skips questions already seen.
+    """
+    selected_questions = questions_service.draw_exam(
+        test_type,
+        n,
+        seed=seed,
+        stratified=stratified,
+        for_65_plus=for_65_plus,
+        exclude_ids=exclude_ids,
+    )
+    if len(selected_questions) < n:
         logging.warning(
             "Requested number of questions (%d) exceeds available questions (%d) for test type %s",
             n,
-            len(all_questions),
+            len(selected_questions),
             test_type.value,
         )
-        n = len(all_questions)
-    selected_questions = sample(all_questions, n)
-    logging.info("Returning %d questions for test type %s", n, test_type.value)
-    return {"questions": selected_questions}
+    logging.info(
+        "Returning %d questions for test type %s", len(selected_questions), test_type.value
+    )
+    return raw_json_response(
+        request,
+        join_json_array(
+            "questions",
+            (
+                questions_service.get_encoded_question(test_type, q.id).raw
+                for q in selected_questions
+            ),
+        ),
+    )
 
 
 @app.get("/api/questions/{question_id}")
 def read_question(
     question_id: int,
+    request: Request,
     questions_service: Annotated[QuestionsService, Depends(get_questions_service)],
     test_type: Annotated[TestType, Query(alias="testType")] = TestType.TEST_2008,
-):
+) -> Response:
     """Get a specific question by ID for a specific test type."""
     try:
         if question_id == -1:
@@ -148,7 +280,9 @@ def read_question(
             question_id,
             test_type.value,
         )
-        return question
+        return encoded_response(
+            request, questions_service.get_encoded_question(test_type, question.id)
+        )
     except IndexError as e:
         logging.exception("Question not found: %s", str(e))
         raise HTTPException(status_code=404, detail=str(e))
@@ -159,70 +293,301 @@ def read_question(
         raise HTTPException(status_code=500, detail="Error retrieving question")
 
 
-# System instruction for answer evaluation - used as LLM system prompt
-ANSWER_EVALUATION_SYSTEM_INSTRUCTION = """You are an evaluator for U.S. civics test answers. You will be given a question, the correct answers, and a user's answer. You must determine if the user's answer is correct.
-
-Guidelines:
-- The user's answer must not contain any incorrect information. If the user provides a list of items, all items in that list must be correct.
-- The answer doesn't need to match exactly - understand what the user means from context
-- For names of people: accept minor misspellings, different name orders (FirstName LastName vs LastName FirstName), and partial matches if the person is clearly identifiable
-- For questions about representatives/senators/governors: if the user names a correct person for ANY state/district, mark it correct (since the question asks about "your" state)
-- Be lenient with spelling variations but strict about the actual content being correct
-- The answer can't be too vague or generic
-- You should only compare the users answer to the Actual answers
-- You should judge in what cases the user provided enough information for the answer to be considered correct, and when it's not enough
-- You should judge the answer the same way an average officer on the naturalization interview would judge it
-
-Reply only with the word "Correct" for a correct user's answer or the word "Incorrect" for an incorrect user's answer."""
-
-
 @app.post("/api/submit-answer/{question_id}")
 async def submit_answer(
     question_id: int,
     answer: Answer,
     questions_service: Annotated[QuestionsService, Depends(get_questions_service)],
     gemini_client: Annotated[LLMClient, Depends(get_gemini_client)],
+    grading_service: Annotated[GradingService, Depends(get_grading_service)],
     test_type: Annotated[TestType, Query(alias="testType")] = TestType.TEST_2008,
 ):
     """Submit an answer for evaluation."""
     question = questions_service.get_question_by_id(test_type, question_id)
-    prompt = f"""Question: {question.question}
-Actual answers: {question.answers}
-User's answer: {answer.answer}"""
+    grading = await grade_answer(test_type, question, answer.answer, grading_service, gemini_client)
+    return {
+        "result": "true" if grading.is_correct else "false",
+        "gradedBy": grading.graded_by,
+    }
+
+
+@app.post("/api/submit-answer/{question_id}/stream")
+async def submit_answer_stream(
+    question_id: int,
+    answer: Answer,
+    questions_service: Annotated[QuestionsService, Depends(get_questions_service)],
+    gemini_client: Annotated[LLMClient, Depends(get_gemini_client)],
+    grading_service: Annotated[GradingService, Depends(get_grading_service)],
+    test_type: Annotated[TestType, Query(alias="testType")] = TestType.TEST_2008,
+) -> StreamingResponse:
+    """
+    Submit an answer and receive the verdict as server-sent events: `grading`
+    as soon as the request is accepted, then `verdict` (same fields as
+    /api/submit-answer) the moment it is known, or `error`.
+    """
+    question = questions_service.get_question_by_id(test_type, question_id)
+
+    async def events() -> AsyncIterator[str]:
+        yield server_sent_event("grading", {"questionId": question_id})
+        try:
+            grading = await grade_answer(
+                test_type, question, answer.answer, grading_service, gemini_client
+            )
+        except LLMOverloadedError as e:
+            logging.warning("Shedding streamed answer for question id %d: %s", question_id, e)
+            yield server_sent_event(
+                "error",
+                {
+                    "detail": "Answer grading is busy, please retry shortly",
+                    "retryAfter": int(e.retry_after),
+                },
+            )
+            return
+        except LLMTimeoutError as e:
+            logging.warning("LLM call timed out for question id %d: %s", question_id, e)
+            yield server_sent_event("error", {"detail": "Answer grading timed out"})
+            return
+        except HTTPException as e:
+            yield server_sent_event("error", {"detail": e.detail})
+            return
+        yield server_sent_event(
+            "verdict",
+            {
+                "result": "true" if grading.is_correct else "false",
+                "gradedBy": grading.graded_by,
+            },
+        )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the events
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def grade_answer(
+    test_type: TestType,
+    question: Question,
+    answer: str,
+    grading_service: GradingService,
+    gemini_client: LLMClient,
+) -> GradingResult:
     logging.info(
         "Submitting answer for question id %d (test type: %s)",
-        question_id,
+        question.id,
         test_type.value,
     )
+    started = time.perf_counter()
     try:
-        result = await gemini_client.completion(
-            prompt,
-            system_instruction=ANSWER_EVALUATION_SYSTEM_INSTRUCTION,
-            max_output_tokens=512,
-        )
+        grading = await grading_service.grade(test_type, question, answer, gemini_client)
+    except (LLMOverloadedError, LLMTimeoutError):
+        raise
     except Exception as e:
         logging.exception(
-            f"Error processing answer for question id %d. Error message: {e}",
-            question_id,
+            "Error processing answer for question id %d. Error message: %s",
+            question.id,
+            e,
         )
         raise HTTPException(status_code=500, detail="Error processing answer")
-    is_correct = "Correct" in result
+    log_graded_answer(
+        test_type.value,
+        question.id,
+        grading.is_correct,
+        grading.graded_by,
+        time.perf_counter() - started,
+        len(answer),
+    )
+    return grading
+
+
+def server_sent_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/submit-answers")
+async def submit_answers(
+    batch: BatchAnswers,
+    request: Request,
+    questions_service: Annotated[QuestionsService, Depends(get_questions_service)],
+    gemini_client: Annotated[LLMClient, Depends(get_gemini_client)],
+    grading_service: Annotated[GradingService, Depends(get_grading_service)],
+    test_type: Annotated[TestType, Query(alias="testType")] = TestType.TEST_2008,
+):
+    """Submit answers for a whole practice test and grade them together."""
+    # The rate limiter took one token for the request; every answer costs one
+    charge_request(request.scope, len(batch.answers) - 1)
+    try:
+        items = [
+            (questions_service.get_question_by_id(test_type, item.question_id), item.answer)
+            for item in batch.answers
+        ]
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     logging.info(
-        "Answer evaluated for question id %d: %s",
-        question_id,
-        "Correct" if is_correct else "Incorrect",
+        "Submitting %d answers in a batch (test type: %s)", len(items), test_type.value
+    )
+    started = time.perf_counter()
+    try:
+        gradings = await grading_service.grade_batch(test_type, items, gemini_client)
+    except (LLMOverloadedError, LLMTimeoutError):
+        raise
+    except Exception as e:
+        logging.exception("Error processing batch of answers. Error message: %s", e)
+        raise HTTPException(status_code=500, detail="Error processing answers")
+    duration = time.perf_counter() - started
+    for item, grading in zip(batch.answers, gradings):
+        log_graded_answer(
+            test_type.value,
+            item.question_id,
+            grading.is_correct,
+            grading.graded_by,
+            duration,
+            len(item.answer),
+            batch=True,
+        )
+    correct_count = sum(grading.is_correct for grading in gradings)
+    pass_threshold = TEST_CONFIGS[test_type].pass_threshold
+    logging.info(
+        "Batch evaluated: %d of %d correct (test type: %s)",
+        correct_count,
+        len(gradings),
+        test_type.value,
+    )
+    return {
+        "results": [
+            {
+                "questionId": item.question_id,
+                "result": "true" if grading.is_correct else "false",
+                "gradedBy": grading.graded_by,
+            }
+            for item, grading in zip(batch.answers, gradings)
+        ],
+        "correctCount": correct_count,
+        "passThreshold": pass_threshold,
+        "passed": correct_count >= pass_threshold,
+    }
+
+
+@app.post("/api/exam-sessions")
+async def start_exam_session(
+    exam_session_service: Annotated[ExamSessionService, Depends(get_exam_session_service)],
+    test_type: Annotated[TestType, Query(alias="testType")] = TestType.TEST_2008,
+    for_65_plus: Annotated[bool, Query(alias="for65Plus")] = False,
+    seed: int | None = None,
+):
+    """
+    Start a server-side exam: draws the test's number of questions (spread
+    across sections), returned without their answers.
+    """
+    session = exam_session_service.start_session(test_type, for_65_plus, seed)
+    logging.info(
+        "Started exam session with %d questions (test type: %s)",
+        len(session.questions),
+        test_type.value,
     )
-    return {"result": "true" if is_correct else "false"}
+    return {
+        "sessionId": session.id,
+        "testType": test_type.value,
+        "questions": [
+            {"id": question.id, "question": question.question} for question in session.questions
+        ],
+        "passThreshold": session.pass_threshold,
+    }
+
+
+@app.post("/api/exam-sessions/{session_id}/answers/{question_id}", status_code=202)
+async def submit_exam_answer(
+    session_id: str,
+    question_id: int,
+    answer: Answer,
+    exam_session_service: Annotated[ExamSessionService, Depends(get_exam_session_service)],
+):
+    """Record an answer of an exam session; it is graded in the background."""
+    # async: the session store and the grading queue are only used from the event loop
+    try:
+        exam_session_service.submit_answer(session_id, question_id, answer.answer)
+    except (ExamSessionNotFoundError, QuestionNotInSessionError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except AlreadyAnsweredError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"questionId": question_id, "status": "queued"}
+
+
+@app.get("/api/exam-sessions/{session_id}/results")
+async def get_exam_results(
+    session_id: str,
+    exam_session_service: Annotated[ExamSessionService, Depends(get_exam_session_service)],
+):
+    """
+    Grades of an exam session, waiting only for those still being graded.
+    `complete` is false if some were still pending when the wait timed out.
+    """
+    try:
+        return await exam_session_service.get_results(session_id)
+    except ExamSessionNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get("/api/grading-stats")
+def get_grading_stats(
+    verdict_cache: Annotated[VerdictCache, Depends(get_verdict_cache)],
+    grading_service: Annotated[GradingService, Depends(get_grading_service)],
+    gemini_client: Annotated[LLMClient, Depends(get_gemini_client)],
+    exam_session_service: Annotated[ExamSessionService, Depends(get_exam_session_service)],
+):
+    """Return grading tier, verdict cache, LLM admission/breaker/hedging and exam session counters."""
+    return {
+        **grading_service.get_stats(),
+        "cache": verdict_cache.get_stats(),
+        "llm": gemini_client.get_stats(),
+        "examSessions": exam_session_service.get_stats(),
+    }
 
 
 @app.get("/api/dynamic-questions")
 def get_dynamic_questions(
+    request: Request,
     questions_service: Annotated[QuestionsService, Depends(get_questions_service)],
     test_type: Annotated[TestType, Query(alias="testType")] = TestType.TEST_2008,
-):
+) -> Response:
     """Get all dynamic questions for a specific test type."""
     logging.info("Retrieving dynamic questions for test type %s", test_type.value)
-    return {"questions": questions_service.get_dynamic_questions(test_type)}
+    return encoded_response(
+        request, questions_service.get_bank(test_type).encoded_dynamic_questions
+    )
+
+
+@app.get("/healthz")
+def liveness() -> dict[str, str]:
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readiness(
+    questions_service: Annotated[QuestionsService, Depends(get_questions_service)],
+    gemini_client: Annotated[LLMClient, Depends(get_gemini_client)],
+) -> JSONResponse:
+    """
+    Readiness: the question banks are loaded, so the read-only endpoints can
+    serve. Grading works too; until the LLM client is warm its first call
+    creates it.
+    """
+    ready = questions_service.is_loaded
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "loading",
+            "llmClientWarm": gemini_client.is_warm,
+        },
+    )
+
+
+@app.get("/metrics")
+def get_metrics() -> PlainTextResponse:
+    """Request, LLM, dynamic refresh and event loop metrics in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 
 # Serve static frontend files in production
@@ -1,11 +1,30 @@
+import asyncio
+import hashlib
+import json
+import logging
 import os
-import requests
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import httpx
 from bs4 import BeautifulSoup
-from src.LLMClient import LLMClient, GEMINI_FLASH
-from typing import Callable, Coroutine, Any
-
-# Type alias for dynamic question fetcher functions
-DynamicQuestionFetcher = Callable[[LLMClient], Coroutine[Any, Any, str]]
+from src.AtomicFiles import write_atomically
+from src.LLMClient import LLMClient, LLMLane, GEMINI_FLASH, gather_or_cancel
+from src.Metrics import DYNAMIC_PAGE_FETCH_DURATION, DYNAMIC_PAGE_PARSE_DURATION
+from src.SourcePageParsers import (
+    format_state_mapping,
+    merge_state_mappings,
+    parse_governors,
+    parse_representatives,
+    parse_senators,
+    parse_state_capitals,
+    parse_state_mapping_lines,
+)
+from typing import Callable, Coroutine, Any, Dict, List, Set, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 # Headers to avoid 403 blocks from Wikipedia and other sites
 HEADERS = {
@@ -14,6 +33,20 @@ HEADERS = {
 
 MAX_PAGE_CONTEXT_CHARS = int(os.getenv("MAX_PAGE_CONTEXT_CHARS", "18000"))
 
+# State lists longer than MAX_PAGE_CONTEXT_CHARS are split into chunks, all of
+# them extracted, at most DYNAMIC_CHUNK_CONCURRENCY at a time. A page needing
+# more than MAX_PAGE_CHUNKS chunks fails the refresh instead of being cut short.
+MAX_PAGE_CHUNKS = int(os.getenv("MAX_PAGE_CHUNKS", "16"))
+DYNAMIC_CHUNK_CONCURRENCY = int(os.getenv("DYNAMIC_CHUNK_CONCURRENCY", "4"))
+
+# Timeout for each source page request (seconds)
+DYNAMIC_FETCH_TIMEOUT_SECONDS = float(os.getenv("DYNAMIC_FETCH_TIMEOUT_SECONDS", "30"))
+
+# ETag / Last-Modified validators of source pages, kept between refresh runs
+DYNAMIC_HTTP_VALIDATORS_FILE = os.getenv(
+    "DYNAMIC_HTTP_VALIDATORS_FILE", "./db/http_validators.json"
+)
+
 
 def extract_page_context(soup: BeautifulSoup, max_chars: int = MAX_PAGE_CONTEXT_CHARS) -> str:
     for tag in soup(["script", "style", "noscript", "meta"]):
@@ -22,20 +55,427 @@ def extract_page_context(soup: BeautifulSoup, max_chars: int = MAX_PAGE_CONTEXT_
     return page_text[:max_chars]
 
 
-async def get_governor_by_state(llm_client: LLMClient) -> str:
+# Elements whose text stays together when a page is split into chunks
+_BLOCK_TAGS = ["h1", "h2", "h3", "h4", "h5", "h6", "caption", "p", "li", "tr", "dt", "dd", "pre"]
+_HEADING_TAGS = frozenset({"h1", "h2", "h3", "h4", "h5", "h6", "caption"})
+# Longest heading repeated at the top of the chunks of its section
+_MAX_HEADING_CHARS = 200
+
+
+def extract_page_blocks(soup: BeautifulSoup) -> List[Tuple[bool, str]]:
     """
-    Who is the Governor of your state now?
+    (is heading, text) of the innermost block elements of a page (headings,
+    paragraphs, list items, table rows, ...) in document order. Pages laid
+    out without such elements fall back to one block per text node.
     """
-    url = "https://simple.wikipedia.org/wiki/List_of_current_United_States_governors"
-    response = requests.get(url, headers=HEADERS)
-    if response.status_code != 200:
-        raise ValueError(f"Unable to fetch governors list. HTTP {response.status_code}")
+    for tag in soup(["script", "style", "noscript", "meta"]):
+        tag.decompose()
+    blocks: List[Tuple[bool, str]] = []
+    for element in soup.find_all(_BLOCK_TAGS):
+        if element.find(_BLOCK_TAGS) is not None:
+            continue
+        text = " ".join(element.stripped_strings)
+        if text:
+            blocks.append((element.name in _HEADING_TAGS, text))
+    strings = list(soup.stripped_strings)
+    if sum(len(text) for _, text in blocks) < sum(len(text) for text in strings) / 2:
+        blocks = [(False, text) for text in strings]
+    return blocks
+
+
+def split_page_blocks(blocks: List[Tuple[bool, str]], max_chars: int) -> List[str]:
+    """
+    Pack blocks, one per line, into chunks of about `max_chars`. A chunk that
+    starts inside a section repeats the section's heading, so e.g. the rows of
+    a per-state table keep their state.
+    """
+    chunks: List[str] = []
+    lines: List[str] = []
+    size = 0
+    heading: str | None = None
+    for is_heading, text in blocks:
+        text = text[:max_chars]
+        if lines and size + len(text) > max_chars:
+            chunks.append("\n".join(lines))
+            lines = [heading] if heading is not None and not is_heading else []
+            size = sum(len(line) + 1 for line in lines)
+        lines.append(text)
+        size += len(text) + 1
+        if is_heading:
+            heading = text[:_MAX_HEADING_CHARS]
+    if lines:
+        chunks.append("\n".join(lines))
+    return chunks
+
+
+def _parse_page_context(html: str, max_chars: int) -> str:
+    return extract_page_context(BeautifulSoup(html, "html.parser"), max_chars)
+
+
+def _parse_page_chunks(html: str, max_chars: int) -> List[str]:
+    return split_page_blocks(extract_page_blocks(BeautifulSoup(html, "html.parser")), max_chars)
+
+
+def _parse_structured(html: str, parser: Callable[[BeautifulSoup], T]) -> T:
+    return parser(BeautifulSoup(html, "html.parser"))
+
+
+class PageNotModified(Exception):
+    """Raised when a conditional GET returns 304: the page is unchanged since the last run."""
+
+    def __init__(self, url: str):
+        super().__init__(f"{url} has not changed since the last refresh")
+        self.url = url
+
+
+class ValidatorStore:
+    """
+    ETag / Last-Modified validators per fetcher and URL, persisted between
+    refresh runs. Fetchers sharing a page run on their own schedules, and a
+    304 only means the page is unchanged since that fetcher last read it.
+    """
+
+    def __init__(self, file_path: str = DYNAMIC_HTTP_VALIDATORS_FILE) -> None:
+        self.file_path = file_path
+        # fetcher -> url -> {"etag": ..., "lastModified": ...}
+        self.validators: Dict[str, Dict[str, Dict[str, str]]] = {}
+        try:
+            with open(file_path, "r") as file:
+                stored = json.load(file)
+            # Files from before validators were kept per fetcher are keyed by URL
+            self.validators = {
+                fetcher: urls for fetcher, urls in stored.items() if "://" not in fetcher
+            }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("Ignoring unreadable HTTP validators file %s: %s", file_path, e)
+
+    def get(self, fetcher: str, url: str) -> Dict[str, str]:
+        return self.validators.get(fetcher, {}).get(url, {})
+
+    def set(self, fetcher: str, url: str, validators: Dict[str, str]) -> None:
+        self.validators.setdefault(fetcher, {})[url] = validators
+
+    def discard(self, fetcher: str, url: str) -> None:
+        self.validators.get(fetcher, {}).pop(url, None)
+
+    def conditional_headers(self, fetcher: str, url: str) -> Dict[str, str]:
+        stored = self.get(fetcher, url)
+        headers: Dict[str, str] = {}
+        if "etag" in stored:
+            headers["If-None-Match"] = stored["etag"]
+        if "lastModified" in stored:
+            headers["If-Modified-Since"] = stored["lastModified"]
+        return headers
+
+    def save(self) -> None:
+        try:
+            write_atomically(self.file_path, json.dumps(self.validators, indent=2).encode("utf-8"))
+        except OSError as e:
+            logger.warning("Failed to save HTTP validators to %s: %s", self.file_path, e)
+
+
+class SourceUnchanged(Exception):
+    """Raised before the LLM step when the page text matches the previous run's fingerprint."""
+
+    def __init__(self, fingerprint: str):
+        super().__init__(f"Source content unchanged (fingerprint {fingerprint[:12]})")
+        self.fingerprint = fingerprint
+
+
+@dataclass
+class RefreshJob:
+    """State of one fetcher run, tracked across the pages it fetches."""
+
+    # Fingerprint stored with the answer the last time this fetcher ran
+    previous_fingerprint: str | None = None
+    # Name of the fetcher; its validators are kept apart from other fetchers'
+    fetcher: str | None = None
+    urls: Set[str] = field(default_factory=set)
+    # Validators of the 200 responses this fetcher read, saved if it succeeds
+    fresh_validators: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    # Running hash of the extracted text of every page the fetcher used
+    fingerprint: str | None = None
+
+    def add_page_context(self, page_context: str) -> None:
+        digest = hashlib.sha256()
+        if self.fingerprint is not None:
+            digest.update(self.fingerprint.encode())
+        digest.update(page_context.encode())
+        self.fingerprint = digest.hexdigest()
+
+
+# The fetcher run in the current task, see PageFetcher.start_job
+_current_job: ContextVar[RefreshJob | None] = ContextVar("_current_job", default=None)
+
+
+# A page request: its URL and the conditional headers sent with it
+RequestKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class PageFetcher:
+    """
+    Downloads source pages for the dynamic question fetchers over a pooled,
+    keep-alive async HTTP client. HTML parsing runs in a worker thread so it
+    never blocks the event loop.
+
+    One PageFetcher is used per refresh run: each URL is downloaded and parsed
+    at most once, however many fetchers need it with the same validators.
+    Requests are conditional on the validators the fetcher saved the last time
+    it ran, and a 304 raises PageNotModified so it skips both parsing and the
+    LLM step. Requests made outside a job (see start_job) are unconditional.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        validator_store: ValidatorStore | None = None,
+    ) -> None:
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=DYNAMIC_FETCH_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+        )
+        self.validator_store = validator_store or ValidatorStore()
+        self.not_modified_count = 0
+        # Keyed by the request: the URL and the conditional headers sent with it
+        self._html: Dict[RequestKey, asyncio.Task[Tuple[str, Dict[str, str]]]] = {}
+        self._contexts: Dict[Tuple[RequestKey, int], asyncio.Task[str]] = {}
+        self._chunks: Dict[Tuple[RequestKey, int], asyncio.Task[List[str]]] = {}
+        # Jobs started this run, whose validators are saved by save_validators
+        self._jobs: List[RefreshJob] = []
+
+    async def __aenter__(self) -> "PageFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self.client.aclose()
+
+    def start_job(
+        self, previous_fingerprint: str | None = None, fetcher: str | None = None
+    ) -> RefreshJob:
+        """
+        Start tracking the run of `fetcher` in the current task: the URLs it
+        fetches, their validators and the fingerprint of their extracted text.
+        If that fingerprint equals `previous_fingerprint`, fetch_page_context
+        raises SourceUnchanged so the fetcher skips its LLM call.
+        """
+        job = RefreshJob(previous_fingerprint=previous_fingerprint, fetcher=fetcher)
+        _current_job.set(job)
+        if fetcher is not None:
+            self._jobs.append(job)
+        return job
+
+    def discard_validators(self, job: RefreshJob) -> None:
+        """
+        Forget a job's validators for pages whose content could not be turned
+        into an answer, so its next run downloads them unconditionally.
+        """
+        job.fresh_validators.clear()
+        if job.fetcher is not None:
+            for url in job.urls:
+                self.validator_store.discard(job.fetcher, url)
+
+    def save_validators(self) -> None:
+        """Persist the validators of every page a job read successfully this run."""
+        for job in self._jobs:
+            if job.fetcher is not None:
+                for url, validators in job.fresh_validators.items():
+                    self.validator_store.set(job.fetcher, url, validators)
+        self.validator_store.save()
+
+    def _request_key(self, job: RefreshJob | None, url: str) -> RequestKey:
+        if job is None or job.fetcher is None:
+            return url, ()
+        headers = self.validator_store.conditional_headers(job.fetcher, url)
+        return url, tuple(sorted(headers.items()))
+
+    async def fetch_html(self, url: str, description: str) -> str:
+        """
+        Download a page (once per run and set of validators), raising ValueError
+        on errors and non-200 responses.
+        """
+        job = _current_job.get()
+        if job is not None:
+            job.urls.add(url)
+        key = self._request_key(job, url)
+        task = self._html.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._download(url, description, dict(key[1])))
+            self._html[key] = task
+        html, validators = await asyncio.shield(task)
+        if job is not None and validators:
+            job.fresh_validators[url] = validators
+        return html
+
+    async def _download(
+        self, url: str, description: str, headers: Dict[str, str]
+    ) -> Tuple[str, Dict[str, str]]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            raise ValueError(f"Request to fetch {description} failed: {str(e)}")
+        finally:
+            DYNAMIC_PAGE_FETCH_DURATION.labels(httpx.URL(url).host).observe(
+                time.perf_counter() - started
+            )
+        if response.status_code == 304:
+            self.not_modified_count += 1
+            logger.info("%s not modified since the last refresh", url)
+            raise PageNotModified(url)
+        if response.status_code != 200:
+            raise ValueError(
+                f"HTTP error {response.status_code} while fetching {description}."
+            )
+        validators: Dict[str, str] = {}
+        if "etag" in response.headers:
+            validators["etag"] = response.headers["etag"]
+        if "last-modified" in response.headers:
+            validators["lastModified"] = response.headers["last-modified"]
+        return response.text, validators
+
+    async def fetch_page_context(
+        self, url: str, description: str, max_chars: int = MAX_PAGE_CONTEXT_CHARS
+    ) -> str:
+        """
+        Download a page and return its cleaned text, parsed once per run off the
+        event loop. Raises SourceUnchanged when the current job's text matches
+        its previous fingerprint.
+        """
+        job = _current_job.get()
+        # Downloaded in this task, so the job records the page and its validators
+        html = await self.fetch_html(url, description)
+        key = (self._request_key(job, url), max_chars)
+        task = self._contexts.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._parse(html, max_chars))
+            self._contexts[key] = task
+        page_context = await asyncio.shield(task)
+        self._check_unchanged(job, page_context)
+        return page_context
+
+    async def fetch_page_chunks(
+        self, url: str, description: str, max_chars: int = MAX_PAGE_CONTEXT_CHARS
+    ) -> List[str]:
+        """
+        Like fetch_page_context, but returns the whole cleaned page split on
+        block boundaries into chunks of about `max_chars` (see split_page_blocks).
+        Raises ValueError when that takes more than MAX_PAGE_CHUNKS chunks, so a
+        partial list is never published.
+        """
+        job = _current_job.get()
+        html = await self.fetch_html(url, description)
+        key = (self._request_key(job, url), max_chars)
+        task = self._chunks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._parse_chunks(url, html, max_chars))
+            self._chunks[key] = task
+        chunks = await asyncio.shield(task)
+        self._check_unchanged(job, "\n".join(chunks))
+        return chunks
+
+    @staticmethod
+    def _check_unchanged(job: RefreshJob | None, page_context: str) -> None:
+        if job is not None:
+            job.add_page_context(page_context)
+            if job.fingerprint == job.previous_fingerprint:
+                raise SourceUnchanged(job.fingerprint)
+
+    async def fetch_structured(
+        self, url: str, description: str, parser: Callable[[BeautifulSoup], T]
+    ) -> T:
+        """Download a page and run a structured parser on it off the event loop."""
+        html = await self.fetch_html(url, description)
+        started = time.perf_counter()
+        try:
+            return await asyncio.to_thread(_parse_structured, html, parser)
+        finally:
+            DYNAMIC_PAGE_PARSE_DURATION.labels("structured").observe(time.perf_counter() - started)
+
+    async def _parse(self, html: str, max_chars: int) -> str:
+        started = time.perf_counter()
+        try:
+            return await asyncio.to_thread(_parse_page_context, html, max_chars)
+        finally:
+            DYNAMIC_PAGE_PARSE_DURATION.labels("page_text").observe(time.perf_counter() - started)
+
+    async def _parse_chunks(self, url: str, html: str, max_chars: int) -> List[str]:
+        started = time.perf_counter()
+        try:
+            chunks = await asyncio.to_thread(_parse_page_chunks, html, max_chars)
+        finally:
+            DYNAMIC_PAGE_PARSE_DURATION.labels("page_chunks").observe(time.perf_counter() - started)
+        if len(chunks) > MAX_PAGE_CHUNKS:
+            raise ValueError(
+                f"{url} is split into {len(chunks)} chunks, more than MAX_PAGE_CHUNKS "
+                f"({MAX_PAGE_CHUNKS}); not extracting a partial list"
+            )
+        return chunks
 
-    # Parse the HTML
-    soup = BeautifulSoup(response.text, "html.parser")
-    clean_html = extract_page_context(soup)
 
-    prompt = f"""Here is the Wikipedia page with the current state and territories governors:
+# Type alias for dynamic question fetcher functions
+DynamicQuestionFetcher = Callable[[LLMClient, PageFetcher], Coroutine[Any, Any, str]]
+
+
+async def extract_state_mapping(
+    llm_client: LLMClient,
+    chunks: List[str],
+    build_prompt: Callable[[str], str],
+    bracketed: bool = False,
+) -> str:
+    """
+    Extract a "State: names" list with the LLM. A page of one chunk takes one
+    call whose reply is returned as is; larger pages are mapped chunk by chunk
+    (concurrently, up to DYNAMIC_CHUNK_CONCURRENCY) and the partial lists are
+    merged, de-duplicated and rendered with format_state_mapping.
+    """
+    if len(chunks) == 1:
+        return await llm_client.completion(
+            prompt=build_prompt(chunks[0]), model=GEMINI_FLASH, lane=LLMLane.REFRESH
+        )
+
+    semaphore = asyncio.Semaphore(max(DYNAMIC_CHUNK_CONCURRENCY, 1))
+
+    async def extract_chunk(index: int, chunk: str) -> str:
+        # Keep the model to this part, instead of completing the list from memory
+        page_part = (
+            f"(This is part {index + 1} of {len(chunks)} of the page. "
+            f"Only list the states or territories that appear in this part.)\n{chunk}"
+        )
+        async with semaphore:
+            return await llm_client.completion(
+                prompt=build_prompt(page_part), model=GEMINI_FLASH, lane=LLMLane.REFRESH
+            )
+
+    # One failed chunk fails the page; the other chunks' calls are cancelled
+    replies = await gather_or_cancel(extract_chunk(i, chunk) for i, chunk in enumerate(chunks))
+    mapping = merge_state_mappings(parse_state_mapping_lines(reply) for reply in replies)
+    if not mapping:
+        raise ValueError(f"No state mappings extracted from {len(chunks)} page chunks")
+    return format_state_mapping(mapping, bracketed=bracketed)
+
+
+async def get_governor_by_state(llm_client: LLMClient, page_fetcher: PageFetcher) -> str:
+    """
+    Who is the Governor of your state now?
+    """
+    url = "https://simple.wikipedia.org/wiki/List_of_current_United_States_governors"
+    mapping = await page_fetcher.fetch_structured(url, "governors list", parse_governors)
+    if mapping is not None:
+        return format_state_mapping(mapping)
+    logger.warning("Governors page structure not recognized; falling back to LLM extraction")
+    chunks = await page_fetcher.fetch_page_chunks(url, "governors list")
+
+    def build_prompt(clean_html: str) -> str:
+        return f"""Here is the Wikipedia page with the current state and territories governors:
 {clean_html}
 
 Please read through it and compose a list of mapping each U.S. state or territory
@@ -48,11 +488,10 @@ IMPORTANT: Use "FirstName LastName" format (e.g., "Kay Ivey"), NOT "LastName, Fi
 If a territory does not have a governor or is not listed, omit it or note "N/A".
 """
 
-    governors = await llm_client.completion(prompt=prompt, model=GEMINI_FLASH)
-    return governors
+    return await extract_state_mapping(llm_client, chunks, build_prompt)
 
 
-async def get_senators_by_state(llm_client: LLMClient) -> str:
+async def get_senators_by_state(llm_client: LLMClient, page_fetcher: PageFetcher) -> str:
     """
     Retrieves the names of the U.S. Senators for each state.
     Uses en.wikipedia.org as a reference for the current listing.
@@ -63,25 +502,14 @@ async def get_senators_by_state(llm_client: LLMClient) -> str:
       ...
     """
     url = "https://www.britannica.com/topic/United-States-senators-2236815"
-
-    # Attempt to fetch the page
-    try:
-        response = requests.get(url, headers=HEADERS)
-        if response.status_code == 404:
-            raise ValueError("No senators found (404). Possibly a territory without representation.")
-        if response.status_code != 200:
-            raise ValueError(
-                f"HTTP error {response.status_code} while fetching senators list."
-            )
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Request to fetch senators failed: {str(e)}")
-
-    # Parse the HTML
-    soup = BeautifulSoup(response.text, "html.parser")
-    clean_html = extract_page_context(soup)
-
-    # Send to LLM
-    prompt = f"""Below is the Wikipedia page listing all current U.S. Senators:
+    mapping = await page_fetcher.fetch_structured(url, "senators list", parse_senators)
+    if mapping is not None:
+        return format_state_mapping(mapping, bracketed=True)
+    logger.warning("Senators page structure not recognized; falling back to LLM extraction")
+    chunks = await page_fetcher.fetch_page_chunks(url, "senators list")
+
+    def build_prompt(clean_html: str) -> str:
+        return f"""Below is the Wikipedia page listing all current U.S. Senators:
 {clean_html}
 
 Using the information, produce a list of mapping of the form e.g.:
@@ -93,11 +521,11 @@ IMPORTANT: Use "FirstName LastName" format (e.g., "Tommy Tuberville"), NOT "Last
 For territories (or areas without senators), either exclude them or set their value to "No Senators".
 Output only the list of mappings nothing else, no formatting except new line character after each entry
 """
-    senators = await llm_client.completion(prompt=prompt, model=GEMINI_FLASH)
-    return senators
+
+    return await extract_state_mapping(llm_client, chunks, build_prompt, bracketed=True)
 
 
-async def get_representative(llm_client: LLMClient) -> str:
+async def get_representative(llm_client: LLMClient, page_fetcher: PageFetcher) -> str:
     """
     Retrieves the names of all U.S. Representatives, grouped by state (and district if applicable).
     Uses house.gov as a reliable source (via https://www.house.gov/representatives).
@@ -106,20 +534,14 @@ async def get_representative(llm_client: LLMClient) -> str:
     State Name: Representative Name (District #), Representative Name (District #), ...
     """
     url = "https://www.house.gov/representatives"
-    try:
-        response = requests.get(url, headers=HEADERS)
-        if response.status_code != 200:
-            raise ValueError(
-                f"HTTP error {response.status_code} while fetching representatives list."
-            )
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Request to fetch representatives failed: {str(e)}")
-
-    # Parse the HTML
-    soup = BeautifulSoup(response.text, "html.parser")
-    clean_html = extract_page_context(soup)
-
-    prompt = f"""Below is HTML content from {url} listing current U.S. Representatives:
+    mapping = await page_fetcher.fetch_structured(url, "representatives list", parse_representatives)
+    if mapping is not None:
+        return format_state_mapping(mapping)
+    logger.warning("Representatives page structure not recognized; falling back to LLM extraction")
+    chunks = await page_fetcher.fetch_page_chunks(url, "representatives list")
+
+    def build_prompt(clean_html: str) -> str:
+        return f"""Below is HTML content from {url} listing current U.S. Representatives:
 {clean_html}
 
 Please parse the list of U.S. Representatives by state.
@@ -133,29 +555,16 @@ If a state has only one representative, label it as "At Large" instead of a dist
 Include U.S. territories and D.C. if applicable. If a territory has no representative, return it with "None".
 """
 
-    representatives_list = await llm_client.completion(
-        prompt=prompt, model=GEMINI_FLASH
-    )
-    return representatives_list
+    return await extract_state_mapping(llm_client, chunks, build_prompt)
 
 
-async def get_president(llm_client: LLMClient) -> str:
+async def get_president(llm_client: LLMClient, page_fetcher: PageFetcher) -> str:
     """
     Retrieves the name of the current U.S. President.
     Uses https://www.whitehouse.gov/administration/ as the data source.
     """
     url = "https://www.whitehouse.gov/administration/"
-    try:
-        response = requests.get(url, headers=HEADERS)
-        if response.status_code != 200:
-            raise ValueError(
-                f"HTTP error {response.status_code} while fetching White House info."
-            )
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Request to fetch president info failed: {str(e)}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    clean_html = extract_page_context(soup)
+    clean_html = await page_fetcher.fetch_page_context(url, "White House info")
 
     prompt = f"""Below is the HTML content from the White House administration page:
 {clean_html}
@@ -163,27 +572,19 @@ async def get_president(llm_client: LLMClient) -> str:
 Identify the current President of the United States by name only (e.g. "Joe Biden").
 Return just the name as plain text.
 """
-    president_name = await llm_client.completion(prompt=prompt, model=GEMINI_FLASH)
+    president_name = await llm_client.completion(
+        prompt=prompt, model=GEMINI_FLASH, lane=LLMLane.REFRESH
+    )
     return president_name
 
 
-async def get_vice_president(llm_client: LLMClient) -> str:
+async def get_vice_president(llm_client: LLMClient, page_fetcher: PageFetcher) -> str:
     """
     Retrieves the name of the current U.S. Vice President.
     Uses https://www.whitehouse.gov/administration/ as the data source.
     """
     url = "https://www.whitehouse.gov/administration/"
-    try:
-        response = requests.get(url, headers=HEADERS)
-        if response.status_code != 200:
-            raise ValueError(
-                f"HTTP error {response.status_code} while fetching White House info."
-            )
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Request to fetch vice president info failed: {str(e)}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    clean_html = extract_page_context(soup)
+    clean_html = await page_fetcher.fetch_page_context(url, "White House info")
 
     prompt = f"""Below is the HTML content from the White House administration page:
 {clean_html}
@@ -192,29 +593,19 @@ Identify the current Vice President of the United States by name only (e.g. "Kam
 Return just the name as plain text.
 """
     vice_president_name = await llm_client.completion(
-        prompt=prompt, model=GEMINI_FLASH
+        prompt=prompt, model=GEMINI_FLASH, lane=LLMLane.REFRESH
     )
     return vice_president_name
 
 
-async def get_supreme_court_justice_count(llm_client: LLMClient) -> str:
+async def get_supreme_court_justice_count(llm_client: LLMClient, page_fetcher: PageFetcher) -> str:
     """
     Retrieves the current number of justices on the Supreme Court
     from https://simple.wikipedia.org/wiki/Supreme_Court_of_the_United_States.
     Returns the count as a string.
     """
     url = "https://simple.wikipedia.org/wiki/Supreme_Court_of_the_United_States"
-    try:
-        response = requests.get(url, headers=HEADERS)
-        if response.status_code != 200:
-            raise ValueError(
-                f"HTTP error {response.status_code} while fetching SCOTUS info."
-            )
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Request to fetch SCOTUS info failed: {str(e)}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    clean_html = extract_page_context(soup)
+    clean_html = await page_fetcher.fetch_page_context(url, "SCOTUS info")
 
     prompt = f"""Below is the HTML from Simple English Wikipedia about the Supreme Court of the United States:
 {clean_html}
@@ -222,31 +613,23 @@ async def get_supreme_court_justice_count(llm_client: LLMClient) -> str:
 Based on the page content, how many justices currently serve on the Supreme Court?
 Return only the integer count.
 """
-    result_str = await llm_client.completion(prompt=prompt, model=GEMINI_FLASH)
+    result_str = await llm_client.completion(
+        prompt=prompt, model=GEMINI_FLASH, lane=LLMLane.REFRESH
+    )
 
     # Extract just the number from the response
     digits = "".join(filter(str.isdigit, result_str))
     return digits if digits else result_str.strip()
 
 
-async def get_chief_justice(llm_client: LLMClient) -> str:
+async def get_chief_justice(llm_client: LLMClient, page_fetcher: PageFetcher) -> str:
     """
     Retrieves the name of the current Chief Justice of the Supreme Court
     from https://simple.wikipedia.org/wiki/Supreme_Court_of_the_United_States.
     Returns a string containing the Chief Justice's name.
     """
     url = "https://simple.wikipedia.org/wiki/Supreme_Court_of_the_United_States"
-    try:
-        response = requests.get(url, headers=HEADERS)
-        if response.status_code != 200:
-            raise ValueError(
-                f"HTTP error {response.status_code} while fetching SCOTUS info."
-            )
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Request to fetch SCOTUS info failed: {str(e)}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    clean_html = extract_page_context(soup)
+    clean_html = await page_fetcher.fetch_page_context(url, "SCOTUS info")
 
     prompt = f"""Below is the HTML from Simple English Wikipedia about the Supreme Court of the United States:
 {clean_html}
@@ -255,12 +638,12 @@ Please find the name of the current Chief Justice of the United States Supreme C
 Return just the name as plain text.
 """
     chief_justice_name = await llm_client.completion(
-        prompt=prompt, model=GEMINI_FLASH
+        prompt=prompt, model=GEMINI_FLASH, lane=LLMLane.REFRESH
     )
     return chief_justice_name
 
 
-async def get_state_capital(llm_client: LLMClient) -> str:
+async def get_state_capital(llm_client: LLMClient, page_fetcher: PageFetcher) -> str:
     """
     Retrieves the capital cities of all U.S. states.
     Uses https://simple.wikipedia.org/wiki/List_of_U.S._state_capitals as the data source.
@@ -269,19 +652,14 @@ async def get_state_capital(llm_client: LLMClient) -> str:
     State Name: Capital City
     """
     url = "https://simple.wikipedia.org/wiki/List_of_U.S._state_capitals"
-    try:
-        response = requests.get(url, headers=HEADERS)
-        if response.status_code != 200:
-            raise ValueError(
-                f"HTTP error {response.status_code} while fetching state capitals."
-            )
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Request to fetch state capitals failed: {str(e)}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    clean_html = extract_page_context(soup)
-
-    prompt = f"""Below is the HTML from {url} listing all U.S. state capitals:
+    mapping = await page_fetcher.fetch_structured(url, "state capitals", parse_state_capitals)
+    if mapping is not None:
+        return format_state_mapping(mapping)
+    logger.warning("State capitals page structure not recognized; falling back to LLM extraction")
+    chunks = await page_fetcher.fetch_page_chunks(url, "state capitals")
+
+    def build_prompt(clean_html: str) -> str:
+        return f"""Below is the HTML from {url} listing all U.S. state capitals:
 {clean_html}
 
 Please return a plain-text list mapping each U.S. state to its capital city in this format:
@@ -291,11 +669,10 @@ State Name: Capital City
 Include U.S. territories if they are listed (e.g., "Puerto Rico: San Juan").
 """
 
-    capitals_list = await llm_client.completion(prompt=prompt, model=GEMINI_FLASH)
-    return capitals_list
+    return await extract_state_mapping(llm_client, chunks, build_prompt)
 
 
-async def get_president_party(llm_client: LLMClient) -> str:
+async def get_president_party(llm_client: LLMClient, page_fetcher: PageFetcher) -> str:
     """
     Retrieves the political party of the current U.S. President using
     https://www.whitehouse.gov/administration/ as the data source.
@@ -303,17 +680,7 @@ async def get_president_party(llm_client: LLMClient) -> str:
     Returns the political party as a string (e.g. "Democratic" or "Republican").
     """
     url = "https://www.whitehouse.gov/administration/"
-    try:
-        response = requests.get(url, headers=HEADERS)
-        if response.status_code != 200:
-            raise ValueError(
-                f"HTTP error {response.status_code} while fetching White House info."
-            )
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Request to fetch president's party failed: {str(e)}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    clean_html = extract_page_context(soup)
+    clean_html = await page_fetcher.fetch_page_context(url, "White House info")
 
     prompt = f"""Below is the HTML content from the White House administration page:
 {clean_html}
@@ -321,27 +688,19 @@ async def get_president_party(llm_client: LLMClient) -> str:
 Identify the current President's political party (e.g. "Democratic Party" or "Republican Party").
 Return just the party name as plain text, like "Democratic" or "Republican".
 """
-    party = await llm_client.completion(prompt=prompt, model=GEMINI_FLASH)
+    party = await llm_client.completion(
+        prompt=prompt, model=GEMINI_FLASH, lane=LLMLane.REFRESH
+    )
     return party
 
 
-async def get_speaker_of_the_house(llm_client: LLMClient) -> str:
+async def get_speaker_of_the_house(llm_client: LLMClient, page_fetcher: PageFetcher) -> str:
     """
     Retrieves the name of the current Speaker of the House from:
     https://simple.wikipedia.org/wiki/Speaker_of_the_United_States_House_of_Representatives
     """
     url = "https://simple.wikipedia.org/wiki/Speaker_of_the_United_States_House_of_Representatives"
-    try:
-        response = requests.get(url, headers=HEADERS)
-        if response.status_code != 200:
-            raise ValueError(
-                f"HTTP error {response.status_code} while fetching Speaker info."
-            )
-    except requests.exceptions.RequestException as e:
-        raise ValueError(f"Request to fetch Speaker info failed: {str(e)}")
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    clean_html = extract_page_context(soup)
+    clean_html = await page_fetcher.fetch_page_context(url, "Speaker info")
 
     prompt = f"""Below is the HTML from Simple English Wikipedia about the Speaker of the House:
 {clean_html}
@@ -349,5 +708,7 @@ async def get_speaker_of_the_house(llm_client: LLMClient) -> str:
 Identify the current Speaker of the United States House of Representatives.
 Return only the name as plain text.
 """
-    speaker = await llm_client.completion(prompt=prompt, model=GEMINI_FLASH)
+    speaker = await llm_client.completion(
+        prompt=prompt, model=GEMINI_FLASH, lane=LLMLane.REFRESH
+    )
     return speaker
@@ -0,0 +1,25 @@
+import os
+import tempfile
+
+
+def write_atomically(file_path: str, payload: bytes) -> None:
+    """Write a file via a temporary file and a rename, so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(file_path))
+    try:
+        # mkstemp creates the file owner-only; keep the permissions of the file it replaces
+        try:
+            os.chmod(temp_path, os.stat(file_path).st_mode & 0o777)
+        except FileNotFoundError:
+            os.chmod(temp_path, 0o644)
+        with os.fdopen(fd, "wb") as file:
+            file.write(payload)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
@@ -1,16 +1,47 @@
+from src.ExamSessions import ExamSessionService
+from src.GradingService import GradingService
 from src.LLMClient import LLMClient
 from src.QuestionsService import QuestionsService
+from src.VerdictCache import VerdictCache
 
 
-questions_service = QuestionsService()
+# Nothing here does I/O at import time: the Gemini client is created on first
+# use and the question banks are loaded by the app's lifespan
+gemini_client = LLMClient()
+
+
+def get_gemini_client():
+    return gemini_client
+
+
+questions_service = QuestionsService(gemini_client)
 
 
 def get_questions_service():
     return questions_service
 
 
-gemini_client = LLMClient()
+verdict_cache = VerdictCache()
+questions_service.add_answers_changed_listener(
+    lambda test_type, question_id: verdict_cache.invalidate_question(
+        test_type.value, question_id
+    )
+)
 
 
-def get_gemini_client():
-    return gemini_client
+def get_verdict_cache():
+    return verdict_cache
+
+
+grading_service = GradingService(questions_service, verdict_cache)
+
+
+def get_grading_service():
+    return grading_service
+
+
+exam_session_service = ExamSessionService(questions_service, grading_service, gemini_client)
+
+
+def get_exam_session_service():
+    return exam_session_service
@@ -0,0 +1,74 @@
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Iterable
+from fastapi import Request, Response
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+
+
+def encode_json(content: Any) -> bytes:
+    """Compact JSON encoding shared by every pre-encoded body."""
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """A JSON response body encoded once, with its gzip form and strong ETag."""
+
+    raw: bytes
+    gzipped: bytes | None
+    etag: str
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "EncodedBody":
+        gzipped = gzip.compress(raw, mtime=0) if len(raw) >= GZIP_MIN_BYTES else None
+        return cls(raw, gzipped, f'"{hashlib.sha256(raw).hexdigest()[:32]}"')
+
+    @classmethod
+    def from_content(cls, content: Any) -> "EncodedBody":
+        return cls.from_bytes(encode_json(content))
+
+
+def join_json_array(key: str, fragments: Iterable[bytes]) -> bytes:
+    """Build {"<key>": [...]} from already encoded array items."""
+    return b'{"' + key.encode("utf-8") + b'":[' + b",".join(fragments) + b"]}"
+
+
+def _accepts_gzip(request: Request) -> bool:
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+
+def encoded_response(request: Request, body: EncodedBody) -> Response:
+    """
+    Respond with a pre-encoded body: 304 when the client already has it,
+    gzip when the client accepts it and a compressed form exists.
+    """
+    use_gzip = body.gzipped is not None and _accepts_gzip(request)
+    # A strong ETag identifies one representation, so the gzip form gets its own
+    etag = f'{body.etag[:-1]}-gzip"' if use_gzip else body.etag
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and (
+        if_none_match.strip() == "*"
+        or etag in (tag.strip() for tag in if_none_match.split(","))
+    ):
+        return Response(status_code=304, headers=headers)
+    if use_gzip and body.gzipped is not None:
+        headers["Content-Encoding"] = "gzip"
+        return Response(body.gzipped, media_type="application/json", headers=headers)
+    return Response(body.raw, media_type="application/json", headers=headers)
+
+
+def raw_json_response(request: Request, raw: bytes) -> Response:
+    """Respond with a per-request body assembled from encoded fragments (no ETag)."""
+    if len(raw) >= GZIP_MIN_BYTES and _accepts_gzip(request):
+        return Response(
+            gzip.compress(raw, compresslevel=1, mtime=0),
+            media_type="application/json",
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+        )
+    return Response(raw, media_type="application/json", headers={"Vary": "Accept-Encoding"})
@@ -0,0 +1,106 @@
+import random
+from typing import Container, Dict, List, Mapping, Protocol, Sequence, Set, TypeVar
+
+
+class HasId(Protocol):
+    @property
+    def id(self) -> int: ...
+
+
+T = TypeVar("T", bound=HasId)
+
+
+def sample_excluding(
+    pool: Sequence[T], k: int, rng: random.Random, excluded: Container[int] = ()
+) -> List[T]:
+    """
+    Draw up to k distinct items whose id is not excluded. Random probing of the
+    pool costs O(k) while most of it is eligible; a single pass over the
+    remaining items finishes the draw when exclusions make probing wasteful.
+    """
+    if k <= 0 or not pool:
+        return []
+    result: List[T] = []
+    probed: Set[int] = set()
+    max_probes = 4 * k + 16
+    while len(result) < k and len(probed) < len(pool) and max_probes > 0:
+        max_probes -= 1
+        index = rng.randrange(len(pool))
+        if index in probed:
+            continue
+        probed.add(index)
+        if pool[index].id not in excluded:
+            result.append(pool[index])
+    if len(result) < k and len(probed) < len(pool):
+        rest = [
+            item
+            for index, item in enumerate(pool)
+            if index not in probed and item.id not in excluded
+        ]
+        result.extend(rng.sample(rest, min(k - len(result), len(rest))))
+    return result
+
+
+def _proportional_quotas(sizes: Mapping[str, int], k: int) -> Dict[str, int]:
+    """Split k across strata in proportion to their sizes (largest remainder method)."""
+    total = sum(sizes.values())
+    if total == 0:
+        return {stratum: 0 for stratum in sizes}
+    exact = {stratum: k * size / total for stratum, size in sizes.items()}
+    quotas = {stratum: int(share) for stratum, share in exact.items()}
+    by_remainder = sorted(sizes, key=lambda stratum: exact[stratum] - quotas[stratum], reverse=True)
+    for stratum in by_remainder[: k - sum(quotas.values())]:
+        quotas[stratum] += 1
+    return quotas
+
+
+def stratified_sample(
+    strata: Mapping[str, Sequence[T]],
+    k: int,
+    rng: random.Random,
+    excluded: Container[int] = (),
+) -> List[T]:
+    """
+    Draw up to k items spread across the strata in proportion to their sizes.
+    When a stratum runs short (e.g. most of it was excluded), its share goes to
+    the others. The result is shuffled so strata are not grouped together.
+    """
+    result: List[T] = []
+    taken: Dict[str, Set[int]] = {stratum: set() for stratum in strata}
+    remaining = {stratum: len(pool) for stratum, pool in strata.items() if pool}
+    while len(result) < k and remaining:
+        quotas = _proportional_quotas(remaining, k - len(result))
+        progressed = False
+        for stratum, quota in quotas.items():
+            if quota <= 0:
+                continue
+            already = taken[stratum]
+            drawn = sample_excluding(
+                strata[stratum],
+                quota,
+                rng,
+                _ExcludedOrTaken(excluded, already),
+            )
+            already.update(item.id for item in drawn)
+            result.extend(drawn)
+            progressed = progressed or bool(drawn)
+            if len(drawn) < quota:
+                # Exhausted: every eligible item of this stratum is drawn
+                remaining.pop(stratum)
+            else:
+                remaining[stratum] = len(strata[stratum]) - len(already)
+        if not progressed:
+            break
+    rng.shuffle(result)
+    return result[:k]
+
+
+class _ExcludedOrTaken:
+    """Membership view over the caller's exclusions plus ids already drawn."""
+
+    def __init__(self, excluded: Container[int], taken: Set[int]) -> None:
+        self.excluded = excluded
+        self.taken = taken
+
+    def __contains__(self, item: object) -> bool:
+        return item in self.taken or item in self.excluded
@@ -0,0 +1,313 @@
+import asyncio
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+from src.GradingService import GradingResult, GradingService
+from src.LLMClient import LLMClient, LLMLane, LLMOverloadedError
+from src.LogPipeline import log_graded_answer
+from src.QuestionsService import TEST_CONFIGS, Question, QuestionBank, QuestionsService, TestType
+
+logger = logging.getLogger(__name__)
+
+# Sessions kept in memory; the least recently used one is dropped beyond this
+EXAM_SESSION_MAX_SESSIONS = int(os.getenv("EXAM_SESSION_MAX_SESSIONS", "10000"))
+# Idle time (seconds) after which a session expires
+EXAM_SESSION_TTL_SECONDS = float(os.getenv("EXAM_SESSION_TTL_SECONDS", "3600"))
+# Background grading: concurrent workers and answers waiting for one
+EXAM_GRADING_WORKERS = int(os.getenv("EXAM_GRADING_WORKERS", "8"))
+EXAM_GRADING_QUEUE_SIZE = int(os.getenv("EXAM_GRADING_QUEUE_SIZE", "1000"))
+# How long the results endpoint waits for grades still outstanding (seconds)
+EXAM_RESULTS_TIMEOUT_SECONDS = float(os.getenv("EXAM_RESULTS_TIMEOUT_SECONDS", "30"))
+
+
+class ExamSessionNotFoundError(LookupError):
+    """Raised for unknown or expired session ids."""
+
+
+class QuestionNotInSessionError(LookupError):
+    """Raised when an answer is submitted for a question the session did not draw."""
+
+
+class AlreadyAnsweredError(Exception):
+    """Raised when a question of the session was answered before."""
+
+
+@dataclass(slots=True)
+class ExamSession:
+    id: str
+    test_type: TestType
+    questions: Tuple[Question, ...]
+    # The bank the questions were drawn from; answers are graded against it
+    # even after a refresh publishes a newer one
+    bank: QuestionBank
+    pass_threshold: int
+    expires_at: float
+    answers: Dict[int, str] = field(default_factory=dict)
+    # question id -> grade, resolved by a grading worker
+    grades: Dict[int, "asyncio.Future[GradingResult]"] = field(default_factory=dict)
+
+
+@dataclass
+class ExamSessionStats:
+    created: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    answers_queued: int = 0
+    answers_graded: int = 0
+    grading_failures: int = 0
+
+
+class ExamSessionStore:
+    """
+    In-memory LRU + idle TTL store of exam sessions. Sessions are ordered by
+    last use, so expired ones are always at the front and are swept in O(1)
+    per session on every access.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = EXAM_SESSION_MAX_SESSIONS,
+        ttl_seconds: float = EXAM_SESSION_TTL_SECONDS,
+    ) -> None:
+        self.max_sessions = max(max_sessions, 1)
+        self.ttl_seconds = ttl_seconds
+        self.stats = ExamSessionStats()
+        self._sessions: OrderedDict[str, ExamSession] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _sweep(self, now: float) -> None:
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.expires_at > now:
+                break
+            self._sessions.popitem(last=False)
+            self.stats.expirations += 1
+
+    def add(
+        self, bank: QuestionBank, questions: List[Question], pass_threshold: int
+    ) -> ExamSession:
+        now = time.monotonic()
+        self._sweep(now)
+        session = ExamSession(
+            id=secrets.token_urlsafe(16),
+            test_type=bank.test_type,
+            questions=tuple(questions),
+            bank=bank,
+            pass_threshold=pass_threshold,
+            expires_at=now + self.ttl_seconds,
+        )
+        self._sessions[session.id] = session
+        self.stats.created += 1
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.stats.evictions += 1
+        return session
+
+    def get(self, session_id: str) -> ExamSession:
+        """Return a live session and extend its expiry; raises ExamSessionNotFoundError."""
+        now = time.monotonic()
+        self._sweep(now)
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise ExamSessionNotFoundError(f"Exam session {session_id} not found or expired")
+        session.expires_at = now + self.ttl_seconds
+        self._sessions.move_to_end(session_id)
+        return session
+
+
+# (session, question, answer, grade to resolve)
+GradingJob = Tuple[ExamSession, Question, str, "asyncio.Future[GradingResult]"]
+
+
+class ExamSessionService:
+    """
+    Server-side exams. Starting a session draws `questions_asked` questions
+    (`questions_asked_65_plus` of the 65/20 questions for older applicants);
+    each submitted answer is queued for a pool of background grading workers
+    and acknowledged at once, so the LLM call overlaps with the time the user
+    spends on the next question. Results wait only for the grades still
+    outstanding.
+    """
+
+    def __init__(
+        self,
+        questions_service: QuestionsService,
+        grading_service: GradingService,
+        llm_client: LLMClient,
+        store: ExamSessionStore | None = None,
+        workers: int = EXAM_GRADING_WORKERS,
+        queue_size: int = EXAM_GRADING_QUEUE_SIZE,
+    ) -> None:
+        self.questions_service = questions_service
+        self.grading_service = grading_service
+        self.llm_client = llm_client
+        self.store = store or ExamSessionStore()
+        self.workers = max(workers, 1)
+        self.queue_size = queue_size
+        self._queue: asyncio.Queue[GradingJob] | None = None
+        self._worker_tasks: List[asyncio.Task[None]] = []
+
+    def start_workers(self) -> None:
+        """Start the grading workers on the running event loop (see `lifespan` in main.py)."""
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._grading_worker()) for _ in range(self.workers)
+        ]
+
+    async def stop_workers(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def start_session(
+        self, test_type: TestType, for_65_plus: bool = False, seed: int | None = None
+    ) -> ExamSession:
+        config = TEST_CONFIGS[test_type]
+        # Like the real interview, 65/20 applicants answer 10 of their 20 questions
+        if for_65_plus:
+            asked, pass_threshold = config.questions_asked_65_plus, config.pass_threshold_65_plus
+        else:
+            asked, pass_threshold = config.questions_asked, config.pass_threshold
+        # draw_exam reads the same bank: nothing can publish a new one in between
+        bank = self.questions_service.get_bank(test_type)
+        questions = self.questions_service.draw_exam(
+            test_type,
+            asked,
+            seed=seed,
+            stratified=True,
+            for_65_plus=for_65_plus,
+        )
+        return self.store.add(bank, questions, pass_threshold)
+
+    def get_session(self, session_id: str) -> ExamSession:
+        return self.store.get(session_id)
+
+    def submit_answer(self, session_id: str, question_id: int, answer: str) -> None:
+        """
+        Record an answer and queue it for grading without waiting for the grade.
+        Raises LLMOverloadedError when the grading queue is full.
+        """
+        session = self.store.get(session_id)
+        question = next((q for q in session.questions if q.id == question_id), None)
+        if question is None:
+            raise QuestionNotInSessionError(
+                f"Question {question_id} is not part of exam session {session_id}"
+            )
+        if question_id in session.answers:
+            raise AlreadyAnsweredError(f"Question {question_id} was already answered")
+        if self._queue is None:
+            raise RuntimeError("Exam grading workers are not running")
+
+        grade: asyncio.Future[GradingResult] = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((session, question, answer, grade))
+        except asyncio.QueueFull:
+            raise LLMOverloadedError(LLMLane.GRADING, retry_after=1.0)
+        session.answers[question_id] = answer
+        session.grades[question_id] = grade
+        self.store.stats.answers_queued += 1
+
+    async def _grading_worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            session, question, answer, grade = await self._queue.get()
+            started = time.perf_counter()
+            try:
+                result = await self.grading_service.grade(
+                    session.test_type, question, answer, self.llm_client, session.bank
+                )
+            except asyncio.CancelledError:
+                grade.cancel()
+                raise
+            except Exception as e:
+                # Nobody is waiting on this request to retry it; degrade like an open breaker
+                logger.warning(
+                    "Background grading of question %d failed, using the fallback verdict: %s",
+                    question.id,
+                    e,
+                )
+                self.store.stats.grading_failures += 1
+                result = self.grading_service.grade_fallback(
+                    session.test_type, question, answer, session.bank
+                )
+            finally:
+                self._queue.task_done()
+            self.store.stats.answers_graded += 1
+            if not grade.done():
+                grade.set_result(result)
+            log_graded_answer(
+                session.test_type.value,
+                question.id,
+                result.is_correct,
+                result.graded_by,
+                time.perf_counter() - started,
+                len(answer),
+            )
+
+    async def get_results(
+        self, session_id: str, timeout: float = EXAM_RESULTS_TIMEOUT_SECONDS
+    ) -> Dict[str, Any]:
+        """Wait (up to `timeout`) for the outstanding grades and summarize the exam."""
+        session = self.store.get(session_id)
+        outstanding = [grade for grade in session.grades.values() if not grade.done()]
+        if outstanding:
+            # asyncio.wait never cancels the grades, even if this request is cancelled
+            await asyncio.wait(outstanding, timeout=timeout)
+
+        results: List[Dict[str, Any]] = []
+        correct_count = 0
+        complete = True
+        for question in session.questions:
+            grade = session.grades.get(question.id)
+            entry: Dict[str, Any] = {
+                "questionId": question.id,
+                "answered": grade is not None,
+                "answers": list(question.answers),
+            }
+            if grade is None:
+                entry.update(result="false", gradedBy="unanswered")
+            elif not grade.done() or grade.cancelled():
+                complete = False
+                entry.update(result="pending", gradedBy=None)
+            else:
+                grading = grade.result()
+                correct_count += grading.is_correct
+                entry.update(
+                    result="true" if grading.is_correct else "false",
+                    gradedBy=grading.graded_by,
+                )
+            results.append(entry)
+        return {
+            "sessionId": session.id,
+            "testType": session.test_type.value,
+            "results": results,
+            "complete": complete,
+            "answeredCount": len(session.grades),
+            "correctCount": correct_count,
+            "questionsAsked": len(session.questions),
+            "passThreshold": session.pass_threshold,
+            # Undecided while grades are outstanding: a pending answer may still pass it
+            "passed": correct_count >= session.pass_threshold if complete else None,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.store.stats
+        return {
+            "sessions": len(self.store),
+            "created": stats.created,
+            "evictions": stats.evictions,
+            "expirations": stats.expirations,
+            "answersQueued": stats.answers_queued,
+            "answersGraded": stats.answers_graded,
+            "gradingFailures": stats.grading_failures,
+            "queueDepth": self._queue.qsize() if self._queue is not None else 0,
+        }
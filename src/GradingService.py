@@ -0,0 +1,362 @@
+import json
+import logging
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+from src.LLMClient import (
+    LLMClient,
+    LLMOverloadedError,
+    LLMTimeoutError,
+    LLMUnavailableError,
+    gather_or_cancel,
+)
+from src.LocalGrader import (
+    STATE_CANDIDATES_LIMIT,
+    LocalVerdict,
+    PreparedQuestion,
+    grade_leniently,
+    grade_locally,
+)
+from src.QuestionsService import Question, QuestionBank, QuestionsService, TestType
+from src.VerdictCache import VerdictCache, VerdictKey, normalize_answer
+
+logger = logging.getLogger(__name__)
+
+# Max answers graded by a single LLM call in batch grading
+GRADING_BATCH_MAX_ITEMS = int(os.getenv("GRADING_BATCH_MAX_ITEMS", "10"))
+# Deadline (seconds) for grading a whole batch, including items regraded one by one
+GRADING_BATCH_TIMEOUT_SECONDS = float(os.getenv("GRADING_BATCH_TIMEOUT_SECONDS", "30"))
+
+_ANSWER_EVALUATION_GUIDELINES = """Guidelines:
+- The user's answer must not contain any incorrect information. If the user provides a list of items, all items in that list must be correct.
+- The answer doesn't need to match exactly - understand what the user means from context
+- For names of people: accept minor misspellings, different name orders (FirstName LastName vs LastName FirstName), and partial matches if the person is clearly identifiable
+- For questions about representatives/senators/governors: if the user names a correct person for ANY state/district, mark it correct (since the question asks about "your" state)
+- Be lenient with spelling variations but strict about the actual content being correct
+- The answer can't be too vague or generic
+- You should only compare the users answer to the Actual answers
+- You should judge in what cases the user provided enough information for the answer to be considered correct, and when it's not enough
+- You should judge the answer the same way an average officer on the naturalization interview would judge it"""
+
+# System instruction for answer evaluation - used as LLM system prompt
+ANSWER_EVALUATION_SYSTEM_INSTRUCTION = f"""You are an evaluator for U.S. civics test answers. You will be given a question, the correct answers, and a user's answer. You must determine if the user's answer is correct.
+
+{_ANSWER_EVALUATION_GUIDELINES}
+
+Reply only with the word "Correct" for a correct user's answer or the word "Incorrect" for an incorrect user's answer."""
+
+# System instruction for grading several answers in one LLM call
+BATCH_ANSWER_EVALUATION_SYSTEM_INSTRUCTION = f"""You are an evaluator for U.S. civics test answers. You will be given a numbered list of items, each with a question, the correct answers, and a user's answer. You must determine for every item if the user's answer is correct. Judge each item independently of the others.
+
+{_ANSWER_EVALUATION_GUIDELINES}
+
+Reply only with a JSON array containing one object per item, in the form:
+[{{"index": 0, "verdict": "Correct"}}, {{"index": 1, "verdict": "Incorrect"}}]"""
+
+
+@dataclass
+class GradingResult:
+    is_correct: bool
+    graded_by: str  # "local", "cache", "llm" or "fallback"
+
+
+class GradingService:
+    """
+    Grades user answers in tiers: a deterministic local matcher first, then the
+    verdict cache, and only then the LLM. While the grading lane's circuit breaker
+    is open, ambiguous answers get a lenient local string-match verdict instead.
+    """
+
+    def __init__(
+        self,
+        questions_service: QuestionsService,
+        verdict_cache: VerdictCache,
+    ) -> None:
+        self.questions_service = questions_service
+        self.verdict_cache = verdict_cache
+        self.graded_by_counts: Counter[str] = Counter()
+
+    def _bank(self, test_type: TestType, bank: QuestionBank | None) -> QuestionBank:
+        return bank if bank is not None else self.questions_service.get_bank(test_type)
+
+    def _prepared(
+        self, test_type: TestType, question: Question, bank: QuestionBank | None
+    ) -> PreparedQuestion:
+        return self._bank(test_type, bank).prepared[question.id]
+
+    def _cache_key(
+        self,
+        test_type: TestType,
+        question: Question,
+        answer: str,
+        bank: QuestionBank | None = None,
+    ) -> VerdictKey:
+        return (
+            test_type.value,
+            question.id,
+            normalize_answer(answer),
+            self._bank(test_type, bank).answers_versions[question.id],
+        )
+
+    async def grade(
+        self,
+        test_type: TestType,
+        question: Question,
+        answer: str,
+        llm_client: LLMClient,
+        bank: QuestionBank | None = None,
+    ) -> GradingResult:
+        """
+        Grade an answer, sharing the LLM call with identical in-flight requests.
+        `bank` is the bank the question was drawn from (default: the current one).
+        """
+        result = self.grade_locally(test_type, question, answer, bank)
+        if result is None:
+            key = self._cache_key(test_type, question, answer, bank)
+            try:
+                is_correct, source = await self.verdict_cache.get_or_compute(
+                    key,
+                    lambda: self._grade_with_llm(
+                        question,
+                        self._answers_for_prompt(test_type, question, answer, bank),
+                        answer,
+                        llm_client,
+                    ),
+                )
+                result = GradingResult(is_correct, "llm" if source == "miss" else "cache")
+            except LLMUnavailableError:
+                result = self.grade_fallback(test_type, question, answer, bank)
+        self.graded_by_counts[result.graded_by] += 1
+        return result
+
+    def grade_locally(
+        self,
+        test_type: TestType,
+        question: Question,
+        answer: str,
+        bank: QuestionBank | None = None,
+    ) -> GradingResult | None:
+        """Grade with the local matcher; None means the answer needs the LLM."""
+        prepared = self._prepared(test_type, question, bank)
+        verdict = grade_locally(prepared, answer)
+        if verdict == LocalVerdict.AMBIGUOUS:
+            return None
+        return GradingResult(verdict == LocalVerdict.CORRECT, "local")
+
+    def _answers_for_prompt(
+        self,
+        test_type: TestType,
+        question: Question,
+        answer: str,
+        bank: QuestionBank | None = None,
+    ) -> str:
+        """
+        The "Actual answers" shown to the LLM. Per-state listings are cut down
+        to the entries that resemble the user's answer.
+        """
+        prepared = self._prepared(test_type, question, bank)
+        if prepared.state_index is None:
+            return str(list(question.answers))
+        candidates = prepared.state_index.candidates(answer, STATE_CANDIDATES_LIMIT)
+        listing = "; ".join(f"{entry.state}: {entry.value}" for entry in candidates)
+        return f"[{listing}] (only the entries closest to the user's answer are listed)"
+
+    def grade_fallback(
+        self,
+        test_type: TestType,
+        question: Question,
+        answer: str,
+        bank: QuestionBank | None = None,
+    ) -> GradingResult:
+        """Degraded verdict used while the LLM is unavailable; never cached."""
+        prepared = self._prepared(test_type, question, bank)
+        return GradingResult(grade_leniently(prepared, answer), "fallback")
+
+    async def grade_batch(
+        self,
+        test_type: TestType,
+        items: List[Tuple[Question, str]],
+        llm_client: LLMClient,
+    ) -> List[GradingResult]:
+        """
+        Grade several answers together. Local and cached verdicts are resolved
+        first; the rest are packed into as few LLM calls as possible, and any
+        item a batch call fails to return a verdict for is graded on its own.
+        All of it shares one deadline of GRADING_BATCH_TIMEOUT_SECONDS.
+        """
+        deadline = time.monotonic() + GRADING_BATCH_TIMEOUT_SECONDS
+        # The items' questions were looked up in this bank; keep grading against it
+        bank = self.questions_service.get_bank(test_type)
+        results = [
+            self.grade_locally(test_type, question, answer, bank) for question, answer in items
+        ]
+        ambiguous = [index for index, result in enumerate(results) if result is None]
+        keys = [self._cache_key(test_type, *items[index], bank) for index in ambiguous]
+        # cache key -> the first item with it, which the prompts are built from
+        items_by_key: Dict[VerdictKey, Tuple[Question, str]] = {}
+        for key, index in zip(keys, ambiguous):
+            items_by_key.setdefault(key, items[index])
+
+        def remaining() -> float:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                raise LLMTimeoutError(
+                    f"Batch grading did not finish within {GRADING_BATCH_TIMEOUT_SECONDS:g}s"
+                )
+            return timeout
+
+        async def grade_packs(missed: List[VerdictKey]) -> Dict[VerdictKey, bool]:
+            packs = [
+                missed[i : i + GRADING_BATCH_MAX_ITEMS]
+                for i in range(0, len(missed), max(GRADING_BATCH_MAX_ITEMS, 1))
+            ]
+            timeout = remaining()
+            # One failed pack fails the batch; the other packs' calls are cancelled
+            pack_verdicts = await gather_or_cancel(
+                self._grade_pack_with_llm(
+                    [
+                        (
+                            question,
+                            self._answers_for_prompt(test_type, question, answer, bank),
+                            answer,
+                        )
+                        for question, answer in (items_by_key[key] for key in pack)
+                    ],
+                    llm_client,
+                    timeout,
+                )
+                for pack in packs
+            )
+            verdicts = {
+                key: verdict
+                for pack, verdicts in zip(packs, pack_verdicts)
+                for key, verdict in zip(pack, verdicts)
+                if verdict is not None
+            }
+            if len(verdicts) < len(missed):
+                logger.info("Grading %d batch items individually", len(missed) - len(verdicts))
+            return verdicts
+
+        async def grade_one(key: VerdictKey) -> bool:
+            question, answer = items_by_key[key]
+            return await self._grade_with_llm(
+                question,
+                self._answers_for_prompt(test_type, question, answer, bank),
+                answer,
+                llm_client,
+                remaining(),
+            )
+
+        try:
+            verdicts = await self.verdict_cache.get_or_compute_many(keys, grade_packs, grade_one)
+            for index, (is_correct, source) in zip(ambiguous, verdicts):
+                results[index] = GradingResult(is_correct, "llm" if source == "miss" else "cache")
+        except LLMUnavailableError:
+            # Keep the verdicts that made it into the cache before the breaker opened
+            for index, key in zip(ambiguous, keys):
+                cached = self.verdict_cache.get(key)
+                results[index] = (
+                    GradingResult(cached, "cache")
+                    if cached is not None
+                    else self.grade_fallback(test_type, *items[index], bank)
+                )
+
+        graded = [result for result in results if result is not None]
+        assert len(graded) == len(items)
+        self.graded_by_counts.update(result.graded_by for result in graded)
+        return graded
+
+    async def _grade_pack_with_llm(
+        self, pack: List[Tuple[Question, str, str]], llm_client: LLMClient, timeout: float
+    ) -> List[bool | None]:
+        """
+        Grade a pack of (question, actual answers, user answer) with one LLM call;
+        None marks items without a verdict.
+        """
+        verdicts: List[bool | None] = [None] * len(pack)
+        if len(pack) == 1:
+            # A lone item is cheaper to grade with the regular single-answer prompt
+            return verdicts
+
+        prompt = "\n\n".join(
+            f"""Item {index}:
+Question: {question.question}
+Actual answers: {actual_answers}
+User's answer: {answer}"""
+            for index, (question, actual_answers, answer) in enumerate(pack)
+        )
+        try:
+            result = await llm_client.completion(
+                prompt,
+                system_instruction=BATCH_ANSWER_EVALUATION_SYSTEM_INSTRUCTION,
+                max_output_tokens=512 + 64 * len(pack),
+                response_mime_type="application/json",
+                timeout=timeout,
+            )
+            parsed = json.loads(result)
+        except LLMOverloadedError:
+            # Fanning the pack out into individual calls would only add load
+            raise
+        except LLMUnavailableError:
+            # The items' own calls fail the same way, and the batch degrades to
+            # the fallback verdict
+            return verdicts
+        except Exception as e:
+            logger.warning("Batch grading call for %d items failed: %s", len(pack), e)
+            return verdicts
+
+        if not isinstance(parsed, list):
+            logger.warning("Batch grading returned unexpected JSON: %s", result[:200])
+            return verdicts
+        entries: List[Any] = parsed
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            index: Any = entry.get("index")
+            verdict: Any = entry.get("verdict")
+            if isinstance(index, int) and 0 <= index < len(pack) and isinstance(verdict, str):
+                if verdict.strip() in ("Correct", "Incorrect"):
+                    verdicts[index] = verdict.strip() == "Correct"
+        return verdicts
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return how many answers each tier decided."""
+        return {"gradedBy": dict(self.graded_by_counts)}
+
+    async def _grade_with_llm(
+        self,
+        question: Question,
+        actual_answers: str,
+        answer: str,
+        llm_client: LLMClient,
+        timeout: float | None = None,
+    ) -> bool:
+        prompt = f"""Question: {question.question}
+Actual answers: {actual_answers}
+User's answer: {answer}"""
+        # Streamed: the verdict is taken from the first word and the rest is cancelled
+        return await llm_client.completion_until(
+            prompt,
+            _streamed_verdict,
+            system_instruction=ANSWER_EVALUATION_SYSTEM_INSTRUCTION,
+            max_output_tokens=512,
+            timeout=timeout,
+        )
+
+
+def _streamed_verdict(text: str, finished: bool) -> bool | None:
+    """
+    The verdict in a (partial) single-answer grading reply, or None while the
+    text so far does not settle it. A reply that does not start with either
+    word is judged once complete, as `"Correct" in reply`.
+    """
+    reply = text.lstrip(" \t\n*\"'")
+    if reply.startswith("Incorrect"):
+        return False
+    if reply.startswith("Correct"):
+        return True
+    if finished:
+        return "Correct" in text
+    return None
@@ -1,20 +1,433 @@
+import asyncio
+import math
 import os
 import logging
-from google import genai
-from google.genai import types
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Mapping,
+    TypeVar,
+)
+import httpx
 from dotenv import load_dotenv
+from src.Metrics import LLM_CALL_DURATION, LLM_STREAMS, LLM_TOKENS, llm_caller
+
+if TYPE_CHECKING:
+    # The Gemini SDK dominates the app's import time, so it is only imported on
+    # first use (or by `LLMClient.warm_up`)
+    from google import genai
+    from google.genai import types
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+R = TypeVar("R")
+T = TypeVar("T")
+
 GEMINI_FLASH = os.getenv("GEMINI_MODEL", "gemini-3-flash-preview")
 
+# Admission control: at most LLM_MAX_IN_FLIGHT concurrent calls, with up to
+# LLM_MAX_QUEUE callers waiting per lane before new calls are shed.
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "32"))
+# Slots the refresh lane may occupy, so background refreshes never take them all
+LLM_REFRESH_MAX_IN_FLIGHT = int(os.getenv("LLM_REFRESH_MAX_IN_FLIGHT", "2"))
+
+# Per-call deadlines (queueing + all attempts), in seconds
+LLM_GRADING_TIMEOUT_SECONDS = float(os.getenv("LLM_GRADING_TIMEOUT_SECONDS", "20"))
+LLM_REFRESH_TIMEOUT_SECONDS = float(os.getenv("LLM_REFRESH_TIMEOUT_SECONDS", "180"))
+
+# Retries with jittered exponential backoff on 429 and 5xx responses
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY_SECONDS = float(os.getenv("LLM_RETRY_BASE_DELAY_SECONDS", "0.5"))
+LLM_RETRY_MAX_DELAY_SECONDS = float(os.getenv("LLM_RETRY_MAX_DELAY_SECONDS", "8"))
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Hedging: if a grading call has not answered within the LLM_HEDGE_PERCENTILE
+# latency of recent calls, fire a second request and take whichever returns first.
+# Set LLM_HEDGE_PERCENTILE=0 to disable.
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.9"))
+LLM_HEDGE_MIN_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "0.5"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+# Circuit breaker, one per lane: opens when at least LLM_BREAKER_FAILURE_RATE of
+# the last LLM_BREAKER_WINDOW calls failed, then lets one probe through after the
+# cool-down.
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "10"))
+LLM_BREAKER_FAILURE_RATE = float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+
+class LLMLane(str, Enum):
+    """Priority lanes for LLM calls; grading is always served before refresh."""
+
+    GRADING = "grading"
+    REFRESH = "refresh"
+
+
+class LLMOverloadedError(Exception):
+    """Raised when a call is shed because the wait queue for its lane is full."""
+
+    def __init__(self, lane: LLMLane, retry_after: float):
+        super().__init__(f"LLM {lane.value} queue is full; retry after {retry_after:.0f}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class LLMTimeoutError(TimeoutError):
+    """Raised when a call does not finish within its deadline."""
+
+
+class LLMUnavailableError(Exception):
+    """Raised without calling the LLM while the circuit breaker is open."""
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    from google.genai import errors
+
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (httpx.TimeoutException, httpx.NetworkError))
+
+
+async def gather_or_cancel(calls: Iterable[Awaitable[T]]) -> List[T]:
+    """
+    Like asyncio.gather, but when one call fails the others are cancelled
+    (and awaited) before its error is re-raised, so no LLM call is left running
+    unobserved. The error itself is raised as is, not wrapped in a group.
+    """
+    tasks = [asyncio.ensure_future(call) for call in calls]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+class AdmissionController:
+    """
+    Caps concurrent LLM calls. Waiters queue per lane; freed slots go to the
+    grading lane first, and the refresh lane is limited to a share of the slots.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = LLM_MAX_IN_FLIGHT,
+        max_queue: int = LLM_MAX_QUEUE,
+        refresh_max_in_flight: int = LLM_REFRESH_MAX_IN_FLIGHT,
+    ) -> None:
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_queue = max_queue
+        self.refresh_max_in_flight = max(min(refresh_max_in_flight, self.max_in_flight), 1)
+        self.in_flight: Dict[LLMLane, int] = {lane: 0 for lane in LLMLane}
+        self.shed: Dict[LLMLane, int] = {lane: 0 for lane in LLMLane}
+        self._waiters: Dict[LLMLane, Deque[asyncio.Future[None]]] = {
+            lane: deque() for lane in LLMLane
+        }
+        # Smoothed call latency, used to suggest a Retry-After to shed callers
+        self._average_latency = 1.0
+
+    @property
+    def total_in_flight(self) -> int:
+        return sum(self.in_flight.values())
+
+    def _has_capacity(self, lane: LLMLane) -> bool:
+        if self.total_in_flight >= self.max_in_flight:
+            return False
+        return lane != LLMLane.REFRESH or self.in_flight[lane] < self.refresh_max_in_flight
+
+    def _retry_after(self, lane: LLMLane) -> float:
+        queued = len(self._waiters[lane])
+        return max(1.0, math.ceil(queued * self._average_latency / self.max_in_flight))
+
+    def _wake_waiters(self) -> None:
+        for lane in (LLMLane.GRADING, LLMLane.REFRESH):
+            waiters = self._waiters[lane]
+            while waiters and self._has_capacity(lane):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    self.in_flight[lane] += 1
+                    waiter.set_result(None)
+
+    async def _acquire(self, lane: LLMLane) -> None:
+        waiters = self._waiters[lane]
+        if not waiters and self._has_capacity(lane):
+            self.in_flight[lane] += 1
+            return
+        if len(waiters) >= self.max_queue:
+            self.shed[lane] += 1
+            raise LLMOverloadedError(lane, self._retry_after(lane))
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just as we were cancelled; pass it on
+                self._release(lane)
+            else:
+                try:
+                    waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _release(self, lane: LLMLane) -> None:
+        self.in_flight[lane] -= 1
+        self._wake_waiters()
+
+    def try_acquire(self, lane: LLMLane) -> bool:
+        """Take a slot only if one is free right now, without queueing."""
+        if self._waiters[lane] or not self._has_capacity(lane):
+            return False
+        self.in_flight[lane] += 1
+        return True
+
+    def release(self, lane: LLMLane) -> None:
+        """Give back a slot taken with `try_acquire`."""
+        self._release(lane)
+
+    @asynccontextmanager
+    async def slot(self, lane: LLMLane) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the duration of the block."""
+        await self._acquire(lane)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._average_latency = 0.8 * self._average_latency + 0.2 * (
+                time.monotonic() - started
+            )
+            self._release(lane)
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "maxInFlight": self.max_in_flight,
+            "maxQueue": self.max_queue,
+            "inFlight": {lane.value: count for lane, count in self.in_flight.items()},
+            "queued": {lane.value: len(w) for lane, w in self._waiters.items()},
+            "shed": {lane.value: count for lane, count in self.shed.items()},
+        }
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker. While open every call is rejected; after the
+    cool-down a single probe is let through and its outcome closes or reopens it.
+    """
+
+    def __init__(
+        self,
+        window: int = LLM_BREAKER_WINDOW,
+        min_calls: int = LLM_BREAKER_MIN_CALLS,
+        failure_rate: float = LLM_BREAKER_FAILURE_RATE,
+        cooldown_seconds: float = LLM_BREAKER_COOLDOWN_SECONDS,
+        name: str = "LLM",
+    ) -> None:
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown_seconds = cooldown_seconds
+        self.state = BreakerState.CLOSED
+        self.times_opened = 0
+        self.rejected = 0
+        self._outcomes: Deque[bool] = deque(maxlen=max(window, 1))  # True = failure
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Return whether a call may go to the LLM now."""
+        if self.state == BreakerState.OPEN:
+            if time.monotonic() - self._opened_at < self.cooldown_seconds:
+                self.rejected += 1
+                return False
+            self.state = BreakerState.HALF_OPEN
+            logger.info("%s circuit breaker half-open; probing", self.name)
+        if self.state == BreakerState.HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        if self.state == BreakerState.HALF_OPEN:
+            logger.info("%s circuit breaker closed after a successful probe", self.name)
+            self.state = BreakerState.CLOSED
+            self._outcomes.clear()
+        self._probe_in_flight = False
+        self._outcomes.append(False)
+
+    def record_failure(self) -> None:
+        self._probe_in_flight = False
+        if self.state == BreakerState.HALF_OPEN:
+            self._open()
+            return
+        self._outcomes.append(True)
+        failures = sum(self._outcomes)
+        if (
+            self.state == BreakerState.CLOSED
+            and len(self._outcomes) >= self.min_calls
+            and failures / len(self._outcomes) >= self.failure_rate
+        ):
+            self._open()
+
+    def record_neutral(self) -> None:
+        """The call never reached the LLM (e.g. it was shed); free the probe slot."""
+        self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self.state = BreakerState.OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+        self._outcomes.clear()
+        logger.warning("%s circuit breaker opened for %gs", self.name, self.cooldown_seconds)
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "state": self.state.value,
+            "timesOpened": self.times_opened,
+            "rejected": self.rejected,
+            "recentFailures": sum(self._outcomes),
+            "recentCalls": len(self._outcomes),
+        }
+
+
+class HedgingPolicy:
+    """Tracks recent call latencies and decides when to fire a hedge request."""
+
+    def __init__(
+        self,
+        percentile: float = LLM_HEDGE_PERCENTILE,
+        min_delay_seconds: float = LLM_HEDGE_MIN_DELAY_SECONDS,
+        min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+        window: int = 200,
+    ) -> None:
+        self.percentile = percentile
+        self.min_delay_seconds = min_delay_seconds
+        self.min_samples = min_samples
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+    def record_latency(self, seconds: float) -> None:
+        self._latencies.append(seconds)
+
+    def hedge_delay(self) -> float | None:
+        """Seconds to wait before hedging, or None when hedging is off or uncalibrated."""
+        if self.percentile <= 0 or len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(int(self.percentile * len(ordered)), len(ordered) - 1)
+        return max(ordered[index], self.min_delay_seconds)
+
+    def get_stats(self) -> Dict[str, object]:
+        return {
+            "percentile": self.percentile,
+            "delaySeconds": self.hedge_delay(),
+            "fired": self.hedges_fired,
+            "hedgeWins": self.hedge_wins,
+            "primaryWins": self.primary_wins,
+            "hedgeWinRate": self.hedge_wins / self.hedges_fired if self.hedges_fired else 0.0,
+        }
+
+
+@dataclass
+class _StreamedDecision(Generic[T]):
+    decision: T
+    # Whether the decision was reached before the end of the stream
+    early: bool
+    usage_metadata: Any = None
+
+
+def _generate_config(
+    system_instruction: str | None,
+    max_output_tokens: int | None,
+    response_mime_type: str | None,
+) -> "types.GenerateContentConfig | None":
+    from google.genai import types
+
+    config_kwargs: dict[str, object] = {}
+    if system_instruction:
+        config_kwargs["system_instruction"] = system_instruction
+    if max_output_tokens is not None:
+        config_kwargs["max_output_tokens"] = max_output_tokens
+    if response_mime_type is not None:
+        config_kwargs["response_mime_type"] = response_mime_type
+    return types.GenerateContentConfig(**config_kwargs) if config_kwargs else None
+
+
+def lane_circuit_breakers() -> Dict[LLMLane, CircuitBreaker]:
+    """
+    One breaker per lane: slow or failing refresh calls must not push user
+    grading into the fallback verdict.
+    """
+    return {lane: CircuitBreaker(name=f"LLM {lane.value}") for lane in LLMLane}
+
+
+# Shared by every LLMClient so all calls in the process count against one cap
+default_admission_controller = AdmissionController()
+default_circuit_breakers = lane_circuit_breakers()
+
 
 class LLMClient:
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY", "")
-        self.client = genai.Client(api_key=api_key)
+    def __init__(
+        self,
+        admission: AdmissionController | None = None,
+        breakers: Mapping[LLMLane, CircuitBreaker] | None = None,
+    ):
+        self._client: "genai.Client | None" = None
+        self.admission = admission or default_admission_controller
+        self.breakers = breakers or default_circuit_breakers
+        self.hedging = HedgingPolicy()
+
+    @property
+    def client(self) -> "genai.Client":
+        """The Gemini client, created (and the SDK imported) on first use."""
+        if self._client is None:
+            from google import genai
+
+            self._client = genai.Client(api_key=os.getenv("GEMINI_API_KEY", ""))
+        return self._client
+
+    @client.setter
+    def client(self, client: "genai.Client") -> None:
+        self._client = client
+
+    @property
+    def is_warm(self) -> bool:
+        return self._client is not None
+
+    async def warm_up(self) -> None:
+        """Import the SDK and build the client in a worker thread, off the request path."""
+        if self._client is None:
+            await asyncio.to_thread(lambda: self.client)
 
     async def completion(
         self,
@@ -22,27 +435,245 @@ class LLMClient:
         model: str = GEMINI_FLASH,
         system_instruction: str | None = None,
         max_output_tokens: int | None = None,
+        response_mime_type: str | None = None,
+        lane: LLMLane = LLMLane.GRADING,
+        timeout: float | None = None,
     ) -> str:
-        config_kwargs: dict[str, object] = {}
-        if system_instruction:
-            config_kwargs["system_instruction"] = system_instruction
-        if max_output_tokens is not None:
-            config_kwargs["max_output_tokens"] = max_output_tokens
-        config = (
-            types.GenerateContentConfig(**config_kwargs) if config_kwargs else None
+        """
+        Generate a completion. The call waits for an admission slot in its lane,
+        is retried with jittered exponential backoff on retryable errors, and
+        fails with LLMTimeoutError if it does not finish within `timeout`.
+        Grading calls are hedged when slow, and every call fails fast with
+        LLMUnavailableError while its lane's circuit breaker is open.
+        """
+        config = _generate_config(system_instruction, max_output_tokens, response_mime_type)
+        response = await self._call(
+            lambda: self.client.aio.models.generate_content(  # type: ignore[reportUnknownMemberType]
+                model=model, contents=prompt, config=config
+            ),
+            model,
+            lane,
+            timeout,
+        )
+        if response.text is None:
+            raise ValueError("LLM returned empty response")
+        return response.text
+
+    async def completion_until(
+        self,
+        prompt: str,
+        decide: Callable[[str, bool], T | None],
+        model: str = GEMINI_FLASH,
+        system_instruction: str | None = None,
+        max_output_tokens: int | None = None,
+        lane: LLMLane = LLMLane.GRADING,
+        timeout: float | None = None,
+    ) -> T:
+        """
+        Stream a completion and return as soon as `decide(text so far, finished)`
+        returns something other than None; the rest of the stream is cancelled.
+        Admission, retries, hedging, the deadline and the circuit breaker work
+        as in `completion`.
+        """
+        config = _generate_config(system_instruction, max_output_tokens, None)
+        streamed = await self._call(
+            lambda: self._stream_until(model, prompt, config, decide),
+            model,
+            lane,
+            timeout,
         )
-        response = await self.client.aio.models.generate_content(  # type: ignore[reportUnknownMemberType]
+        LLM_STREAMS.labels(llm_caller.get(), "early" if streamed.early else "complete").inc()
+        return streamed.decision
+
+    async def _stream_until(
+        self,
+        model: str,
+        prompt: str,
+        config: "types.GenerateContentConfig | None",
+        decide: Callable[[str, bool], T | None],
+    ) -> _StreamedDecision[T]:
+        stream = await self.client.aio.models.generate_content_stream(  # type: ignore[reportUnknownMemberType]
             model=model, contents=prompt, config=config
         )
+        text = ""
+        usage: Any = None
+        try:
+            async for chunk in stream:
+                usage = chunk.usage_metadata or usage
+                if not chunk.text:
+                    continue
+                text += chunk.text
+                decision = decide(text, False)
+                if decision is not None:
+                    return _StreamedDecision(decision, True, usage)
+        finally:
+            # Closing the stream drops the HTTP response, so generation stops being billed
+            await stream.aclose()
+        decision = decide(text, True)
+        if decision is None:
+            raise ValueError(f"LLM response settled nothing: {text[:100]!r}")
+        return _StreamedDecision(decision, False, usage)
+
+    async def _call(
+        self,
+        attempt: Callable[[], Awaitable[R]],
+        model: str,
+        lane: LLMLane,
+        timeout: float | None,
+    ) -> R:
+        """Run `attempt` under the breaker, admission control, deadline, retries and hedging."""
+        from google.genai import errors
+
+        if timeout is None:
+            timeout = (
+                LLM_GRADING_TIMEOUT_SECONDS
+                if lane == LLMLane.GRADING
+                else LLM_REFRESH_TIMEOUT_SECONDS
+            )
+        deadline = time.monotonic() + timeout
+
+        caller = llm_caller.get()
+        breaker = self.breakers[lane]
+        if not breaker.allow():
+            LLM_CALL_DURATION.labels(caller, "unavailable").observe(0.0)
+            raise LLMUnavailableError(f"{breaker.name} circuit breaker is open")
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            async with asyncio.timeout(timeout):
+                async with self.admission.slot(lane):
+                    if lane == LLMLane.GRADING:
+                        response = await self._generate_hedged(attempt, deadline, lane)
+                    else:
+                        response = await self._generate_with_retries(attempt, deadline)
+            outcome = "success"
+        except LLMOverloadedError:
+            outcome = "overloaded"
+            breaker.record_neutral()
+            raise
+        except TimeoutError as e:
+            outcome = "timeout"
+            breaker.record_failure()
+            raise LLMTimeoutError(
+                f"LLM {lane.value} call did not finish within {timeout:g}s"
+            ) from e
+        except errors.ClientError as e:
+            # Our own bad requests say nothing about the LLM's health
+            if e.code in RETRYABLE_STATUS_CODES:
+                breaker.record_failure()
+            else:
+                breaker.record_neutral()
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            breaker.record_neutral()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        finally:
+            LLM_CALL_DURATION.labels(caller, outcome).observe(time.perf_counter() - started)
+        breaker.record_success()
+
         usage = getattr(response, "usage_metadata", None)
         if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_token_count", None)
+            candidate_tokens = getattr(usage, "candidates_token_count", None)
+            LLM_TOKENS.labels(caller, "prompt").inc(prompt_tokens or 0)
+            LLM_TOKENS.labels(caller, "candidates").inc(candidate_tokens or 0)
             logger.info(
-                "Gemini usage model=%s prompt_tokens=%s candidate_tokens=%s total_tokens=%s",
+                "Gemini usage caller=%s model=%s prompt_tokens=%s candidate_tokens=%s total_tokens=%s",
+                caller,
                 model,
-                getattr(usage, "prompt_token_count", None),
-                getattr(usage, "candidates_token_count", None),
+                prompt_tokens,
+                candidate_tokens,
                 getattr(usage, "total_token_count", None),
             )
-        if response.text is None:
-            raise ValueError("LLM returned empty response")
-        return response.text
+        return response
+
+    async def _generate_hedged(
+        self,
+        attempt: Callable[[], Awaitable[R]],
+        deadline: float,
+        lane: LLMLane,
+    ) -> R:
+        """
+        Run the call, and if it is slower than the hedge delay and a slot is free,
+        race a second identical request against it.
+        """
+        started = time.monotonic()
+        primary = asyncio.create_task(self._generate_with_retries(attempt, deadline))
+        delay = self.hedging.hedge_delay()
+        try:
+            if delay is not None:
+                await asyncio.wait({primary}, timeout=delay)
+            if primary.done() or delay is None or not self.admission.try_acquire(lane):
+                response = await primary
+                self.hedging.record_latency(time.monotonic() - started)
+                return response
+        except BaseException:
+            primary.cancel()
+            raise
+
+        self.hedging.hedges_fired += 1
+        hedge_started = time.monotonic()
+        hedge = asyncio.create_task(self._generate_with_retries(attempt, deadline))
+        pending = {primary, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedging.hedge_wins += 1
+                            self.hedging.record_latency(time.monotonic() - hedge_started)
+                        else:
+                            self.hedging.primary_wins += 1
+                            self.hedging.record_latency(time.monotonic() - started)
+                        return task.result()
+            # Both failed; surface the primary's error
+            return primary.result()
+        finally:
+            for task in (primary, hedge):
+                task.cancel()
+            self.admission.release(lane)
+
+    def get_stats(self) -> Dict[str, object]:
+        """Return admission, circuit breaker and hedging counters."""
+        return {
+            "admission": self.admission.get_stats(),
+            "breakers": {
+                lane.value: breaker.get_stats() for lane, breaker in self.breakers.items()
+            },
+            "hedging": self.hedging.get_stats(),
+        }
+
+    async def _generate_with_retries(
+        self, attempt: Callable[[], Awaitable[R]], deadline: float
+    ) -> R:
+        retries = 0
+        while True:
+            try:
+                return await attempt()
+            except Exception as e:
+                if not is_retryable_error(e) or retries >= LLM_MAX_RETRIES:
+                    raise
+                # Full jitter: sleep a random time up to the exponential backoff cap
+                delay = random.uniform(
+                    0,
+                    min(LLM_RETRY_MAX_DELAY_SECONDS, LLM_RETRY_BASE_DELAY_SECONDS * 2**retries),
+                )
+                if time.monotonic() + delay >= deadline:
+                    raise
+                retries += 1
+                logger.warning(
+                    "Retryable LLM error (attempt %d of %d), retrying in %.2fs: %s",
+                    retries,
+                    LLM_MAX_RETRIES,
+                    delay,
+                    e,
+                )
+                await asyncio.sleep(delay)
+
@@ -0,0 +1,441 @@
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+
+class LocalVerdict(str, Enum):
+    CORRECT = "correct"
+    INCORRECT = "incorrect"
+    AMBIGUOUS = "ambiguous"
+
+
+_NUMBER_UNITS: Dict[str, int] = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16,
+    "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+_NUMBER_TENS: Dict[str, int] = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60,
+    "seventy": 70, "eighty": 80, "ninety": 90,
+}
+_NUMBER_SCALES: Dict[str, int] = {"hundred": 100, "thousand": 1000}
+
+# Words that carry no meaning for matching purposes
+_STOPWORDS = frozenset({"a", "an", "the"})
+
+# Max per-state entries considered for one answer (and shown to the LLM)
+STATE_CANDIDATES_LIMIT = int(os.getenv("STATE_CANDIDATES_LIMIT", "20"))
+# Max distinct words of one answer looked up in a per-state index; the rest are ignored
+STATE_CANDIDATES_MAX_TOKENS = int(os.getenv("STATE_CANDIDATES_MAX_TOKENS", "16"))
+
+_PARENTHETICAL_RE = re.compile(r"\(([^)]*)\)")
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+# Dotted abbreviations ("u.s.", "d.c.") read as one word, not as optional initials
+_ABBREVIATION_RE = re.compile(r"\b[a-z](?:\.[a-z])+\b\.?")
+_ITEM_SEPARATOR_RE = re.compile(r"\s*(?:,|;|&|\band\b|\bor\b)\s*")
+# "What are two rights ...", "Name three ..." -> how many items the question wants
+_REQUIRED_ITEMS_RE = re.compile(
+    r"\b(?:name|what are|give|list)\s+(two|three|four|five)\b", re.IGNORECASE
+)
+
+
+def _strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _combine_number_words(tokens: List[str]) -> List[str]:
+    """Replace runs of number words ("four hundred thirty five") with digits ("435")."""
+    result: List[str] = []
+    total = 0
+    current = 0
+    in_number = False
+    for token in tokens:
+        if token in _NUMBER_UNITS or token in _NUMBER_TENS:
+            current += _NUMBER_UNITS.get(token, 0) + _NUMBER_TENS.get(token, 0)
+            in_number = True
+        elif token in _NUMBER_SCALES and in_number:
+            scale = _NUMBER_SCALES[token]
+            if scale == 100:
+                current = max(current, 1) * scale
+            else:
+                total += max(current, 1) * scale
+                current = 0
+        else:
+            if in_number:
+                result.append(str(total + current))
+                total = current = 0
+                in_number = False
+            result.append(token)
+    if in_number:
+        result.append(str(total + current))
+    return result
+
+
+def normalize_tokens(text: str) -> Tuple[str, ...]:
+    """
+    Normalize free text into comparable tokens: case-folded, accents and
+    punctuation removed, articles dropped, number words turned into digits.
+    """
+    text = _strip_accents(text).casefold().replace("-", " ")
+    text = _ABBREVIATION_RE.sub(lambda match: match.group().replace(".", ""), text)
+    text = _NON_WORD_RE.sub(" ", text)
+    tokens = _combine_number_words(text.split())
+    return tuple(t for t in tokens if t not in _STOPWORDS)
+
+
+def _answer_variants(answer: str) -> List[str]:
+    """Expand "a change (to the Constitution)" into the forms with and without the parenthetical."""
+    with_parenthetical = _PARENTHETICAL_RE.sub(r" \1 ", answer)
+    without_parenthetical = _PARENTHETICAL_RE.sub(" ", answer)
+    variants = [with_parenthetical]
+    if without_parenthetical.strip() and without_parenthetical != with_parenthetical:
+        variants.append(without_parenthetical)
+    return variants
+
+
+@dataclass(frozen=True)
+class PreparedAnswer:
+    text: str  # normalized tokens joined by a single space
+    tokens: FrozenSet[str]
+    # Tokens a partial answer must cover; single letters (middle initials) are optional
+    key_tokens: FrozenSet[str]
+
+
+def _prepare_answer(text: str) -> PreparedAnswer | None:
+    tokens = normalize_tokens(text)
+    if not tokens:
+        return None
+    token_set = frozenset(tokens)
+    return PreparedAnswer(
+        text=" ".join(tokens),
+        tokens=token_set,
+        key_tokens=frozenset(t for t in token_set if len(t) > 1),
+    )
+
+
+@dataclass(frozen=True)
+class StateAnswerEntry:
+    state: str
+    value: str  # as displayed, e.g. "Barry Moore (1st)"
+    answer: PreparedAnswer  # the name without its parenthetical
+
+
+class StateAnswerIndex:
+    """
+    Per-state answers (state -> names or cities) with a token index over the
+    entries, so an answer can be checked against the few entries it resembles
+    instead of the whole listing.
+    """
+
+    def __init__(self, answers_by_state: Dict[str, List[str]]) -> None:
+        self.answers_by_state = answers_by_state
+        entries: List[StateAnswerEntry] = []
+        for state, values in answers_by_state.items():
+            for value in values:
+                answer = _prepare_answer(_PARENTHETICAL_RE.sub(" ", value))
+                if answer is not None:
+                    entries.append(StateAnswerEntry(state, value, answer))
+        self.entries: Tuple[StateAnswerEntry, ...] = tuple(entries)
+
+        # token -> indexes of the entries containing it
+        self._by_token: Dict[str, List[int]] = {}
+        # token with up to two letters deleted -> index tokens, for typo-tolerant lookups
+        self._by_deletion: Dict[str, List[str]] = {}
+        # normalized state name -> indexes of that state's entries
+        self._by_state: Dict[str, List[int]] = {}
+        for index, entry in enumerate(self.entries):
+            for token in entry.answer.tokens:
+                self._by_token.setdefault(token, []).append(index)
+            self._by_state.setdefault(" ".join(normalize_tokens(entry.state)), []).append(index)
+        # A user token of 4+ letters may be one typo away from a 3-letter one
+        for token in self._by_token:
+            if len(token) >= 3 and not any(c.isdigit() for c in token):
+                for deletion in _deletions(token, _MAX_CANDIDATE_DISTANCE):
+                    self._by_deletion.setdefault(deletion, []).append(token)
+        self._max_token_length = max(map(len, self._by_token), default=0)
+
+    def _matching_tokens(self, token: str) -> List[str]:
+        """Index tokens equal to, or a plausible misspelling of, a user token."""
+        if token in self._by_token:
+            return [token]
+        if len(token) < 4 or any(c.isdigit() for c in token):
+            return []
+        # Looser than the verdict tolerance: this only picks what the LLM gets to see
+        max_distance = max(_max_edit_distance(token), 1)
+        if len(token) > self._max_token_length + max_distance:
+            return []
+        # Two words within the distance share a form with that many letters deleted
+        matches = {
+            candidate
+            for deletion in _deletions(token, max_distance)
+            for candidate in self._by_deletion.get(deletion, ())
+        }
+        return sorted(
+            candidate for candidate in matches
+            if _within_edit_distance(token, candidate, max_distance)
+        )
+
+    def mentioned_states(self, tokens: Tuple[str, ...]) -> List[str]:
+        """Normalized names of the states an answer mentions, e.g. "kay ivey alabama"."""
+        text = f" {' '.join(tokens)} "
+        mentioned = [state for state in self._by_state if f" {state} " in text]
+        # "west virginia" does not also mention "virginia"
+        return [
+            state for state in mentioned
+            if not any(other != state and f" {state} " in f" {other} " for other in mentioned)
+        ]
+
+    def named_state_entries(
+        self, entries: List[StateAnswerEntry], tokens: Tuple[str, ...]
+    ) -> List[StateAnswerEntry]:
+        """The entries belonging to a state the answer names; all of them if it names none."""
+        mentioned = self.mentioned_states(tokens)
+        if not mentioned:
+            return entries
+        named = {self.entries[self._by_state[state][0]].state for state in mentioned}
+        return [entry for entry in entries if entry.state in named]
+
+    def candidates(self, user_answer: str, limit: int) -> List[StateAnswerEntry]:
+        """
+        Entries whose names share a (near-)token with the answer or whose state
+        the answer mentions, best matches first.
+        """
+        tokens = normalize_tokens(user_answer)
+        scores: Dict[int, int] = {}
+        lookups = [token for token in dict.fromkeys(tokens) if len(token) >= 2]
+        for token in lookups[:STATE_CANDIDATES_MAX_TOKENS]:
+            for matched in self._matching_tokens(token):
+                for index in self._by_token[matched]:
+                    scores[index] = scores.get(index, 0) + 2
+        for state in self.mentioned_states(tokens):
+            for index in self._by_state[state]:
+                scores[index] = scores.get(index, 0) + 1
+        ranked = sorted(scores, key=lambda index: (-scores[index], index))
+        return [self.entries[index] for index in ranked[:limit]]
+
+
+@dataclass(frozen=True)
+class PreparedQuestion:
+    """Normalized forms of a question's answers, computed once when the bank is loaded."""
+
+    answers: Tuple[PreparedAnswer, ...]
+    required_items: int
+    # Set of accepted numbers when every answer is purely numeric (e.g. "nine (9)")
+    numeric_answers: FrozenSet[str] | None
+    # Answers that are free-text blobs (e.g. per-state listings) cannot be matched locally
+    is_matchable: bool
+    # Structured form of per-state answers (governors, senators, ...), when known
+    state_index: StateAnswerIndex | None = None
+
+
+def prepare_question(
+    question_text: str,
+    answers: List[str],
+    answers_by_state: Dict[str, List[str]] | None = None,
+) -> PreparedQuestion:
+    """Precompute the normalized answer forms used by `grade_locally`."""
+    prepared: Dict[str, PreparedAnswer] = {}
+    for answer in answers:
+        for variant in _answer_variants(answer):
+            prepared_answer = _prepare_answer(variant)
+            if prepared_answer is not None:
+                prepared[prepared_answer.text] = prepared_answer
+
+    numeric_answers: FrozenSet[str] | None = None
+    if prepared and all(
+        all(t.isdigit() for t in a.tokens) for a in prepared.values()
+    ):
+        numeric_answers = frozenset(t for a in prepared.values() for t in a.tokens)
+
+    match = _REQUIRED_ITEMS_RE.search(question_text)
+    required_items = _NUMBER_UNITS[match.group(1).lower()] if match else 1
+
+    return PreparedQuestion(
+        answers=tuple(prepared.values()),
+        required_items=required_items,
+        numeric_answers=numeric_answers,
+        is_matchable=bool(prepared) and not any("\n" in a for a in answers),
+        state_index=StateAnswerIndex(answers_by_state) if answers_by_state else None,
+    )
+
+
+def _max_edit_distance(token: str) -> int:
+    """Allowed typos for a word; short words and anything with a digit ("15th") must match exactly."""
+    if len(token) < 4 or any(c.isdigit() for c in token):
+        return 0
+    if len(token) < 8:
+        return 1
+    return 2
+
+
+# Typos tolerated when looking up per-state entries (see StateAnswerIndex._matching_tokens)
+_MAX_CANDIDATE_DISTANCE = 2
+
+
+def _deletions(token: str, max_distance: int) -> Set[str]:
+    """The token and every string made by deleting up to `max_distance` of its letters."""
+    result = {token}
+    frontier = {token}
+    for _ in range(max_distance):
+        frontier = {word[:i] + word[i + 1 :] for word in frontier for i in range(len(word))}
+        result |= frontier
+    return result
+
+
+def _within_edit_distance(a: str, b: str, max_distance: int) -> bool:
+    """Banded Levenshtein check that gives up as soon as the distance exceeds the limit."""
+    if abs(len(a) - len(b)) > max_distance:
+        return False
+    if max_distance == 0:
+        return a == b
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j, cb in enumerate(b, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            )
+            row_min = min(row_min, current[j])
+        if row_min > max_distance:
+            return False
+        previous = current
+    return previous[-1] <= max_distance
+
+
+def _fuzzy_token_in(token: str, candidates: FrozenSet[str]) -> str | None:
+    if token in candidates:
+        return token
+    max_distance = _max_edit_distance(token)
+    if max_distance == 0:
+        return None
+    for candidate in candidates:
+        if _within_edit_distance(token, candidate, max_distance):
+            return candidate
+    return None
+
+
+def _match_item(tokens: Tuple[str, ...], answers: Iterable[PreparedAnswer]) -> PreparedAnswer | None:
+    """Find the accepted answer a single user item confidently refers to."""
+    text = " ".join(tokens)
+    token_set = frozenset(tokens)
+    answers = tuple(answers)
+    for answer in answers:
+        if text == answer.text or token_set == answer.tokens:
+            return answer
+    for answer in answers:
+        # Every user token must be (a near-spelling of) an answer token, and the
+        # user must cover every key token, e.g. "Donald Trump" for "Donald J. Trump"
+        # or "Roberts John" for "John Roberts".
+        covered: set[str] = set()
+        for token in token_set:
+            matched = _fuzzy_token_in(token, answer.tokens)
+            if matched is None:
+                break
+            covered.add(matched)
+        else:
+            if answer.key_tokens <= covered:
+                return answer
+    return None
+
+
+def grade_locally(question: PreparedQuestion, user_answer: str) -> LocalVerdict:
+    """
+    Grade an answer without the LLM. Returns CORRECT or INCORRECT only when the
+    decision is certain; everything else is AMBIGUOUS and should go to the LLM.
+    """
+    tokens = normalize_tokens(user_answer)
+    if not tokens:
+        return LocalVerdict.INCORRECT
+    if question.state_index is not None:
+        return _grade_by_state(question.state_index, user_answer, tokens)
+    if not question.is_matchable:
+        return LocalVerdict.AMBIGUOUS
+
+    if question.numeric_answers is not None and all(t.isdigit() for t in tokens):
+        if set(tokens) <= question.numeric_answers:
+            return LocalVerdict.CORRECT
+        return LocalVerdict.INCORRECT
+
+    # The whole answer matches one accepted answer, e.g. "Senate and House"
+    if _match_item(tokens, question.answers) is not None:
+        if question.required_items <= 1:
+            return LocalVerdict.CORRECT
+        return LocalVerdict.AMBIGUOUS
+
+    # A list of items, e.g. "life, liberty" for "What are two rights ...?"
+    items = [
+        normalize_tokens(item)
+        for item in _ITEM_SEPARATOR_RE.split(user_answer)
+        if item.strip()
+    ]
+    items = [item for item in items if item]
+    if len(items) >= max(question.required_items, 2):
+        matched: set[str] = set()
+        for item in items:
+            answer = _match_item(item, question.answers)
+            if answer is None:
+                return LocalVerdict.AMBIGUOUS
+            matched.add(answer.text)
+        if len(matched) >= question.required_items:
+            return LocalVerdict.CORRECT
+    return LocalVerdict.AMBIGUOUS
+
+
+def _grade_by_state(
+    index: StateAnswerIndex, user_answer: str, tokens: Tuple[str, ...]
+) -> LocalVerdict:
+    """
+    Per-state answers: a name (or city) matching any state's entry is correct,
+    optionally followed by that state ("Kay Ivey, Alabama"). A name given with
+    another state ("Kay Ivey, California"), or resembling no entry (the
+    territories are not listed), is left to the LLM.
+    """
+    candidates = index.named_state_entries(
+        index.candidates(user_answer, STATE_CANDIDATES_LIMIT), tokens
+    )
+    if not candidates:
+        return LocalVerdict.AMBIGUOUS
+    answers = [entry.answer for entry in candidates]
+    if _match_item(tokens, answers) is not None:
+        return LocalVerdict.CORRECT
+    state_tokens = {
+        token for state in index.mentioned_states(tokens) for token in state.split()
+    }
+    name_tokens = tuple(token for token in tokens if token not in state_tokens)
+    if name_tokens and name_tokens != tokens and _match_item(name_tokens, answers) is not None:
+        return LocalVerdict.CORRECT
+    return LocalVerdict.AMBIGUOUS
+
+
+def grade_leniently(question: PreparedQuestion, user_answer: str) -> bool:
+    """
+    Best-effort verdict used when the LLM is unavailable: accept the answer if
+    it contains an accepted answer, or if all of its words appear in one.
+    """
+    verdict = grade_locally(question, user_answer)
+    if verdict != LocalVerdict.AMBIGUOUS:
+        return verdict == LocalVerdict.CORRECT
+    tokens = frozenset(normalize_tokens(user_answer))
+    answers = question.answers
+    if question.state_index is not None:
+        index = question.state_index
+        answers = tuple(
+            entry.answer
+            for entry in index.named_state_entries(
+                index.candidates(user_answer, STATE_CANDIDATES_LIMIT), normalize_tokens(user_answer)
+            )
+        )
+    for answer in answers:
+        if answer.key_tokens and answer.key_tokens <= tokens:
+            return True
+        if all(_fuzzy_token_in(token, answer.tokens) is not None for token in tokens):
+            return True
+    return False
@@ -0,0 +1,202 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, MutableMapping
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FILE = os.getenv("LOG_FILE", "app.log")
+# Size-based rotation by default; set LOG_ROTATE_WHEN (e.g. "midnight") to rotate by time
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")
+# Structured JSON lines of graded answers
+GRADING_LOG_FILE = os.getenv("GRADING_LOG_FILE", "grading.log")
+# "route=rate" pairs, e.g. "/api/questions=0.1,/api/questions/{question_id}=0.1":
+# keep only that share of INFO records logged while serving those routes
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+
+LOG_FORMAT = (
+    "%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d - %(funcName)s()] - %(message)s"
+)
+
+# Logger of the structured grading events; its records only go to GRADING_LOG_FILE
+grading_events = logging.getLogger("grading_events")
+
+# ASGI scope of the request being served, used to sample logs by route
+_request_scope: ContextVar[MutableMapping[str, Any] | None] = ContextVar(
+    "request_scope", default=None
+)
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    rates: Dict[str, float] = {}
+    for pair in spec.split(","):
+        if "=" not in pair:
+            continue
+        route, rate = pair.rsplit("=", 1)
+        try:
+            rates[route.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+class RouteSamplingFilter(logging.Filter):
+    """Drop a share of INFO-and-below records logged while serving a sampled route."""
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not self.rates:
+            return True
+        scope = _request_scope.get()
+        if scope is None:
+            return True
+        # The router stores the matched route on the scope before the endpoint runs
+        route_path = getattr(scope.get("route"), "path", None)
+        rate = self.rates.get(route_path) if route_path else None
+        return rate is None or random.random() < rate
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: time, level, message and the record's `fields`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "event": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if isinstance(fields, dict):
+            entry.update(fields)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _file_handler(path: str) -> logging.Handler:
+    if LOG_ROTATE_WHEN:
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+    return logging.handlers.RotatingFileHandler(
+        path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+    )
+
+
+class _OnlyLogger(logging.Filter):
+    def __init__(self, name: str, include: bool) -> None:
+        super().__init__()
+        self.logger_name = name
+        self.include = include
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return (record.name == self.logger_name) == self.include
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def configure_logging() -> None:
+    """
+    Route all logging through a queue: request handlers only enqueue records,
+    and a background thread formats them and writes the console, the rotating
+    app log and the grading JSON lines. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    text_formatter = logging.Formatter(LOG_FORMAT)
+    text_handlers: List[logging.Handler] = [logging.StreamHandler(), _file_handler(LOG_FILE)]
+    for handler in text_handlers:
+        handler.setFormatter(text_formatter)
+        handler.addFilter(_OnlyLogger(grading_events.name, include=False))
+    grading_handler = _file_handler(GRADING_LOG_FILE)
+    grading_handler.setFormatter(JsonLinesFormatter())
+    grading_handler.addFilter(_OnlyLogger(grading_events.name, include=True))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RouteSamplingFilter(parse_sample_rates(LOG_SAMPLE_RATES)))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, *text_handlers, grading_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush the queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def log_graded_answer(
+    test_type: str,
+    question_id: int,
+    is_correct: bool,
+    graded_by: str,
+    duration_seconds: float,
+    answer_length: int,
+    batch: bool = False,
+) -> None:
+    """Emit one structured grading event (the answer text itself is not logged)."""
+    grading_events.info(
+        "answer_graded",
+        extra={
+            "fields": {
+                "testType": test_type,
+                "questionId": question_id,
+                "isCorrect": is_correct,
+                "gradedBy": graded_by,
+                "durationMs": round(duration_seconds * 1000, 3),
+                "answerLength": answer_length,
+                "batch": batch,
+            }
+        },
+    )
+
+
+ASGIApp = Callable[
+    [MutableMapping[str, Any], Callable[[], Awaitable[Any]], Callable[[Any], Awaitable[None]]],
+    Awaitable[None],
+]
+
+
+class LogContextMiddleware:
+    """ASGI middleware exposing the current request to the route sampling filter."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+        self,
+        scope: MutableMapping[str, Any],
+        receive: Callable[[], Awaitable[Any]],
+        send: Callable[[Any], Awaitable[None]],
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(token)
@@ -0,0 +1,297 @@
+import asyncio
+import bisect
+import logging
+import math
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Generic, List, MutableMapping, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets (seconds) for HTTP requests and LLM calls
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+REFRESH_BUCKETS: Tuple[float, ...] = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+LOOP_LAG_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Who an LLM call is made for: "grading" or the name of a dynamic question fetcher
+llm_caller: ContextVar[str] = ContextVar("llm_caller", default="grading")
+
+LabelValues = Tuple[str, ...]
+ChildT = TypeVar("ChildT")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric(Generic[ChildT]):
+    """
+    A metric family with labelled children. Children are plain objects updated
+    without locks: everything is recorded from the event loop thread.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: Dict[LabelValues, ChildT] = {}
+        REGISTRY.append(self)
+
+    def _new_child(self) -> ChildT:
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> ChildT:
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    def children(self) -> Dict[LabelValues, ChildT]:
+        """The labelled children recorded so far (read by the benchmarks)."""
+        return dict(self._children)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: LabelValues, child: ChildT) -> List[str]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric[_Value]):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def _render_child(self, values: LabelValues, child: _Value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        # Per-bucket (non-cumulative) counts; the last slot is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric[_HistogramValue]):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def _render_child(self, values: LabelValues, child: _HistogramValue) -> List[str]:
+        lines: List[str] = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), child.counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+REGISTRY: List[_Metric[Any]] = []
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template, method and status code.",
+    ("route", "method", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+)
+RATE_LIMITED_REQUESTS = Counter(
+    "rate_limited_requests_total",
+    "Requests rejected with 429 by limit (grading or read).",
+    ("limit",),
+)
+LLM_CALL_DURATION = Histogram(
+    "llm_call_duration_seconds",
+    "LLM completion latency (queueing, retries and hedges included) by caller and outcome.",
+    ("caller", "outcome"),
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "LLM tokens used by caller and kind (prompt or candidates).",
+    ("caller", "kind"),
+)
+LLM_STREAMS = Counter(
+    "llm_streams_total",
+    "Streamed LLM completions by caller and end: early (decided mid-stream, then cancelled) or complete.",
+    ("caller", "end"),
+)
+DYNAMIC_REFRESH_DURATION = Histogram(
+    "dynamic_refresh_duration_seconds",
+    "Duration of a full dynamic question refresh.",
+    buckets=REFRESH_BUCKETS,
+)
+DYNAMIC_REFRESH_LAST_SUCCESS = Gauge(
+    "dynamic_refresh_last_success_timestamp_seconds",
+    "Unix time of the last dynamic question refresh that finished without failures.",
+)
+DYNAMIC_FETCHER_RUNS = Counter(
+    "dynamic_fetcher_runs_total",
+    "Dynamic question fetcher runs by fetcher and outcome.",
+    ("fetcher", "outcome"),
+)
+DYNAMIC_FETCHER_LAST_SUCCESS = Gauge(
+    "dynamic_fetcher_last_success_timestamp_seconds",
+    "Unix time of the last successful run of each dynamic question fetcher.",
+    ("fetcher",),
+)
+DYNAMIC_FETCHER_NEXT_RUN = Gauge(
+    "dynamic_fetcher_next_run_timestamp_seconds",
+    "Unix time each dynamic question fetcher is next due to run.",
+    ("fetcher",),
+)
+DYNAMIC_PAGE_FETCH_DURATION = Histogram(
+    "dynamic_page_fetch_duration_seconds",
+    "Source page download time during dynamic refreshes, by host.",
+    ("host",),
+)
+DYNAMIC_PAGE_PARSE_DURATION = Histogram(
+    "dynamic_page_parse_duration_seconds",
+    "Source page parsing time (text extraction, chunking or structured parsers) during dynamic refreshes.",
+    ("kind",),
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a periodic probe.",
+    buckets=LOOP_LAG_BUCKETS,
+)
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+ASGIApp = Callable[
+    [MutableMapping[str, Any], Callable[[], Awaitable[Any]], Callable[[Any], Awaitable[None]]],
+    Awaitable[None],
+]
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency per route template and status, and the
+    number of requests in flight. Labels use the matched route's path template
+    (e.g. "/api/questions/{question_id}") so ids do not explode cardinality.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(
+        self,
+        scope: MutableMapping[str, Any],
+        receive: Callable[[], Awaitable[Any]],
+        send: Callable[[Any], Awaitable[None]],
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = "500"
+
+        async def send_with_status(message: Any) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.labels().inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.labels().dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(route_path, scope.get("method", ""), status).observe(
+                time.perf_counter() - started
+            )
+
+
+async def monitor_event_loop_lag(interval: float | None = None) -> None:
+    """
+    Probe how late the loop wakes a sleeping task; runs until cancelled.
+    The interval defaults to METRICS_LOOP_LAG_INTERVAL_SECONDS, read here
+    rather than at import so a value from .env is honoured.
+    """
+    if interval is None:
+        interval = float(os.getenv("METRICS_LOOP_LAG_INTERVAL_SECONDS", "0.5"))
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.labels().observe(max(time.perf_counter() - started - interval, 0.0))
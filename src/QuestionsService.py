@@ -1,12 +1,33 @@
+import asyncio
 import json
 import logging
-from dataclasses import dataclass
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import List, Dict, Any
+from types import MappingProxyType
+from typing import Callable, Collection, List, Dict, Any, Mapping, Sequence, Set, Tuple
+from src.AtomicFiles import write_atomically
 from src.LLMClient import LLMClient
+from src.EncodedResponses import EncodedBody
+from src.ExamGenerator import sample_excluding, stratified_sample
+from src.LocalGrader import PreparedQuestion, prepare_question
+from src.Metrics import (
+    DYNAMIC_FETCHER_LAST_SUCCESS,
+    DYNAMIC_FETCHER_RUNS,
+    DYNAMIC_REFRESH_DURATION,
+    DYNAMIC_REFRESH_LAST_SUCCESS,
+    llm_caller,
+)
+from src.SourcePageParsers import parse_state_mapping_text
 from src.AnswersToDynamicQuestions import (
     DynamicQuestionFetcher,
+    PageFetcher,
+    PageNotModified,
+    SourceUnchanged,
     get_governor_by_state,
     get_senators_by_state,
     get_representative,
@@ -22,6 +43,9 @@ from src.AnswersToDynamicQuestions import (
 # Create a module-level logger.
 logger = logging.getLogger(__name__)
 
+# Max dynamic questions refreshed at the same time
+DYNAMIC_UPDATE_CONCURRENCY = int(os.getenv("DYNAMIC_UPDATE_CONCURRENCY", "4"))
+
 
 class TestType(str, Enum):
     TEST_2008 = "2008"  # 100 questions, 10 asked, 6 to pass
@@ -35,6 +59,10 @@ class TestConfig:
     total_questions: int
     questions_asked: int
     pass_threshold: int
+    # Applicants 65 or older with 20 years as a permanent resident are asked
+    # fewer questions, drawn from the 20 marked for them
+    questions_asked_65_plus: int
+    pass_threshold_65_plus: int
     description: str
     filing_date_info: str
 
@@ -47,6 +75,8 @@ TEST_CONFIGS: Dict[TestType, TestConfig] = {
         total_questions=100,
         questions_asked=10,
         pass_threshold=6,
+        questions_asked_65_plus=10,
+        pass_threshold_65_plus=6,
         description="2008 Civics Test (100 Questions)",
         filing_date_info="For applications filed BEFORE October 20, 2025",
     ),
@@ -56,6 +86,8 @@ TEST_CONFIGS: Dict[TestType, TestConfig] = {
         total_questions=128,
         questions_asked=20,
         pass_threshold=12,
+        questions_asked_65_plus=10,
+        pass_threshold_65_plus=6,
         description="2025 Civics Test (128 Questions)",
         filing_date_info="For applications filed ON OR AFTER October 20, 2025",
     ),
@@ -88,80 +120,275 @@ DYNAMIC_QUESTION_MAP_2025: Dict[int, DynamicQuestionFetcher] = {
 }
 
 
+@dataclass(frozen=True, slots=True)
 class Question:
-    def __init__(
-        self,
+    """
+    One question of a bank. Immutable: a refresh builds replacement questions
+    (`dataclasses.replace`) and publishes them in a new `QuestionBank`.
+    """
+
+    id: int
+    section: str
+    question: str
+    answers: Tuple[str, ...]
+    is_required_for_65_plus: bool
+    is_dynamic_answer: bool
+    last_time_updated: str | None
+    # Hash of the source page text the dynamic answer was extracted from
+    source_fingerprint: str | None = None
+
+    @classmethod
+    def create(
+        cls,
         id: int,
         section: str,
         question: str,
-        answers: List[str],
+        answers: Sequence[str],
         is_required_for_65_plus: bool,
         is_dynamic_answer: bool,
         last_time_updated: str | None,
-    ):
-        self.id = id
-        self.section = section
-        self.question = question
-        self.answers = answers
-        self.is_required_for_65_plus = is_required_for_65_plus
-        self.is_dynamic_answer = is_dynamic_answer
-        self.last_time_updated = last_time_updated
-
-    def __repr__(self) -> str:
-        return (
-            f"Question(id={self.id}, section='{self.section}', question='{self.question}', "
-            f"answers={self.answers}, is_required_for_65_plus={self.is_required_for_65_plus}, "
-            f"is_dynamic_answer={self.is_dynamic_answer}, last_time_updated={self.last_time_updated})"
+        source_fingerprint: str | None = None,
+    ) -> "Question":
+        """Build a question; section names are interned as every bank repeats a handful of them."""
+        return cls(
+            id,
+            sys.intern(section),
+            question,
+            tuple(answers),
+            is_required_for_65_plus,
+            is_dynamic_answer,
+            last_time_updated,
+            source_fingerprint,
         )
 
+    def to_api_dict(self) -> Dict[str, Any]:
+        """
+        The question as served by the API (attribute names, snake_case). The
+        source fingerprint is refresh bookkeeping and stays in the bank file only.
+        """
+        return {
+            "id": self.id,
+            "section": self.section,
+            "question": self.question,
+            "answers": list(self.answers),
+            "is_required_for_65_plus": self.is_required_for_65_plus,
+            "is_dynamic_answer": self.is_dynamic_answer,
+            "last_time_updated": self.last_time_updated,
+        }
+
     def to_dict(self) -> Dict[str, Any]:
         return {
             "id": self.id,
             "section": self.section,
             "question": self.question,
-            "answers": self.answers,
+            "answers": list(self.answers),
             "isRequiredFor65Plus": self.is_required_for_65_plus,
             "isDynamicAnswer": self.is_dynamic_answer,
             "lastTimeUpdated": self.last_time_updated,
+            "sourceFingerprint": self.source_fingerprint,
         }
 
 
-class QuestionsService:
-    def __init__(self) -> None:
-        self.llm_client = LLMClient()
-        self.question_banks: Dict[TestType, List[Question]] = {}
-        self.question_by_ids: Dict[TestType, Dict[int, Question]] = {}
+def _prepare_question(question: Question) -> PreparedQuestion:
+    """
+    Precompute the local grading forms of a question. Per-state answer
+    listings (governors, senators, ...) are parsed into a state -> values map.
+    """
+    answers_by_state = None
+    if question.is_dynamic_answer:
+        answers_by_state = parse_state_mapping_text("\n".join(question.answers))
+    return prepare_question(question.question, list(question.answers), answers_by_state)
+
+
+@dataclass(frozen=True, slots=True)
+class QuestionBank:
+    """
+    Immutable, versioned snapshot of one test's questions with its indexes and
+    pre-encoded response bodies built up front. It is never modified; updates
+    build a new bank and publish it with a single reference swap, so a reader
+    holding a bank always sees one consistent state.
+    """
+
+    test_type: TestType
+    # Bumped on every publish; usable in cache keys covering the whole bank
+    version: int
+    questions: Tuple[Question, ...]
+    by_id: Mapping[int, Question]
+    dynamic_questions: Tuple[Question, ...]
+    static_questions: Tuple[Question, ...]
+    required_for_65_plus: Tuple[Question, ...]
+    # Section name -> its questions, in bank order
+    by_section: Mapping[str, Tuple[Question, ...]]
+    # Same, for the questions of required_for_65_plus only
+    required_for_65_plus_by_section: Mapping[str, Tuple[Question, ...]]
+    # Normalized answer forms for the local grading tier
+    prepared: Mapping[int, PreparedQuestion]
+    # Bumped every time a question's answers change; used in grading cache keys
+    answers_versions: Mapping[int, int]
+    encoded_questions: Mapping[int, EncodedBody]
+    encoded_dynamic_questions: EncodedBody
+
+    @classmethod
+    def build(
+        cls,
+        test_type: TestType,
+        questions: Sequence[Question],
+        previous: "QuestionBank | None" = None,
+    ) -> "QuestionBank":
+        """
+        Build a bank, reusing the prepared and encoded forms of the questions
+        `previous` already had unchanged.
+        """
+        by_id: Dict[int, Question] = {}
+        prepared: Dict[int, PreparedQuestion] = {}
+        answers_versions: Dict[int, int] = {}
+        encoded_questions: Dict[int, EncodedBody] = {}
+        for question in questions:
+            by_id[question.id] = question
+            old = previous.by_id.get(question.id) if previous is not None else None
+            if previous is not None and old is not None and old.answers == question.answers:
+                prepared[question.id] = previous.prepared[question.id]
+                answers_versions[question.id] = previous.answers_versions[question.id]
+            else:
+                prepared[question.id] = _prepare_question(question)
+                answers_versions[question.id] = (
+                    previous.answers_versions[question.id] + 1
+                    if previous is not None and old is not None
+                    else 0
+                )
+            if previous is not None and old is question:
+                encoded_questions[question.id] = previous.encoded_questions[question.id]
+            else:
+                encoded_questions[question.id] = EncodedBody.from_content(question.to_api_dict())
+
+        by_section: Dict[str, List[Question]] = {}
+        required_for_65_plus_by_section: Dict[str, List[Question]] = {}
+        for question in questions:
+            by_section.setdefault(question.section, []).append(question)
+            if question.is_required_for_65_plus:
+                required_for_65_plus_by_section.setdefault(question.section, []).append(question)
+        dynamic_questions = tuple(q for q in questions if q.is_dynamic_answer)
+        return cls(
+            test_type=test_type,
+            version=previous.version + 1 if previous is not None else 0,
+            questions=tuple(questions),
+            by_id=MappingProxyType(by_id),
+            dynamic_questions=dynamic_questions,
+            static_questions=tuple(q for q in questions if not q.is_dynamic_answer),
+            required_for_65_plus=tuple(q for q in questions if q.is_required_for_65_plus),
+            by_section=MappingProxyType(
+                {section: tuple(items) for section, items in by_section.items()}
+            ),
+            required_for_65_plus_by_section=MappingProxyType(
+                {
+                    section: tuple(items)
+                    for section, items in required_for_65_plus_by_section.items()
+                }
+            ),
+            prepared=MappingProxyType(prepared),
+            answers_versions=MappingProxyType(answers_versions),
+            encoded_questions=MappingProxyType(encoded_questions),
+            encoded_dynamic_questions=EncodedBody.from_content(
+                {"questions": [q.to_api_dict() for q in dynamic_questions]}
+            ),
+        )
+
+
+@dataclass
+class RefreshReport:
+    """Outcome of one dynamic question refresh, counted per fetcher run."""
+
+    extracted: int = 0  # source changed; answer re-extracted with the LLM
+    skipped_unchanged: int = 0  # same content fingerprint; previous answer reused
+    not_modified: int = 0  # HTTP 304; previous answer reused
+    failed: int = 0
+    failed_fetchers: List[str] = field(default_factory=list)
+
+
+# Called with (test_type, question_id) after a question's answers change
+AnswersChangedListener = Callable[[TestType, int], None]
 
-        # Load all question banks
+# Replacement questions produced by a refresh, per test type and question id
+QuestionUpdates = Dict[TestType, Dict[int, Question]]
+
+
+class QuestionsService:
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        page_fetcher_factory: Callable[[], PageFetcher] = PageFetcher,
+    ) -> None:
+        # Shared with grading, so refreshes count against the same admission cap
+        self.llm_client = llm_client
+        # Builds the PageFetcher of each refresh run (replaced by the refresh benchmark)
+        self.page_fetcher_factory = page_fetcher_factory
+        # Current snapshot per test type; replaced as a whole, never mutated
+        self.banks: Dict[TestType, QuestionBank] = {}
+        self._answers_changed_listeners: List[AnswersChangedListener] = []
+        # Banks published since they were last written to disk
+        self._dirty: Set[TestType] = set()
+        self._save_lock = asyncio.Lock()
+        # (mtime, size) of each bank's JSON file as last loaded or saved by this process
+        self._loaded_stamps: Dict[TestType, Tuple[int, int]] = {}
+        self.encoded_test_configs = EncodedBody.from_content({"configs": self.get_test_configs()})
+
+    @property
+    def is_loaded(self) -> bool:
+        return len(self.banks) == len(TEST_CONFIGS)
+
+    def load_banks(self) -> None:
+        """Load all question banks; called once at startup (see `lifespan` in main.py)."""
+        if self.is_loaded:
+            return
         for test_type, config in TEST_CONFIGS.items():
-            self._load_questions(test_type, config.questions_file)
+            try:
+                self._loaded_stamps[test_type] = self._json_stamp(config.questions_file)
+            except FileNotFoundError:
+                pass
+            self.banks[test_type] = QuestionBank.build(
+                test_type, self._load_questions(test_type, config.questions_file)
+            )
 
-    def _load_questions(self, test_type: TestType, file_path: str) -> None:
-        """Load questions from a JSON file for a specific test type."""
+    def _load_questions(self, test_type: TestType, file_path: str) -> List[Question]:
+        """Load questions for a specific test type from its JSON file."""
         logger.info("Loading questions for %s from %s", test_type.value, file_path)
         try:
             with open(file_path, "r") as file:
                 data = json.load(file)
-                questions: List[Question] = []
-                for q in data["questions"]:
-                    question_obj = Question(
-                        id=q["id"],
-                        section=q["section"],
-                        question=q["question"],
-                        answers=q["answers"],
-                        is_required_for_65_plus=q.get("isRequiredFor65Plus", False),
-                        is_dynamic_answer=q.get("isDynamicAnswer", False),
-                        last_time_updated=q.get("lastTimeUpdated", None),
-                    )
-                    questions.append(question_obj)
-
-                self.question_banks[test_type] = questions
-                self.question_by_ids[test_type] = {q.id: q for q in questions}
-                logger.info("Loaded %d questions for %s.", len(questions), test_type.value)
+            questions = [
+                Question.create(
+                    id=q["id"],
+                    section=q["section"],
+                    question=q["question"],
+                    answers=q["answers"],
+                    is_required_for_65_plus=q.get("isRequiredFor65Plus", False),
+                    is_dynamic_answer=q.get("isDynamicAnswer", False),
+                    last_time_updated=q.get("lastTimeUpdated", None),
+                    source_fingerprint=q.get("sourceFingerprint", None),
+                )
+                for q in data["questions"]
+            ]
+            logger.info("Loaded %d questions for %s.", len(questions), test_type.value)
+            return questions
         except FileNotFoundError:
             logger.error("Questions file not found: %s", file_path)
-            self.question_banks[test_type] = []
-            self.question_by_ids[test_type] = {}
+            return []
+
+    @staticmethod
+    def _json_stamp(file_path: str) -> Tuple[int, int]:
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get_bank(self, test_type: TestType) -> QuestionBank:
+        """Get the current snapshot of a test's questions."""
+        return self.banks[test_type]
+
+    def get_encoded_question(self, test_type: TestType, question_id: int) -> EncodedBody:
+        """Get the pre-encoded API body of a question."""
+        encoded = self.banks[test_type].encoded_questions.get(question_id)
+        if encoded is not None:
+            return encoded
+        raise IndexError(f"Question ID {question_id} not found in {test_type.value} test")
 
     def get_test_configs(self) -> List[Dict[str, Any]]:
         """Return all available test configurations."""
@@ -171,6 +398,8 @@ class QuestionsService:
                 "totalQuestions": config.total_questions,
                 "questionsAsked": config.questions_asked,
                 "passThreshold": config.pass_threshold,
+                "questionsAsked65Plus": config.questions_asked_65_plus,
+                "passThreshold65Plus": config.pass_threshold_65_plus,
                 "description": config.description,
                 "filingDateInfo": config.filing_date_info,
             }
@@ -179,26 +408,133 @@ class QuestionsService:
 
     def get_all_questions(
         self, test_type: TestType, are_dynamic_questions_included: bool = True
-    ) -> List[Question]:
+    ) -> Sequence[Question]:
         """Get all questions for a specific test type."""
-        questions = self.question_banks.get(test_type, [])
+        bank = self.banks.get(test_type)
+        if bank is None:
+            return ()
         if are_dynamic_questions_included:
-            return questions
+            return bank.questions
         else:
-            return [q for q in questions if not q.is_dynamic_answer]
+            return bank.static_questions
+
+    def draw_exam(
+        self,
+        test_type: TestType,
+        n: int,
+        seed: int | None = None,
+        stratified: bool = False,
+        for_65_plus: bool = False,
+        exclude_ids: Collection[int] = (),
+    ) -> List[Question]:
+        """
+        Draw n random questions from the precomputed indexes, in O(n) time.
+
+        A seed makes the draw reproducible for the same bank. `stratified`
+        spreads the questions across sections in proportion to their size,
+        `for_65_plus` draws only from the questions for applicants 65 or older
+        (spread across their sections when also stratified), and `exclude_ids`
+        skips questions the user has already seen. Fewer than n questions are
+        returned when not enough are eligible.
+        """
+        bank = self.banks[test_type]
+        rng = random.Random(seed)
+        excluded = exclude_ids if isinstance(exclude_ids, (set, frozenset)) else set(exclude_ids)
+        if stratified:
+            strata = bank.required_for_65_plus_by_section if for_65_plus else bank.by_section
+            return stratified_sample(strata, n, rng, excluded)
+        pool = bank.required_for_65_plus if for_65_plus else bank.questions
+        return sample_excluding(pool, n, rng, excluded)
 
     def get_question_by_id(self, test_type: TestType, question_id: int) -> Question:
         """Get a specific question by ID for a specific test type."""
-        question_map = self.question_by_ids.get(test_type, {})
-        question = question_map.get(question_id)
+        question = self.banks[test_type].by_id.get(question_id)
         if question is not None:
             return question
         raise IndexError(f"Question ID {question_id} not found in {test_type.value} test")
 
-    def get_dynamic_questions(self, test_type: TestType) -> List[Question]:
+    def get_answers_version(self, test_type: TestType, question_id: int) -> int:
+        """Get the current version of a question's answer set."""
+        return self.banks[test_type].answers_versions.get(question_id, 0)
+
+    def get_prepared_question(self, test_type: TestType, question_id: int) -> PreparedQuestion:
+        """Get the precomputed normalized answers for a question."""
+        prepared = self.banks[test_type].prepared.get(question_id)
+        if prepared is not None:
+            return prepared
+        raise IndexError(f"Question ID {question_id} not found in {test_type.value} test")
+
+    def add_answers_changed_listener(self, listener: AnswersChangedListener) -> None:
+        """Register a callback invoked whenever a question's answers change."""
+        self._answers_changed_listeners.append(listener)
+
+    def _publish(
+        self, test_type: TestType, updates: Dict[int, Question], persist: bool = True
+    ) -> None:
+        """
+        Build a new bank with the updated questions, swap it in and notify the
+        listeners about every question whose answers changed. With `persist`,
+        the bank is also marked for `save_dirty_banks`.
+        """
+        previous = self.banks[test_type]
+        bank = QuestionBank.build(
+            test_type, [updates.get(q.id, q) for q in previous.questions], previous
+        )
+        self.banks[test_type] = bank
+        if persist:
+            self._dirty.add(test_type)
+        changed = [
+            question_id
+            for question_id in updates
+            if bank.answers_versions.get(question_id) != previous.answers_versions.get(question_id)
+        ]
+        for question_id in changed:
+            for listener in self._answers_changed_listeners:
+                try:
+                    listener(test_type, question_id)
+                except Exception as e:
+                    logger.exception(
+                        "Answers changed listener failed for question %d: %s", question_id, e
+                    )
+        logger.info(
+            "Published %s question bank version %d (%d questions updated, %d with new answers)",
+            test_type.value,
+            bank.version,
+            len(updates),
+            len(changed),
+        )
+
+    async def reload_changed_banks(self) -> None:
+        """
+        Pick up banks published by the refresh leader (another worker process):
+        every bank whose JSON file changed since this process loaded or saved it
+        is reloaded and swapped in.
+        """
+        loop = asyncio.get_running_loop()
+        for test_type, config in TEST_CONFIGS.items():
+            try:
+                stamp = self._json_stamp(config.questions_file)
+            except FileNotFoundError:
+                continue
+            if stamp == self._loaded_stamps.get(test_type):
+                continue
+            questions = await loop.run_in_executor(
+                None, self._load_questions, test_type, config.questions_file
+            )
+            self._loaded_stamps[test_type] = stamp
+            current = self.banks[test_type]
+            updates = {
+                q.id: q
+                for q in questions
+                if q.id in current.by_id and q != current.by_id[q.id]
+            }
+            if updates:
+                self._publish(test_type, updates, persist=False)
+
+    def get_dynamic_questions(self, test_type: TestType) -> Sequence[Question]:
         """Get all dynamic questions for a specific test type."""
-        questions = self.question_banks.get(test_type, [])
-        return [q for q in questions if q.is_dynamic_answer]
+        bank = self.banks.get(test_type)
+        return bank.dynamic_questions if bank is not None else ()
 
     def _get_dynamic_question_map(self, test_type: TestType) -> Dict[int, DynamicQuestionFetcher]:
         """Get the dynamic question map for a specific test type."""
@@ -207,90 +543,241 @@ class QuestionsService:
         else:
             return DYNAMIC_QUESTION_MAP_2025
 
-    async def update_dynamic_questions(self, update_interval_days: int = 1) -> None:
+    async def update_dynamic_questions(
+        self, update_interval_days: int = 1, fetchers: Collection[str] | None = None
+    ) -> RefreshReport:
         """
         Updates answers for all dynamic questions in all test banks
         if their 'lastTimeUpdated' is older than 'update_interval_days'.
+        Given `fetchers` (names of fetcher functions, see RefreshScheduler), only
+        their questions are updated, however recent their answers are.
+
+        Questions are refreshed concurrently, at most DYNAMIC_UPDATE_CONCURRENCY
+        at a time, sharing one pooled HTTP client for the source pages. Pages whose
+        text matches the fingerprint stored with the answer skip the LLM step.
         """
         now = datetime.now()
+        started = time.perf_counter()
         logger.info(
             "Starting update of dynamic questions with an interval of %d day(s).",
             update_interval_days,
         )
 
+        # The 2008 and 2025 banks share fetchers; run each one once for all its questions
+        jobs: Dict[DynamicQuestionFetcher, List[Tuple[TestType, Question]]] = {}
         for test_type in TestType:
             dynamic_map = self._get_dynamic_question_map(test_type)
-            
-            for question in self.get_dynamic_questions(test_type):
-                last_updated = None
-                if question.last_time_updated:
-                    try:
-                        last_updated = datetime.fromisoformat(question.last_time_updated)
-                    except ValueError:
-                        logger.warning(
-                            "Could not parse lastTimeUpdated for question %d; updating anyway.",
-                            question.id,
-                        )
-                        last_updated = None
 
-                needs_update = False
-                if last_updated is None:
-                    needs_update = True
-                else:
-                    delta = now - last_updated
-                    if delta > timedelta(days=update_interval_days):
-                        needs_update = True
+            for question in self.get_dynamic_questions(test_type):
+                func = dynamic_map.get(question.id, None)
+                if fetchers is not None:
+                    if func is None or func.__name__ not in fetchers:
+                        continue
+                elif not self._needs_update(question, now, update_interval_days):
+                    continue
 
-                if needs_update:
-                    logger.info(
-                        "Updating question %d (%s) - %s",
+                if func is None:
+                    logger.warning(
+                        "No function mapped for question %d in %s. Skipping update.",
                         question.id,
                         test_type.value,
-                        question.question,
                     )
+                    continue
+                jobs.setdefault(func, []).append((test_type, question))
+
+        report = RefreshReport()
+        updates: QuestionUpdates = {}
+        semaphore = asyncio.Semaphore(max(DYNAMIC_UPDATE_CONCURRENCY, 1))
+        async with self.page_fetcher_factory() as page_fetcher:
+            await asyncio.gather(
+                *[
+                    self._run_fetcher(
+                        func, questions, page_fetcher, semaphore, now, report, updates
+                    )
+                    for func, questions in jobs.items()
+                ]
+            )
+            page_fetcher.save_validators()
 
-                    func = dynamic_map.get(question.id, None)
-                    if func is None:
-                        logger.warning(
-                            "No function mapped for question %d in %s. Skipping update.",
-                            question.id,
-                            test_type.value,
-                        )
-                        continue
+        # Readers keep seeing the previous banks until the swap
+        for test_type, bank_updates in updates.items():
+            self._publish(test_type, bank_updates)
+        await self.save_dirty_banks()
+
+        logger.info(
+            "Dynamic question refresh done: %d re-extracted, %d skipped (unchanged content), "
+            "%d skipped (not modified), %d failed",
+            report.extracted,
+            report.skipped_unchanged,
+            report.not_modified,
+            report.failed,
+        )
+        DYNAMIC_REFRESH_DURATION.labels().observe(time.perf_counter() - started)
+        if report.failed == 0:
+            DYNAMIC_REFRESH_LAST_SUCCESS.labels().set(time.time())
+        return report
+
+    def dynamic_fetcher_last_updates(self) -> Dict[str, datetime | None]:
+        """
+        When each fetcher's answers were last refreshed: the oldest 'lastTimeUpdated'
+        of the questions it serves, or None if one of them never was.
+        """
+        last_updates: Dict[str, datetime | None] = {}
+        for test_type in TestType:
+            dynamic_map = self._get_dynamic_question_map(test_type)
+            for question in self.get_dynamic_questions(test_type):
+                func = dynamic_map.get(question.id, None)
+                if func is None:
+                    continue
+                try:
+                    updated = (
+                        datetime.fromisoformat(question.last_time_updated)
+                        if question.last_time_updated
+                        else None
+                    )
+                except ValueError:
+                    updated = None
+                name = func.__name__
+                if name not in last_updates:
+                    last_updates[name] = updated
+                else:
+                    previous = last_updates[name]
+                    last_updates[name] = (
+                        None if previous is None or updated is None else min(previous, updated)
+                    )
+        return last_updates
+
+    def _needs_update(
+        self, question: Question, now: datetime, update_interval_days: int
+    ) -> bool:
+        """Check whether a dynamic question's answer is older than the update interval."""
+        if not question.last_time_updated:
+            return True
+        try:
+            last_updated = datetime.fromisoformat(question.last_time_updated)
+        except ValueError:
+            logger.warning(
+                "Could not parse lastTimeUpdated for question %d; updating anyway.",
+                question.id,
+            )
+            return True
+        return now - last_updated > timedelta(days=update_interval_days)
 
-                    try:
-                        raw_result = await func(self.llm_client)
-                        updated_answer = raw_result.strip()
-                        question.answers = [updated_answer]
-                        question.last_time_updated = now.isoformat()
+    async def _run_fetcher(
+        self,
+        func: DynamicQuestionFetcher,
+        questions: List[Tuple[TestType, Question]],
+        page_fetcher: PageFetcher,
+        semaphore: asyncio.Semaphore,
+        now: datetime,
+        report: RefreshReport,
+        updates: QuestionUpdates,
+    ) -> None:
+        """
+        Run one fetcher (fetch, parse, LLM) and record the updated version of
+        every question it serves in `updates`.
+        """
+        fetcher_name = func.__name__
+        # gather runs each fetcher in its own task, so this only labels its LLM calls
+        llm_caller.set(fetcher_name)
+        async with semaphore:
+            for test_type, question in questions:
+                logger.info(
+                    "Updating question %d (%s) - %s",
+                    question.id,
+                    test_type.value,
+                    question.question,
+                )
+            # Only reuse a fingerprint every served question agrees on
+            fingerprints = {question.source_fingerprint for _, question in questions}
+            previous_fingerprint = fingerprints.pop() if len(fingerprints) == 1 else None
+            job = page_fetcher.start_job(previous_fingerprint, fetcher_name)
+            try:
+                raw_result = await func(self.llm_client, page_fetcher)
+            except (PageNotModified, SourceUnchanged) as e:
+                if isinstance(e, PageNotModified):
+                    report.not_modified += 1
+                    DYNAMIC_FETCHER_RUNS.labels(fetcher_name, "not_modified").inc()
+                else:
+                    report.skipped_unchanged += 1
+                    DYNAMIC_FETCHER_RUNS.labels(fetcher_name, "skipped_unchanged").inc()
+                DYNAMIC_FETCHER_LAST_SUCCESS.labels(fetcher_name).set(time.time())
+                for test_type, question in questions:
+                    if question.answers:
+                        updates.setdefault(test_type, {})[question.id] = replace(
+                            question, last_time_updated=now.isoformat()
+                        )
                         logger.info(
-                            "Updated question %d with new answer: %s",
+                            "Source for question %d (%s) is unchanged; keeping its answer",
                             question.id,
-                            updated_answer[:100] + "..." if len(updated_answer) > 100 else updated_answer,
+                            test_type.value,
                         )
-                    except Exception as e:
-                        logger.exception("Failed to update question %d: %s", question.id, e)
-                        continue
-
-            self._save_questions_to_json(test_type)
-
-    def _save_questions_to_json(self, test_type: TestType) -> None:
+                return
+            except Exception as e:
+                report.failed += 1
+                report.failed_fetchers.append(fetcher_name)
+                DYNAMIC_FETCHER_RUNS.labels(fetcher_name, "failed").inc()
+                page_fetcher.discard_validators(job)
+                logger.exception(
+                    "Failed to update question(s) %s: %s",
+                    ", ".join(f"{q.id} ({t.value})" for t, q in questions),
+                    e,
+                )
+                return
+
+            report.extracted += 1
+            DYNAMIC_FETCHER_RUNS.labels(fetcher_name, "extracted").inc()
+            DYNAMIC_FETCHER_LAST_SUCCESS.labels(fetcher_name).set(time.time())
+            updated_answer = raw_result.strip()
+            for test_type, question in questions:
+                updates.setdefault(test_type, {})[question.id] = replace(
+                    question,
+                    answers=(updated_answer,),
+                    last_time_updated=now.isoformat(),
+                    source_fingerprint=job.fingerprint,
+                )
+                logger.info(
+                    "Updated question %d (%s) with new answer: %s",
+                    question.id,
+                    test_type.value,
+                    updated_answer[:100] + "..." if len(updated_answer) > 100 else updated_answer,
+                )
+
+    async def save_dirty_banks(self) -> None:
+        """Persist every bank changed since its last save, without blocking the event loop."""
+        async with self._save_lock:
+            for test_type in TestType:
+                if test_type not in self._dirty:
+                    continue
+                self._dirty.discard(test_type)
+                # Banks are immutable, so the worker thread can serialize this one safely
+                saved = await asyncio.get_running_loop().run_in_executor(
+                    None, self._save_questions_to_json, self.banks[test_type]
+                )
+                if not saved:
+                    self._dirty.add(test_type)
+
+    def _save_questions_to_json(self, bank: QuestionBank) -> bool:
         """
-        Persists the questions for a specific test type to its JSON file.
+        Persists a question bank to its JSON file.
+        Runs in a worker thread.
         """
-        config = TEST_CONFIGS.get(test_type)
+        config = TEST_CONFIGS.get(bank.test_type)
         if config is None:
-            logger.error("No config found for test type: %s", test_type.value)
-            return
+            logger.error("No config found for test type: %s", bank.test_type.value)
+            return False
+
+        data_to_save = {"questions": [q.to_dict() for q in bank.questions]}
 
-        questions = self.question_banks.get(test_type, [])
-        data_to_save = {"questions": [q.to_dict() for q in questions]}
-        
         try:
-            with open(config.questions_file, "w") as f:
-                json.dump(data_to_save, f, indent=2)
+            write_atomically(
+                config.questions_file, json.dumps(data_to_save, indent=2).encode("utf-8")
+            )
+            self._loaded_stamps[bank.test_type] = self._json_stamp(config.questions_file)
             logger.info("Saved updated questions to %s", config.questions_file)
         except Exception as e:
             logger.exception(
                 "Failed to save questions to %s: %s", config.questions_file, e
             )
+            return False
+        return True
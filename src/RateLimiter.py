@@ -0,0 +1,207 @@
+import ipaddress
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, List, MutableMapping
+from src.Metrics import RATE_LIMITED_REQUESTS
+
+# Off by default: behind a reverse proxy, every client shares the proxy's bucket
+# unless TRUSTED_PROXIES names it
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+# Token buckets per client: sustained requests per minute and burst size.
+# Grading routes call the LLM; read routes are every other /api route.
+# A rate of 0 disables that limit.
+RATE_LIMIT_GRADING_PER_MINUTE = float(os.getenv("RATE_LIMIT_GRADING_PER_MINUTE", "30"))
+RATE_LIMIT_GRADING_BURST = int(os.getenv("RATE_LIMIT_GRADING_BURST", "10"))
+RATE_LIMIT_READ_PER_MINUTE = float(os.getenv("RATE_LIMIT_READ_PER_MINUTE", "600"))
+RATE_LIMIT_READ_BURST = int(os.getenv("RATE_LIMIT_READ_BURST", "100"))
+# Clients tracked per limit; the least recently seen are forgotten beyond this
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+# Comma-separated proxy addresses or networks whose X-Forwarded-For is trusted
+TRUSTED_PROXIES = os.getenv("TRUSTED_PROXIES", "")
+
+# Key in the ASGI scope state of a callable charging the request's client more tokens
+_CHARGE_STATE_KEY = "rate_limit_charge"
+
+
+class TokenBuckets:
+    """
+    One token bucket per client key. Buckets are kept in last-update order,
+    so the ones idle long enough to be full again sit at the front and are
+    dropped in O(1) each; a dropped bucket is indistinguishable from a full one.
+    """
+
+    def __init__(
+        self, per_minute: float, burst: int, max_clients: int = RATE_LIMIT_MAX_CLIENTS
+    ) -> None:
+        self.rate = per_minute / 60
+        self.burst = max(burst, 1)
+        self.max_clients = max(max_clients, 1)
+        self.idle_expiry = self.burst / self.rate
+        # key -> [tokens, last update (monotonic seconds)]
+        self._buckets: OrderedDict[str, List[float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str, now: float) -> float:
+        """Take a token; returns 0.0 when allowed, otherwise seconds until one is available."""
+        buckets = self._buckets
+        while buckets:
+            oldest_key = next(iter(buckets))
+            if now - buckets[oldest_key][1] < self.idle_expiry:
+                break
+            del buckets[oldest_key]
+
+        bucket = buckets.get(key)
+        if bucket is None:
+            tokens = float(self.burst)
+            bucket = buckets[key] = [tokens, now]
+            if len(buckets) > self.max_clients:
+                buckets.popitem(last=False)
+        else:
+            tokens = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+            buckets.move_to_end(key)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / self.rate
+
+    def charge(self, key: str, tokens: float, now: float) -> None:
+        """
+        Take extra tokens from a client that was already let through, e.g. per
+        answer of a batch. The bucket may go negative: later requests wait
+        until it refills.
+        """
+        bucket = self._buckets.get(key)
+        if bucket is None or tokens <= 0:
+            return
+        bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate) - tokens
+        bucket[1] = now
+        self._buckets.move_to_end(key)
+
+
+def _parse_networks(spec: str) -> List[ipaddress.IPv4Network | ipaddress.IPv6Network]:
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in spec.split(",") if part.strip()]
+
+
+def route_limit(method: str, path: str) -> str | None:
+    """The limit a request counts against: "grading", "read" or None (not limited)."""
+    if not path.startswith("/api/"):
+        return None
+    if method == "POST" and (path.startswith("/api/submit-answer") or "/answers/" in path):
+        return "grading"
+    return "read"
+
+
+def charge_request(scope: MutableMapping[str, Any], tokens: float) -> None:
+    """
+    Charge the client of a rate-limited request `tokens` more than the one
+    token its request took (a no-op when the route is not limited).
+    """
+    charge = scope.get("state", {}).get(_CHARGE_STATE_KEY)
+    if charge is not None:
+        charge(tokens)
+
+
+ASGIApp = Callable[
+    [MutableMapping[str, Any], Callable[[], Awaitable[Any]], Callable[[Any], Awaitable[None]]],
+    Awaitable[None],
+]
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware applying per-client token buckets to the API, separately
+    for the grading routes (which call the LLM) and the read routes. Clients
+    are keyed by their IP, or by X-Forwarded-For when the peer is a trusted
+    proxy. Limited requests get 429 with Retry-After.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        grading: TokenBuckets | None = None,
+        read: TokenBuckets | None = None,
+        trusted_proxies: str = TRUSTED_PROXIES,
+    ) -> None:
+        self.app = app
+        self.buckets = {"grading": grading, "read": read}
+        self.trusted_proxies = _parse_networks(trusted_proxies)
+
+    @classmethod
+    def from_env(cls, app: ASGIApp) -> "RateLimitMiddleware":
+        def buckets(per_minute: float, burst: int) -> TokenBuckets | None:
+            if not RATE_LIMIT_ENABLED or per_minute <= 0:
+                return None
+            return TokenBuckets(per_minute, burst)
+
+        return cls(
+            app,
+            grading=buckets(RATE_LIMIT_GRADING_PER_MINUTE, RATE_LIMIT_GRADING_BURST),
+            read=buckets(RATE_LIMIT_READ_PER_MINUTE, RATE_LIMIT_READ_BURST),
+        )
+
+    def _is_trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def client_key(self, scope: MutableMapping[str, Any]) -> str:
+        client = scope.get("client")
+        peer: str = client[0] if client else ""
+        if not self.trusted_proxies or not self._is_trusted(peer):
+            return peer
+        forwarded = b",".join(
+            value for name, value in scope.get("headers", ()) if name == b"x-forwarded-for"
+        ).decode("latin-1")
+        # The rightmost address not added by one of our proxies is the client
+        for address in reversed(forwarded.split(",")):
+            address = address.strip()
+            if address and not self._is_trusted(address):
+                return address
+        return peer
+
+    async def __call__(
+        self,
+        scope: MutableMapping[str, Any],
+        receive: Callable[[], Awaitable[Any]],
+        send: Callable[[Any], Awaitable[None]],
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limit = route_limit(scope["method"], scope["path"])
+        buckets = self.buckets.get(limit) if limit is not None else None
+        if buckets is None:
+            await self.app(scope, receive, send)
+            return
+        key = self.client_key(scope)
+        retry_after = buckets.take(key, time.monotonic())
+        if retry_after == 0.0:
+            scope.setdefault("state", {})[_CHARGE_STATE_KEY] = (
+                lambda tokens: buckets.charge(key, tokens, time.monotonic())
+            )
+            await self.app(scope, receive, send)
+            return
+
+        RATE_LIMITED_REQUESTS.labels(limit).inc()
+        body = json.dumps({"detail": "Too many requests, please retry shortly"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(math.ceil(retry_after), 1)).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
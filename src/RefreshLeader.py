@@ -0,0 +1,65 @@
+import logging
+import os
+from typing import IO
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, and no multi-worker deployment either
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# Lock file shared by the workers of one deployment; whoever holds it runs the refreshes
+REFRESH_LOCK_FILE = os.getenv("REFRESH_LOCK_FILE", "./db/refresh.lock")
+# Seconds between checks of the published banks (followers) and of a free lock
+BANK_RELOAD_POLL_SECONDS = float(os.getenv("BANK_RELOAD_POLL_SECONDS", "5"))
+
+
+class RefreshLeaderLock:
+    """
+    Elects one worker process to run the dynamic question refreshes.
+
+    The leader holds an exclusive flock on REFRESH_LOCK_FILE for as long as it
+    lives; the kernel drops the lock when the process exits or crashes, so a
+    follower's next `try_acquire` takes over. Without fcntl every process is
+    its own leader.
+    """
+
+    def __init__(self, path: str = REFRESH_LOCK_FILE) -> None:
+        self.path = path
+        self._file: IO[str] | None = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._file is not None
+
+    def try_acquire(self) -> bool:
+        """Take the lock without waiting; True when this process is (already) the leader."""
+        if self._file is not None:
+            return True
+        if fcntl is None:
+            self._file = open(os.devnull, "w")
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        file = open(self.path, "a+")
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            file.close()
+            return False
+        # The pid is informational only: the flock, not the file content, is the lock
+        file.seek(0)
+        file.truncate()
+        file.write(f"{os.getpid()}\n")
+        file.flush()
+        self._file = file
+        logger.info("Process %d is the dynamic refresh leader", os.getpid())
+        return True
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
@@ -0,0 +1,194 @@
+import heapq
+import json
+import logging
+import os
+import random
+from datetime import datetime
+from typing import Dict, List, Mapping, Tuple
+from src.AtomicFiles import write_atomically
+from src.Metrics import DYNAMIC_FETCHER_NEXT_RUN
+
+logger = logging.getLogger(__name__)
+
+# Next run time of each dynamic question fetcher, kept across restarts
+DYNAMIC_REFRESH_SCHEDULE_FILE = os.getenv(
+    "DYNAMIC_REFRESH_SCHEDULE_FILE", "./db/refresh_schedule.json"
+)
+# Per-fetcher freshness overrides in days, e.g. "get_representative=3,get_state_capital=365"
+DYNAMIC_FETCHER_TTL_DAYS = os.getenv("DYNAMIC_FETCHER_TTL_DAYS", "")
+# Each next run is moved by up to this fraction of its TTL, so runs drift apart
+DYNAMIC_REFRESH_JITTER = float(os.getenv("DYNAMIC_REFRESH_JITTER", "0.1"))
+# Minimum seconds between two fetcher runs, so overdue fetchers do not run in one burst
+DYNAMIC_REFRESH_MIN_SPACING_SECONDS = float(os.getenv("DYNAMIC_REFRESH_MIN_SPACING_SECONDS", "300"))
+# First retry delay (seconds) after a failed run; doubles per failure, capped at the TTL
+DYNAMIC_REFRESH_RETRY_SECONDS = float(os.getenv("DYNAMIC_REFRESH_RETRY_SECONDS", "3600"))
+
+DAY_SECONDS = 24 * 60 * 60
+
+# How long each fetcher's answer stays fresh (days). Offices that change
+# mid-term are checked often; the size of the Supreme Court almost never changes.
+DEFAULT_FETCHER_TTL_DAYS: Dict[str, float] = {
+    "get_representative": 7,
+    "get_senators_by_state": 7,
+    "get_speaker_of_the_house": 7,
+    "get_governor_by_state": 14,
+    "get_president": 14,
+    "get_vice_president": 14,
+    "get_president_party": 14,
+    "get_chief_justice": 90,
+    "get_supreme_court_justice_count": 180,
+    "get_state_capital": 365,
+}
+
+
+def parse_ttl_days(spec: str) -> Dict[str, float]:
+    """Parse "fetcher=days,fetcher=days" (see DYNAMIC_FETCHER_TTL_DAYS)."""
+    ttl_days: Dict[str, float] = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, days = part.partition("=")
+        ttl_days[name.strip()] = float(days)
+    return ttl_days
+
+
+class RefreshScheduler:
+    """
+    Keeps the next run time of every dynamic question fetcher in a min-heap.
+    Each successful run is due again after the fetcher's TTL, moved by a random
+    jitter; failed runs are retried with exponential backoff. Next run times
+    are saved after every run, so a restart neither refreshes everything at
+    once nor forgets what was due.
+    """
+
+    def __init__(
+        self,
+        default_ttl_days: float,
+        ttl_days: Mapping[str, float] | None = None,
+        jitter: float = DYNAMIC_REFRESH_JITTER,
+        min_spacing_seconds: float = DYNAMIC_REFRESH_MIN_SPACING_SECONDS,
+        retry_seconds: float = DYNAMIC_REFRESH_RETRY_SECONDS,
+        state_file: str = DYNAMIC_REFRESH_SCHEDULE_FILE,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.default_ttl_days = default_ttl_days
+        self.ttl_days = {
+            **DEFAULT_FETCHER_TTL_DAYS,
+            **(ttl_days if ttl_days is not None else parse_ttl_days(DYNAMIC_FETCHER_TTL_DAYS)),
+        }
+        self.jitter = min(max(jitter, 0.0), 1.0)
+        self.min_spacing_seconds = min_spacing_seconds
+        self.retry_seconds = retry_seconds
+        self.state_file = state_file
+        self.rng = rng or random.Random()
+        # fetcher -> next run (unix time); the heap may hold stale entries for it
+        self.next_run: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._failures: Dict[str, int] = {}
+
+    def ttl_seconds(self, fetcher: str) -> float:
+        return self.ttl_days.get(fetcher, self.default_ttl_days) * DAY_SECONDS
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * (1 + self.rng.uniform(-self.jitter, self.jitter))
+
+    def _schedule(self, fetcher: str, run_at: float) -> None:
+        self.next_run[fetcher] = run_at
+        heapq.heappush(self._heap, (run_at, fetcher))
+        DYNAMIC_FETCHER_NEXT_RUN.labels(fetcher).set(run_at)
+
+    def load(
+        self,
+        last_updates: Mapping[str, datetime | None],
+        now: float,
+        run_all_now: bool = False,
+    ) -> None:
+        """
+        Schedule every fetcher in `last_updates` (fetcher -> when its answers were
+        last refreshed). Saved next run times win; fetchers without one are due
+        a jittered TTL after their last refresh, or now if never refreshed.
+        `run_all_now` makes everything due at once (RUN_DYNAMIC_UPDATE_ON_STARTUP).
+        """
+        saved = {} if run_all_now else self._read_state()
+        self.next_run = {}
+        self._heap = []
+        for fetcher, last_updated in last_updates.items():
+            if run_all_now:
+                run_at = now
+            elif fetcher in saved:
+                # A TTL lowered since the last save takes effect right away
+                run_at = min(saved[fetcher], now + self._jittered(self.ttl_seconds(fetcher)))
+            elif last_updated is not None:
+                run_at = last_updated.timestamp() + self._jittered(self.ttl_seconds(fetcher))
+            else:
+                run_at = now
+            self._schedule(fetcher, run_at)
+        overdue = sum(run_at <= now for run_at in self.next_run.values())
+        logger.info(
+            "Scheduled %d dynamic question fetchers, %d overdue (run %.0fs apart)",
+            len(self.next_run),
+            overdue,
+            self.min_spacing_seconds,
+        )
+
+    def seconds_until_next(self, now: float) -> float | None:
+        """Seconds until the next fetcher is due (0 if overdue), or None if none is scheduled."""
+        while self._heap:
+            run_at, fetcher = self._heap[0]
+            if self.next_run.get(fetcher) == run_at:
+                return max(run_at - now, 0.0)
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: float) -> str | None:
+        """The most overdue fetcher, unscheduled until `record_run`; None if none is due."""
+        while self._heap:
+            run_at, fetcher = self._heap[0]
+            if self.next_run.get(fetcher) != run_at:
+                heapq.heappop(self._heap)
+                continue
+            if run_at > now:
+                return None
+            heapq.heappop(self._heap)
+            del self.next_run[fetcher]
+            return fetcher
+        return None
+
+    def record_run(self, fetcher: str, succeeded: bool, now: float) -> float:
+        """Schedule the fetcher's next run after a run ending at `now`; returns its time."""
+        ttl = self.ttl_seconds(fetcher)
+        if succeeded:
+            self._failures.pop(fetcher, None)
+            delay = self._jittered(ttl)
+        else:
+            failures = self._failures[fetcher] = self._failures.get(fetcher, 0) + 1
+            delay = self._jittered(min(self.retry_seconds * 2 ** (failures - 1), ttl))
+        self._schedule(fetcher, now + delay)
+        return now + delay
+
+    def _read_state(self) -> Dict[str, float]:
+        try:
+            with open(self.state_file, "r") as file:
+                entries = json.load(file)["nextRun"]
+            return {
+                fetcher: datetime.fromisoformat(run_at).timestamp()
+                for fetcher, run_at in entries.items()
+            }
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning("Ignoring unreadable refresh schedule %s: %s", self.state_file, e)
+            return {}
+
+    def save(self) -> None:
+        entries = {
+            fetcher: datetime.fromtimestamp(run_at).isoformat(timespec="seconds")
+            for fetcher, run_at in sorted(self.next_run.items())
+        }
+        try:
+            write_atomically(
+                self.state_file, json.dumps({"nextRun": entries}, indent=2).encode("utf-8")
+            )
+        except OSError as e:
+            logger.warning("Failed to save the refresh schedule to %s: %s", self.state_file, e)
+
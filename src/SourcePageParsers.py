@@ -0,0 +1,299 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Tuple
+from bs4 import BeautifulSoup, Tag
+
+US_STATES: Tuple[str, ...] = (
+    "Alabama", "Alaska", "Arizona", "Arkansas", "California", "Colorado",
+    "Connecticut", "Delaware", "Florida", "Georgia", "Hawaii", "Idaho",
+    "Illinois", "Indiana", "Iowa", "Kansas", "Kentucky", "Louisiana", "Maine",
+    "Maryland", "Massachusetts", "Michigan", "Minnesota", "Mississippi",
+    "Missouri", "Montana", "Nebraska", "Nevada", "New Hampshire", "New Jersey",
+    "New Mexico", "New York", "North Carolina", "North Dakota", "Ohio",
+    "Oklahoma", "Oregon", "Pennsylvania", "Rhode Island", "South Carolina",
+    "South Dakota", "Tennessee", "Texas", "Utah", "Vermont", "Virginia",
+    "Washington", "West Virginia", "Wisconsin", "Wyoming",
+)
+US_TERRITORIES: Tuple[str, ...] = (
+    "District of Columbia", "American Samoa", "Guam", "Northern Mariana Islands",
+    "Puerto Rico", "U.S. Virgin Islands",
+)
+
+# A page is only trusted when it yields (almost) every state
+MIN_STATES_RECOGNIZED = 45
+
+StateMapping = Dict[str, List[str]]
+
+_STATE_LOOKUP: Dict[str, str] = {
+    name.casefold(): name for name in US_STATES + US_TERRITORIES
+}
+_STATE_LOOKUP.update(
+    {
+        "washington, d.c.": "District of Columbia",
+        "washington d.c.": "District of Columbia",
+        "d.c.": "District of Columbia",
+        "virgin islands": "U.S. Virgin Islands",
+        "us virgin islands": "U.S. Virgin Islands",
+        "united states virgin islands": "U.S. Virgin Islands",
+        "northern mariana islands": "Northern Mariana Islands",
+    }
+)
+_FOOTNOTE_RE = re.compile(r"\[[^\]]*\]")
+_WHITESPACE_RE = re.compile(r"\s+")
+_NAME_SUFFIXES = frozenset({"jr", "jr.", "sr", "sr.", "ii", "iii", "iv"})
+
+
+def clean_cell_text(text: str) -> str:
+    """Drop footnote markers like "[1]" and collapse whitespace."""
+    return _WHITESPACE_RE.sub(" ", _FOOTNOTE_RE.sub("", text)).strip()
+
+
+def match_state(text: str) -> str | None:
+    """Return the canonical state or territory name for a cell/heading text."""
+    key = clean_cell_text(text).casefold().strip(" :*")
+    return _STATE_LOOKUP.get(key)
+
+
+def normalize_person_name(name: str) -> str:
+    """Turn "Moore, Barry" (or "Moore, Barry, Jr.") into "Barry Moore" ("Barry Moore Jr.")."""
+    name = clean_cell_text(name)
+    parts = [part.strip() for part in name.split(",") if part.strip()]
+    if len(parts) == 2 and parts[1].casefold() not in _NAME_SUFFIXES:
+        return f"{parts[1]} {parts[0]}"
+    if len(parts) == 3 and parts[2].casefold() in _NAME_SUFFIXES:
+        return f"{parts[1]} {parts[0]} {parts[2]}"
+    return name
+
+
+def _table_rows(table: Tag) -> List[List[str]]:
+    """Read a table into a grid of cell texts, expanding rowspan and colspan."""
+    grid: List[List[str]] = []
+    # column index -> (rows still to fill, text) for cells spanning down
+    spans: Dict[int, Tuple[int, str]] = {}
+    for tr in table.find_all("tr"):
+        cells = [c for c in tr.find_all(["td", "th"], recursive=False) if isinstance(c, Tag)]
+        row: List[str] = []
+        column = 0
+        while cells or column in spans:
+            if column in spans:
+                remaining, text = spans.pop(column)
+                if remaining > 1:
+                    spans[column] = (remaining - 1, text)
+                row.append(text)
+                column += 1
+                continue
+            cell = cells.pop(0)
+            text = clean_cell_text(cell.get_text(" ", strip=True))
+            rowspan = _int_attribute(cell, "rowspan")
+            for _ in range(_int_attribute(cell, "colspan")):
+                if rowspan > 1:
+                    spans[column] = (rowspan - 1, text)
+                row.append(text)
+                column += 1
+        if row:
+            grid.append(row)
+    return grid
+
+
+def _int_attribute(cell: Tag, name: str) -> int:
+    value = cell.get(name)
+    try:
+        return max(int(str(value)), 1) if value is not None else 1
+    except ValueError:
+        return 1
+
+
+def _find_column(header: List[str], patterns: Tuple[str, ...]) -> int | None:
+    """Index of the first header cell matching the patterns, tried in order."""
+    for pattern in patterns:
+        regex = re.compile(pattern, re.IGNORECASE)
+        for index, text in enumerate(header):
+            if regex.search(text):
+                return index
+    return None
+
+
+def _iter_column_pairs(
+    soup: BeautifulSoup, key_patterns: Tuple[str, ...], value_patterns: Tuple[str, ...]
+) -> Iterator[Tuple[str, str]]:
+    """Yield (key cell, value cell) for every table whose header has both columns."""
+    for table in soup.find_all("table"):
+        if not isinstance(table, Tag):
+            continue
+        rows = _table_rows(table)
+        for header_index, header in enumerate(rows[:3]):
+            key_column = _find_column(header, key_patterns)
+            value_column = _find_column(header, value_patterns)
+            if key_column is None or value_column is None or key_column == value_column:
+                continue
+            for row in rows[header_index + 1 :]:
+                if len(row) > max(key_column, value_column):
+                    yield row[key_column], row[value_column]
+            break
+
+
+def _add(mapping: StateMapping, state: str, value: str) -> None:
+    values = mapping.setdefault(state, [])
+    if value and value not in values:
+        values.append(value)
+
+
+def _recognized(mapping: StateMapping) -> StateMapping | None:
+    states_found = sum(1 for state in US_STATES if mapping.get(state))
+    return mapping if states_found >= MIN_STATES_RECOGNIZED else None
+
+
+def _state_listing_pairs(soup: BeautifulSoup) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (state, names text) from non-tabular layouts: "State: names" list items
+    and paragraphs, or a state heading followed by a list of names.
+    """
+    for element in soup.find_all(["li", "p", "dd"]):
+        text = clean_cell_text(element.get_text(" ", strip=True))
+        if ":" in text:
+            state = match_state(text.split(":", 1)[0])
+            if state is not None:
+                yield state, text.split(":", 1)[1]
+    for heading in soup.find_all(["h2", "h3", "h4", "dt", "strong", "b"]):
+        state = match_state(heading.get_text(" ", strip=True))
+        if state is None:
+            continue
+        listing = heading.find_next(["ul", "ol"])
+        if isinstance(listing, Tag):
+            for item in listing.find_all("li", recursive=False):
+                yield state, item.get_text(" ", strip=True)
+
+
+def parse_governors(soup: BeautifulSoup) -> StateMapping | None:
+    """State -> [governor] from a "State | ... | Governor" table."""
+    mapping: StateMapping = {}
+    for state_text, governor in _iter_column_pairs(
+        soup, (r"^state", r"state|territory"), (r"^governor$", r"^governor", r"name")
+    ):
+        state = match_state(state_text)
+        if state is not None and governor:
+            _add(mapping, state, normalize_person_name(governor))
+    return _recognized(mapping)
+
+
+def parse_state_capitals(soup: BeautifulSoup) -> StateMapping | None:
+    """State -> [capital] from a "State | ... | Capital" table."""
+    mapping: StateMapping = {}
+    for state_text, capital in _iter_column_pairs(
+        soup, (r"^state", r"state|territory"), (r"^capital( city)?$", r"^capital(?! since)")
+    ):
+        state = match_state(state_text)
+        if state is not None and capital:
+            _add(mapping, state, capital)
+    return _recognized(mapping)
+
+
+def _party_suffix_free(name: str) -> str:
+    """Drop trailing party markers like "(R)" or "(D-CA)"."""
+    return re.sub(r"\s*\((?:[RDI]|[RDI]-[A-Z]{2})\)\s*$", "", name).strip()
+
+
+def parse_senators(soup: BeautifulSoup) -> StateMapping | None:
+    """State -> [senator, senator] from a senators table or a per-state listing."""
+    mapping: StateMapping = {}
+    for state_text, senator in _iter_column_pairs(
+        soup, (r"^state",), (r"^senator", r"^name", r"member")
+    ):
+        state = match_state(state_text)
+        if state is not None and senator:
+            _add(mapping, state, normalize_person_name(_party_suffix_free(senator)))
+    if _recognized(mapping) is None:
+        mapping = {}
+        for state, names in _state_listing_pairs(soup):
+            for name in re.split(r",|;| and ", names.strip(" []")):
+                name = _party_suffix_free(clean_cell_text(name))
+                if name and match_state(name) is None:
+                    _add(mapping, state, normalize_person_name(name))
+    return _recognized(mapping)
+
+
+def parse_representatives(soup: BeautifulSoup) -> StateMapping | None:
+    """
+    State -> ["FirstName LastName (District)"] from house.gov style tables:
+    one table per state captioned with the state name, with District and Name
+    columns.
+    """
+    mapping: StateMapping = {}
+    for table in soup.find_all("table"):
+        if not isinstance(table, Tag):
+            continue
+        caption = table.find("caption")
+        state = match_state(caption.get_text(" ", strip=True)) if caption else None
+        if state is None:
+            continue
+        rows = _table_rows(table)
+        if not rows:
+            continue
+        district_column = _find_column(rows[0], (r"district",))
+        name_column = _find_column(rows[0], (r"^name", r"member|representative"))
+        if district_column is None or name_column is None:
+            continue
+        for row in rows[1:]:
+            if len(row) <= max(district_column, name_column) or not row[name_column]:
+                continue
+            name = normalize_person_name(row[name_column])
+            district = row[district_column]
+            _add(mapping, state, f"{name} ({district})" if district else name)
+    return _recognized(mapping)
+
+
+def format_state_mapping(mapping: StateMapping, bracketed: bool = False) -> str:
+    """Render a mapping in the "State: value, value" text form stored in the question banks."""
+    lines: List[str] = []
+    for state, values in mapping.items():
+        joined = ", ".join(values)
+        lines.append(f"{state}: [{joined}]" if bracketed else f"{state}: {joined}")
+    return "\n".join(lines)
+
+
+_PARENTHESIZED_VALUE_RE = re.compile(r"[^,()][^()]*\([^)]*\)")
+
+
+def parse_state_mapping_text(text: str) -> StateMapping | None:
+    """
+    Parse the "State: value, value" text form (as produced by format_state_mapping
+    or the LLM extraction prompts) back into a mapping. Handles bracketed lists
+    ("Alabama: [A, B]") and "Last, First (District)" entries. Returns None unless
+    the text covers (almost) every state.
+    """
+    return _recognized(parse_state_mapping_lines(text))
+
+
+def parse_state_mapping_lines(text: str) -> StateMapping:
+    """Like parse_state_mapping_text, but for partial lists: any number of states."""
+    mapping: StateMapping = {}
+    for line in text.splitlines():
+        if ":" not in line:
+            continue
+        state_text, values_text = line.split(":", 1)
+        state = match_state(state_text.strip(" -*"))
+        if state is None:
+            continue
+        values_text = values_text.strip().strip("[]").strip()
+        if "(" in values_text:
+            # "Moore, Barry (1st), Figures, Shomari (2nd)": split after each ")"
+            values = [
+                f"{normalize_person_name(value.split('(', 1)[0])} ({value.split('(', 1)[1]}"
+                for value in (v.strip() for v in _PARENTHESIZED_VALUE_RE.findall(values_text))
+            ]
+        else:
+            values = [value.strip() for value in values_text.split(",")]
+        for value in values:
+            if value and value.casefold() not in ("n/a", "none", "no senators"):
+                _add(mapping, state, value)
+    return mapping
+
+
+def merge_state_mappings(mappings: Iterable[StateMapping]) -> StateMapping:
+    """Union of partial mappings, in canonical state order, without duplicate values."""
+    merged: StateMapping = {}
+    for mapping in mappings:
+        for state, values in mapping.items():
+            for value in values:
+                _add(merged, state, value)
+    order = {name: index for index, name in enumerate(US_STATES + US_TERRITORIES)}
+    return {state: merged[state] for state in sorted(merged, key=order.__getitem__)}
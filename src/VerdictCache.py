@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from typing import Awaitable, Callable, Dict, List, Mapping, Sequence, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+GRADING_CACHE_MAX_ENTRIES = int(os.getenv("GRADING_CACHE_MAX_ENTRIES", "10000"))
+GRADING_CACHE_TTL_SECONDS = float(os.getenv("GRADING_CACHE_TTL_SECONDS", "86400"))
+
+# (test type, question id, normalized answer, answer-set version)
+VerdictKey = Tuple[str, int, str, int]
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n.,;:!?\"'"
+
+
+def normalize_answer(answer: str) -> str:
+    """Normalize a user's answer so trivially different spellings share a cache entry."""
+    return _WHITESPACE_RE.sub(" ", answer).strip(_EDGE_PUNCTUATION).casefold()
+
+
+@dataclass
+class VerdictCacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+
+@dataclass
+class _InFlight:
+    """A computation shared by every lookup waiting for the same key."""
+
+    task: "asyncio.Task[bool]"
+    waiters: int = 0
+
+
+class VerdictCache:
+    """
+    In-process LRU + TTL cache of grading verdicts.
+
+    Concurrent lookups for the same key that miss the cache share a single
+    in-flight computation instead of each starting their own LLM call. The
+    computation runs in its own task: a cancelled caller only stops waiting,
+    and the task is cancelled once nobody waits for it any more.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = GRADING_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = GRADING_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = VerdictCacheStats()
+        # key -> (expires_at, verdict); ordered from least to most recently used
+        self._entries: OrderedDict[VerdictKey, Tuple[float, bool]] = OrderedDict()
+        self._in_flight: Dict[VerdictKey, _InFlight] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: VerdictKey) -> bool | None:
+        """Return the cached verdict for a key, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, verdict = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return verdict
+
+    def put(self, key: VerdictKey, verdict: bool) -> None:
+        """Store a verdict, evicting the least recently used entries if over capacity."""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, verdict)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def get_or_compute(
+        self, key: VerdictKey, compute: Callable[[], Awaitable[bool]]
+    ) -> Tuple[bool, str]:
+        """
+        Return (verdict, source) for a key, where source is "hit", "coalesced" or "miss".
+        Only a miss awaits `compute`; concurrent misses for the same key join it.
+        """
+        verdict = self.get(key)
+        if verdict is not None:
+            self.stats.hits += 1
+            return verdict, "hit"
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.stats.coalesced += 1
+            return (await self._join([in_flight]))[0], "coalesced"
+
+        self.stats.misses += 1
+        in_flight = self._start(key, compute)
+        return (await self._join([in_flight]))[0], "miss"
+
+    async def get_or_compute_many(
+        self,
+        keys: Sequence[VerdictKey],
+        compute_many: Callable[[List[VerdictKey]], Awaitable[Mapping[VerdictKey, bool]]],
+        compute_one: Callable[[VerdictKey], Awaitable[bool]],
+    ) -> List[Tuple[bool, str]]:
+        """
+        Batch form of `get_or_compute`, returning (verdict, source) per key.
+        The keys that miss are passed together to `compute_many`, and any it
+        returns no verdict for are computed with `compute_one`. Each key is
+        counted and coalesced exactly like a single lookup.
+        """
+        verdicts: Dict[VerdictKey, bool] = {}
+        sources: Dict[VerdictKey, str] = {}
+        waiting: Dict[VerdictKey, _InFlight] = {}
+        missed: List[VerdictKey] = []
+        for key in keys:
+            if key in sources:
+                # Repeated within the batch
+                self.stats.coalesced += 1
+                continue
+            verdict = self.get(key)
+            if verdict is not None:
+                self.stats.hits += 1
+                verdicts[key], sources[key] = verdict, "hit"
+            elif key in self._in_flight:
+                self.stats.coalesced += 1
+                waiting[key], sources[key] = self._in_flight[key], "coalesced"
+            else:
+                self.stats.misses += 1
+                missed.append(key)
+                sources[key] = "miss"
+
+        if missed:
+            batch = asyncio.ensure_future(compute_many(missed))
+            unsettled = len(missed)
+
+            def settle(_: "asyncio.Task[bool]") -> None:
+                # Nobody needs the batch once every key's computation gave up on it
+                nonlocal unsettled
+                unsettled -= 1
+                if not unsettled:
+                    batch.cancel()
+
+            for key in missed:
+                in_flight = waiting[key] = self._start(
+                    key, partial(self._from_batch, batch, key, compute_one)
+                )
+                in_flight.task.add_done_callback(settle)
+
+        verdicts.update(zip(waiting, await self._join(list(waiting.values()))))
+        return [(verdicts[key], sources[key]) for key in keys]
+
+    @staticmethod
+    async def _from_batch(
+        batch: "asyncio.Future[Mapping[VerdictKey, bool]]",
+        key: VerdictKey,
+        compute_one: Callable[[VerdictKey], Awaitable[bool]],
+    ) -> bool:
+        # shield: the batch is shared by every key in it
+        verdict = (await asyncio.shield(batch)).get(key)
+        if verdict is None:
+            verdict = await compute_one(key)
+        return verdict
+
+    def _start(self, key: VerdictKey, compute: Callable[[], Awaitable[bool]]) -> _InFlight:
+        """Run `compute` in its own task, shared by every lookup of the key until it is done."""
+        in_flight = self._in_flight[key] = _InFlight(asyncio.ensure_future(compute()))
+
+        def done(task: "asyncio.Task[bool]") -> None:
+            # A callback rather than a finally: it also runs if the task is
+            # cancelled before it ever started
+            if self._in_flight.get(key) is in_flight:
+                del self._in_flight[key]
+            if not task.cancelled() and task.exception() is None:
+                self.put(key, task.result())
+
+        in_flight.task.add_done_callback(done)
+        return in_flight
+
+    @staticmethod
+    async def _join(in_flights: List[_InFlight]) -> List[bool]:
+        """
+        Wait for shared computations. If this lookup is cancelled, or one of
+        them fails, it gives up on the rest; the last waiter to give up on a
+        computation cancels it.
+        """
+        # Counted before the first await, so an early cancellation is not missed
+        for in_flight in in_flights:
+            in_flight.waiters += 1
+        try:
+            # shield so a cancelled waiter does not cancel the others' computation
+            return list(
+                await asyncio.gather(*(asyncio.shield(in_flight.task) for in_flight in in_flights))
+            )
+        except BaseException:
+            for in_flight in in_flights:
+                if in_flight.waiters == 1:
+                    in_flight.task.cancel()
+            raise
+        finally:
+            for in_flight in in_flights:
+                in_flight.waiters -= 1
+
+    def invalidate_question(self, test_type: str, question_id: int) -> None:
+        """Drop every cached verdict for one question."""
+        stale = [
+            key
+            for key in self._entries
+            if key[0] == test_type and key[1] == question_id
+        ]
+        for key in stale:
+            del self._entries[key]
+        self.stats.invalidations += len(stale)
+        if stale:
+            logger.info(
+                "Invalidated %d cached verdicts for question %d (%s)",
+                len(stale),
+                question_id,
+                test_type,
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return counters and sizing information for the cache."""
+        lookups = self.stats.hits + self.stats.misses + self.stats.coalesced
+        return {
+            "hits": self.stats.hits,
+            "misses": self.stats.misses,
+            "coalesced": self.stats.coalesced,
+            "evictions": self.stats.evictions,
+            "expirations": self.stats.expirations,
+            "invalidations": self.stats.invalidations,
+            "size": len(self._entries),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl_seconds,
+            "inFlight": len(self._in_flight),
+            "hitRate": (self.stats.hits + self.stats.coalesced) / lookups if lookups else 0.0,
+        }
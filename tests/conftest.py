@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# The app modules read their configuration at import time
+os.environ.setdefault("GEMINI_API_KEY", "test")
+# Importing main sets up logging; keep its log files out of the working tree
+_log_dir = tempfile.mkdtemp(prefix="civics-test-logs-")
+os.environ.setdefault("LOG_FILE", os.path.join(_log_dir, "app.log"))
+os.environ.setdefault("GRADING_LOG_FILE", os.path.join(_log_dir, "grading.log"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
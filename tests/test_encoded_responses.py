@@ -0,0 +1,95 @@
+import gzip
+import json
+
+import pytest
+from fastapi import Request
+
+from src.EncodedResponses import (
+    GZIP_MIN_BYTES,
+    EncodedBody,
+    encoded_response,
+    join_json_array,
+    raw_json_response,
+)
+
+SMALL = {"questionId": 1, "answer": "Washington"}
+LARGE = {"answers": ["Washington"] * GZIP_MIN_BYTES}
+
+
+def _request(**headers):
+    raw_headers = [
+        (name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()
+    ]
+    return Request({"type": "http", "headers": raw_headers})
+
+
+def test_bodies_are_encoded_once_with_a_content_etag():
+    body = EncodedBody.from_content(LARGE)
+    assert json.loads(body.raw) == LARGE
+    assert gzip.decompress(body.gzipped) == body.raw
+    assert body.etag == EncodedBody.from_content(LARGE).etag
+    assert body.etag != EncodedBody.from_content(SMALL).etag
+    assert EncodedBody.from_content(SMALL).gzipped is None
+
+
+def test_join_json_array_builds_an_object_from_fragments():
+    fragments = [EncodedBody.from_content(SMALL).raw, EncodedBody.from_content({"é": 2}).raw]
+    assert json.loads(join_json_array("questions", fragments)) == {"questions": [SMALL, {"é": 2}]}
+
+
+def test_encoded_response_negotiates_gzip():
+    body = EncodedBody.from_content(LARGE)
+
+    plain = encoded_response(_request(), body)
+    assert plain.body == body.raw
+    assert plain.headers["etag"] == body.etag
+    assert plain.headers["vary"] == "Accept-Encoding"
+    assert "content-encoding" not in plain.headers
+
+    compressed = encoded_response(_request(accept_encoding="br, gzip"), body)
+    assert compressed.body == body.gzipped
+    assert compressed.headers["content-encoding"] == "gzip"
+    # Each representation has its own strong ETag
+    assert compressed.headers["etag"] == body.etag[:-1] + '-gzip"'
+
+
+def test_small_bodies_are_sent_uncompressed():
+    body = EncodedBody.from_content(SMALL)
+    response = encoded_response(_request(accept_encoding="gzip"), body)
+    assert response.body == body.raw
+    assert response.headers["etag"] == body.etag
+
+
+@pytest.mark.parametrize(
+    "if_none_match, accept_encoding, status",
+    [
+        ("{etag}", "", 304),
+        ('"other", {etag}', "", 304),
+        ("*", "", 304),
+        ("{gzip_etag}", "gzip", 304),
+        # The uncompressed representation's ETag does not match the gzip one
+        ("{etag}", "gzip", 200),
+        ('"other"', "", 200),
+    ],
+)
+def test_if_none_match(if_none_match, accept_encoding, status):
+    body = EncodedBody.from_content(LARGE)
+    header = if_none_match.format(etag=body.etag, gzip_etag=body.etag[:-1] + '-gzip"')
+    response = encoded_response(
+        _request(if_none_match=header, accept_encoding=accept_encoding), body
+    )
+    assert response.status_code == status
+    if status == 304:
+        assert response.body == b""
+        assert "etag" in response.headers
+
+
+def test_raw_json_response_compresses_only_large_bodies_for_gzip_clients():
+    large = json.dumps(LARGE).encode()
+    response = raw_json_response(_request(accept_encoding="gzip"), large)
+    assert gzip.decompress(response.body) == large
+    assert response.headers["content-encoding"] == "gzip"
+
+    assert raw_json_response(_request(), large).body == large
+    small = json.dumps(SMALL).encode()
+    assert raw_json_response(_request(accept_encoding="gzip"), small).body == small
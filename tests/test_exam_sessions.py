@@ -0,0 +1,120 @@
+import asyncio
+from dataclasses import replace
+
+from src.ExamSessions import ExamSessionService
+from src.GradingService import GradingService
+from src.QuestionsService import Question, QuestionBank, QuestionsService
+from src.QuestionsService import TestType as BankType
+from src.VerdictCache import VerdictCache
+
+
+def test_sessions_grade_against_the_bank_they_were_drawn_from():
+    question = Question(
+        id=1,
+        section="American Government",
+        question="Who is the Speaker of the House of Representatives now?",
+        answers=("Mike Johnson",),
+        is_required_for_65_plus=False,
+        is_dynamic_answer=False,
+        last_time_updated=None,
+        source_fingerprint=None,
+    )
+    questions_service = QuestionsService(llm_client=None)
+    questions_service.banks[BankType.TEST_2008] = QuestionBank.build(BankType.TEST_2008, [question])
+    grading_service = GradingService(questions_service, VerdictCache())
+    sessions = ExamSessionService(questions_service, grading_service, llm_client=None)
+
+    async def run():
+        sessions.start_workers()
+        try:
+            session = sessions.start_session(BankType.TEST_2008)
+            # A refresh publishes new answers while the exam is in progress
+            previous = questions_service.banks[BankType.TEST_2008]
+            questions_service.banks[BankType.TEST_2008] = QuestionBank.build(
+                BankType.TEST_2008, [replace(question, answers=("Someone Else",))], previous
+            )
+            sessions.submit_answer(session.id, 1, "Mike Johnson")
+            return await sessions.get_results(session.id)
+        finally:
+            await sessions.stop_workers()
+
+    results = asyncio.run(run())
+    assert results["results"][0]["result"] == "true"
+    assert results["results"][0]["gradedBy"] == "local"
+    assert results["results"][0]["answers"] == ["Mike Johnson"]
+
+
+def test_passed_is_undecided_until_every_grade_is_in():
+    question = Question(
+        id=1,
+        section="American Government",
+        question="What is the supreme law of the land?",
+        answers=("the Constitution",),
+        is_required_for_65_plus=False,
+        is_dynamic_answer=False,
+        last_time_updated=None,
+        source_fingerprint=None,
+    )
+    questions_service = QuestionsService(llm_client=None)
+    questions_service.banks[BankType.TEST_2008] = QuestionBank.build(BankType.TEST_2008, [question])
+    grading_service = GradingService(questions_service, VerdictCache())
+    sessions = ExamSessionService(questions_service, grading_service, llm_client=None)
+    release = asyncio.Event()
+    grade = grading_service.grade
+
+    async def slow_grade(*args):
+        await release.wait()
+        return await grade(*args)
+
+    grading_service.grade = slow_grade
+
+    async def run():
+        sessions.start_workers()
+        try:
+            session = sessions.start_session(BankType.TEST_2008)
+            sessions.submit_answer(session.id, 1, "the Constitution")
+            pending = await sessions.get_results(session.id, timeout=0.01)
+            release.set()
+            return pending, await sessions.get_results(session.id)
+        finally:
+            await sessions.stop_workers()
+
+    pending, final = asyncio.run(run())
+    assert pending["complete"] is False
+    assert pending["passed"] is None
+    assert final["complete"] is True
+    assert final["correctCount"] == 1
+    assert final["passed"] is False  # 1 of 6 needed
+
+
+def test_65_plus_sessions_ask_10_of_the_20_marked_questions():
+    questions = [
+        Question(
+            id=i,
+            section="American Government" if i % 2 else "American History",
+            question=f"Question {i}?",
+            answers=(f"Answer {i}",),
+            is_required_for_65_plus=i <= 20,
+            is_dynamic_answer=False,
+            last_time_updated=None,
+            source_fingerprint=None,
+        )
+        for i in range(1, 41)
+    ]
+    questions_service = QuestionsService(llm_client=None)
+    questions_service.banks[BankType.TEST_2025] = QuestionBank.build(BankType.TEST_2025, questions)
+    grading_service = GradingService(questions_service, VerdictCache())
+    sessions = ExamSessionService(questions_service, grading_service, llm_client=None)
+
+    drawn = set()
+    for seed in range(5):
+        session = sessions.start_session(BankType.TEST_2025, for_65_plus=True, seed=seed)
+        assert len(session.questions) == 10
+        assert all(q.is_required_for_65_plus for q in session.questions)
+        assert session.pass_threshold == 6
+        drawn.add(frozenset(q.id for q in session.questions))
+    assert len(drawn) > 1
+
+    session = sessions.start_session(BankType.TEST_2025, seed=0)
+    assert len(session.questions) == 20
+    assert session.pass_threshold == 12
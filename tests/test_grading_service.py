@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import pytest
+
+import src.GradingService as grading_service_module
+from src.GradingService import GradingService
+from src.LLMClient import LLMTimeoutError
+from src.QuestionsService import Question, QuestionBank, QuestionsService
+from src.QuestionsService import TestType as BankType
+from src.VerdictCache import VerdictCache
+
+
+class FakeLLM:
+    """Answers batch calls for every item but the last, and single calls with "Correct"."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batch_calls = 0
+        self.single_calls = 0
+
+    async def completion(self, prompt, timeout=None, **kwargs):
+        self.batch_calls += 1
+        await asyncio.sleep(self.delay)
+        if self.delay >= timeout:
+            raise LLMTimeoutError("batch call timed out")
+        items = prompt.count("Item ")
+        return json.dumps([{"index": i, "verdict": "Incorrect"} for i in range(items - 1)])
+
+    async def completion_until(self, prompt, decide, timeout=None, **kwargs):
+        self.single_calls += 1
+        return decide("Correct", True)
+
+
+def make_service():
+    questions = [
+        Question(
+            id=i,
+            section="American History",
+            question=f"What are two rights in the Declaration of Independence? ({i})",
+            answers=("life", "liberty", "pursuit of happiness"),
+            is_required_for_65_plus=False,
+            is_dynamic_answer=False,
+            last_time_updated=None,
+            source_fingerprint=None,
+        )
+        for i in range(1, 5)
+    ]
+    questions_service = QuestionsService(llm_client=None)
+    questions_service.banks[BankType.TEST_2008] = QuestionBank.build(BankType.TEST_2008, questions)
+    return GradingService(questions_service, VerdictCache()), questions
+
+
+def test_grade_batch_packs_misses_and_grades_the_leftovers_alone():
+    service, questions = make_service()
+    service.verdict_cache.put(service._cache_key(BankType.TEST_2008, questions[0], "life"), True)
+    llm = FakeLLM()
+    items = [
+        (questions[0], "life"),
+        (questions[1], "life"),
+        (questions[2], "liberty and life"),  # settled locally
+        (questions[1], "Life."),
+        (questions[3], "life"),
+    ]
+
+    results = asyncio.run(service.grade_batch(BankType.TEST_2008, items, llm))
+
+    assert [(r.is_correct, r.graded_by) for r in results] == [
+        (True, "cache"),
+        (False, "llm"),
+        (True, "local"),
+        (False, "llm"),
+        (True, "llm"),
+    ]
+    assert (llm.batch_calls, llm.single_calls) == (1, 1)
+    stats = service.verdict_cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["coalesced"]) == (1, 2, 1)
+
+
+def test_grade_batch_shares_one_deadline_with_the_leftovers(monkeypatch):
+    monkeypatch.setattr(grading_service_module, "GRADING_BATCH_TIMEOUT_SECONDS", 0.05)
+    service, questions = make_service()
+    llm = FakeLLM(delay=0.05)
+    items = [(question, "life") for question in questions]
+
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(service.grade_batch(BankType.TEST_2008, items, llm))
+    # The timed-out pack is not followed by one call per item
+    assert (llm.batch_calls, llm.single_calls) == (1, 0)
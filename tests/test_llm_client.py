@@ -0,0 +1,215 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.LLMClient import (
+    AdmissionController,
+    BreakerState,
+    CircuitBreaker,
+    LLMClient,
+    LLMLane,
+    LLMOverloadedError,
+    LLMUnavailableError,
+    gather_or_cancel,
+    lane_circuit_breakers,
+)
+
+
+def test_gather_or_cancel_returns_results_in_order():
+    async def value(v, delay):
+        await asyncio.sleep(delay)
+        return v
+
+    assert asyncio.run(gather_or_cancel([value(1, 0.02), value(2, 0.0)])) == [1, 2]
+
+
+def test_gather_or_cancel_cancels_siblings_and_reraises():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("pack failed")
+
+    async def run():
+        with pytest.raises(ValueError, match="pack failed"):
+            await gather_or_cancel([slow(), failing(), slow()])
+
+    asyncio.run(run())
+    assert cancelled == [True, True]
+
+
+def test_admission_controller_caps_refresh_share_and_sheds_full_queue():
+    async def run():
+        admission = AdmissionController(max_in_flight=2, max_queue=1, refresh_max_in_flight=1)
+        assert admission.try_acquire(LLMLane.REFRESH)
+        assert not admission.try_acquire(LLMLane.REFRESH)
+        assert admission.try_acquire(LLMLane.GRADING)
+        assert not admission.try_acquire(LLMLane.GRADING)
+
+        queued = asyncio.ensure_future(admission._acquire(LLMLane.GRADING))
+        await asyncio.sleep(0)
+        with pytest.raises(LLMOverloadedError):
+            await admission._acquire(LLMLane.GRADING)
+        assert admission.get_stats()["shed"] == {"grading": 1, "refresh": 0}
+
+        admission.release(LLMLane.GRADING)
+        await queued
+        assert admission.in_flight == {LLMLane.GRADING: 1, LLMLane.REFRESH: 1}
+
+    asyncio.run(run())
+
+
+def test_admission_controller_wakes_grading_before_refresh():
+    async def run():
+        admission = AdmissionController(max_in_flight=1, max_queue=5, refresh_max_in_flight=1)
+        assert admission.try_acquire(LLMLane.GRADING)
+        order = []
+
+        async def wait(lane):
+            async with admission.slot(lane):
+                order.append(lane)
+
+        refresh = asyncio.ensure_future(wait(LLMLane.REFRESH))
+        await asyncio.sleep(0)
+        grading = asyncio.ensure_future(wait(LLMLane.GRADING))
+        await asyncio.sleep(0)
+        admission.release(LLMLane.GRADING)
+        await asyncio.gather(refresh, grading)
+        assert order == [LLMLane.GRADING, LLMLane.REFRESH]
+        assert admission.total_in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_circuit_breaker_opens_at_failure_rate_after_min_calls():
+    breaker = CircuitBreaker(window=10, min_calls=4, failure_rate=0.5, cooldown_seconds=60)
+    breaker.record_success()
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == BreakerState.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == BreakerState.OPEN
+    assert not breaker.allow()
+    assert breaker.get_stats()["rejected"] == 1
+
+
+def test_circuit_breaker_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(window=10, min_calls=1, failure_rate=0.5, cooldown_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == BreakerState.OPEN
+
+    assert breaker.allow()
+    assert breaker.state == BreakerState.HALF_OPEN
+    assert not breaker.allow()
+
+    # A shed probe says nothing about the LLM; the next call may probe again
+    breaker.record_neutral()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == BreakerState.OPEN
+    assert breaker.times_opened == 2
+
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.allow()
+
+
+def test_refresh_failures_do_not_open_the_grading_breaker():
+    breakers = {
+        lane: CircuitBreaker(window=10, min_calls=2, failure_rate=0.5, cooldown_seconds=60)
+        for lane in LLMLane
+    }
+    client = LLMClient(admission=AdmissionController(), breakers=breakers)
+
+    async def failing():
+        raise ValueError("refresh call failed")
+
+    async def ok():
+        return "ok"
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                await client._call(failing, "model", LLMLane.REFRESH, 1.0)
+        with pytest.raises(LLMUnavailableError):
+            await client._call(ok, "model", LLMLane.REFRESH, 1.0)
+        assert await client._call(ok, "model", LLMLane.GRADING, 1.0) == "ok"
+
+    asyncio.run(run())
+    assert breakers[LLMLane.REFRESH].state == BreakerState.OPEN
+    assert breakers[LLMLane.GRADING].state == BreakerState.CLOSED
+
+
+
+class FakeStream:
+    """An async stream of text chunks that records how far it was read."""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.read = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.read == len(self.texts):
+            raise StopAsyncIteration
+        self.read += 1
+        return SimpleNamespace(text=self.texts[self.read - 1], usage_metadata=None)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def _streaming_client(stream):
+    async def generate_content_stream(model, contents, config):
+        return stream
+
+    client = LLMClient(admission=AdmissionController(), breakers=lane_circuit_breakers())
+    client.client = SimpleNamespace(
+        aio=SimpleNamespace(models=SimpleNamespace(generate_content_stream=generate_content_stream))
+    )
+    return client
+
+
+def _first_word(text, finished):
+    words = text.split()
+    if len(words) > 1 or (words and finished):
+        return words[0]
+    return None
+
+
+def test_completion_until_stops_reading_once_decided():
+    stream = FakeStream(["Corr", "ect ", "because", " the", " answer", " matches"])
+    client = _streaming_client(stream)
+
+    assert asyncio.run(client.completion_until("prompt", _first_word)) == "Correct"
+    assert stream.read == 3
+    assert stream.closed
+
+
+def test_completion_until_decides_at_the_end_of_the_stream():
+    stream = FakeStream(["Incorrect"])
+    client = _streaming_client(stream)
+
+    assert asyncio.run(client.completion_until("prompt", _first_word)) == "Incorrect"
+    assert stream.closed
+
+
+def test_completion_until_fails_when_the_stream_settles_nothing():
+    client = _streaming_client(FakeStream([" ", "\n"]))
+
+    with pytest.raises(ValueError, match="settled nothing"):
+        asyncio.run(client.completion_until("prompt", _first_word))
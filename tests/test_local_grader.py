@@ -0,0 +1,149 @@
+import pytest
+
+from src.LocalGrader import (
+    STATE_CANDIDATES_MAX_TOKENS,
+    LocalVerdict,
+    StateAnswerIndex,
+    grade_locally,
+    normalize_tokens,
+    prepare_question,
+)
+
+
+def test_normalize_tokens_folds_case_accents_and_articles():
+    assert normalize_tokens("The Constitution") == ("constitution",)
+    assert normalize_tokens("José Martí") == ("jose", "marti")
+
+
+def test_normalize_tokens_turns_number_words_into_digits():
+    assert normalize_tokens("four hundred thirty-five") == ("435",)
+    assert normalize_tokens("twenty seven amendments") == ("27", "amendments")
+
+
+def test_normalize_tokens_keeps_dotted_abbreviations_whole():
+    assert normalize_tokens("Washington, D.C.") == ("washington", "dc")
+    assert normalize_tokens("Washington D.C") == ("washington", "dc")
+    assert normalize_tokens("the U.S. Senate") == ("us", "senate")
+    # Single initials are still separate (and optional when matching)
+    assert normalize_tokens("Donald J. Trump") == ("donald", "j", "trump")
+
+
+@pytest.fixture
+def men_voting():
+    return prepare_question(
+        "When did all men get the right to vote?",
+        ["After the Civil War", "During Reconstruction", "(With the) 15th Amendment", "1870"],
+    )
+
+
+@pytest.fixture
+def women_voting():
+    return prepare_question(
+        "When did all women get the right to vote?",
+        ["1920", "After World War I", "(With the) 19th Amendment"],
+    )
+
+
+@pytest.mark.parametrize("answer", ["15th Amendment", "with the 15th amendment", "1870"])
+def test_accepts_the_right_amendment(men_voting, answer):
+    assert grade_locally(men_voting, answer) == LocalVerdict.CORRECT
+
+
+@pytest.mark.parametrize("answer", ["14th Amendment", "19th amendment", "16th Amendment"])
+def test_ordinals_get_no_typo_tolerance(men_voting, answer):
+    assert grade_locally(men_voting, answer) != LocalVerdict.CORRECT
+
+
+@pytest.mark.parametrize("answer", ["15th amendment", "18th Amendment", "1921"])
+def test_other_amendments_are_not_the_19th(women_voting, answer):
+    assert grade_locally(women_voting, answer) != LocalVerdict.CORRECT
+
+
+def test_words_still_get_typo_tolerance(men_voting):
+    assert grade_locally(men_voting, "after the Civl War") == LocalVerdict.CORRECT
+
+
+def test_capital_needs_dc():
+    question = prepare_question("What is the capital of the United States?", ["Washington, D.C."])
+    assert grade_locally(question, "Washington DC") == LocalVerdict.CORRECT
+    assert grade_locally(question, "washington d.c.") == LocalVerdict.CORRECT
+    assert grade_locally(question, "Washington") != LocalVerdict.CORRECT
+
+
+def test_numeric_answers():
+    question = prepare_question("How many justices are on the Supreme Court?", ["nine (9)"])
+    assert grade_locally(question, "9") == LocalVerdict.CORRECT
+    assert grade_locally(question, "nine") == LocalVerdict.CORRECT
+    assert grade_locally(question, "8") == LocalVerdict.INCORRECT
+
+
+def test_lists_need_the_required_number_of_items():
+    question = prepare_question(
+        "What are two rights in the Declaration of Independence?",
+        ["life", "liberty", "pursuit of happiness"],
+    )
+    assert grade_locally(question, "life and liberty") == LocalVerdict.CORRECT
+    assert grade_locally(question, "life") == LocalVerdict.AMBIGUOUS
+
+
+@pytest.fixture
+def governors():
+    return StateAnswerIndex(
+        {
+            "Alabama": ["Kay Ivey"],
+            "California": ["Gavin Newsom"],
+            "Massachusetts": ["Maura Healey"],
+        }
+    )
+
+
+@pytest.mark.parametrize("answer", ["Gavin Newsom", "Gavn Newsom", "Gavin Newsommm"])
+def test_state_candidates_tolerate_typos(governors, answer):
+    assert [entry.value for entry in governors.candidates(answer, 5)] == ["Gavin Newsom"]
+
+
+def test_state_candidates_only_look_up_the_first_words(governors):
+    padding = " ".join(f"word{i}x" for i in range(STATE_CANDIDATES_MAX_TOKENS))
+    assert governors.candidates(f"{padding} Maura Healey", 5) == []
+    assert [entry.value for entry in governors.candidates(f"Maura Healey {padding}", 5)] == [
+        "Maura Healey"
+    ]
+
+
+@pytest.fixture
+def governor_question(governors):
+    return prepare_question(
+        "Who is the Governor of your state now?",
+        ["Answers will vary."],
+        governors.answers_by_state,
+    )
+
+
+@pytest.mark.parametrize("answer", ["Kay Ivey", "Kay Ivey, Alabama", "Gavin Newsom, California"])
+def test_state_answers_accept_a_name_with_its_state(governor_question, answer):
+    assert grade_locally(governor_question, answer) == LocalVerdict.CORRECT
+
+
+@pytest.mark.parametrize("answer", ["Kay Ivey, California", "Gavin Newsom from Alabama"])
+def test_state_answers_leave_a_name_with_another_state_to_the_llm(governor_question, answer):
+    assert grade_locally(governor_question, answer) == LocalVerdict.AMBIGUOUS
+
+
+def test_state_answers_leave_unlisted_answers_to_the_llm(governor_question):
+    # D.C. and the territories have no entry in the per-state listing
+    assert grade_locally(governor_question, "Muriel Bowser") == LocalVerdict.AMBIGUOUS
+
+
+def test_west_virginia_does_not_also_name_virginia():
+    index = StateAnswerIndex({"Virginia": ["Richmond"], "West Virginia": ["Charleston"]})
+    assert index.mentioned_states(normalize_tokens("Richmond, West Virginia")) == ["west virginia"]
+
+
+def test_state_capital_must_belong_to_the_named_state():
+    question = prepare_question(
+        "What is the capital of your state?",
+        ["Answers will vary."],
+        {"Alabama": ["Montgomery"], "California": ["Sacramento"]},
+    )
+    assert grade_locally(question, "Sacramento, California") == LocalVerdict.CORRECT
+    assert grade_locally(question, "Sacramento, Alabama") == LocalVerdict.AMBIGUOUS
@@ -0,0 +1,95 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from src.Dependencies import get_gemini_client, get_grading_service, get_questions_service
+from src.GradingService import GradingService
+from src.LLMClient import LLMLane, LLMOverloadedError
+from src.QuestionsService import Question, QuestionBank, QuestionsService
+from src.QuestionsService import TestType as BankType
+from src.VerdictCache import VerdictCache
+
+QUESTION = Question(
+    id=1,
+    section="American History",
+    question="What are two rights in the Declaration of Independence?",
+    answers=("life", "liberty", "pursuit of happiness"),
+    is_required_for_65_plus=False,
+    is_dynamic_answer=False,
+    last_time_updated=None,
+    source_fingerprint=None,
+)
+
+
+class FakeLLM:
+    def __init__(self, error=None):
+        self.error = error
+
+    async def completion_until(self, prompt, decide, **kwargs):
+        if self.error is not None:
+            raise self.error
+        return decide("Correct", True)
+
+
+@pytest.fixture
+def client():
+    questions_service = QuestionsService(llm_client=None)
+    questions_service.banks[BankType.TEST_2008] = QuestionBank.build(BankType.TEST_2008, [QUESTION])
+    grading_service = GradingService(questions_service, VerdictCache())
+    main.app.dependency_overrides.update(
+        {
+            get_questions_service: lambda: questions_service,
+            get_grading_service: lambda: grading_service,
+            get_gemini_client: FakeLLM,
+        }
+    )
+    # No lifespan: the banks above stand in for the ones loaded at startup
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+
+
+def _events(body):
+    return [
+        tuple(line.split(": ", 1)[1] for line in event.splitlines())
+        for event in body.strip().split("\n\n")
+    ]
+
+
+def test_answer_stream_sends_grading_then_the_verdict(client):
+    response = client.post("/api/submit-answer/1/stream", json={"answer": "life"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.headers["cache-control"] == "no-cache"
+    assert _events(response.text) == [
+        ("grading", '{"questionId": 1}'),
+        ("verdict", '{"result": "true", "gradedBy": "llm"}'),
+    ]
+
+
+def test_answer_stream_reports_shed_requests_as_an_error_event(client):
+    main.app.dependency_overrides[get_gemini_client] = lambda: FakeLLM(
+        LLMOverloadedError(LLMLane.GRADING, retry_after=3)
+    )
+
+    response = client.post("/api/submit-answer/1/stream", json={"answer": "life"})
+
+    assert response.status_code == 200
+    assert _events(response.text)[1] == (
+        "error",
+        '{"detail": "Answer grading is busy, please retry shortly", "retryAfter": 3}',
+    )
+
+
+def test_question_endpoints_serve_the_pre_encoded_bodies(client):
+    response = client.get("/api/questions/1")
+    assert response.json() == QUESTION.to_api_dict()
+    etag = response.headers["etag"]
+
+    not_modified = client.get("/api/questions/1", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    listing = client.get("/api/questions", params={"n": 1})
+    assert listing.json() == {"questions": [QUESTION.to_api_dict()]}
+    assert "etag" not in listing.headers
@@ -0,0 +1,146 @@
+import asyncio
+import re
+import shutil
+
+import httpx
+import pytest
+
+import src.AnswersToDynamicQuestions as dynamic
+from src.AnswersToDynamicQuestions import PageFetcher, ValidatorStore, extract_state_mapping
+from src.QuestionsService import DYNAMIC_QUESTION_MAP_2008, QuestionsService, TEST_CONFIGS
+from src.QuestionsService import TestType as BankType
+
+ADMINISTRATION_URL = "https://www.whitehouse.gov/administration/"
+
+
+class FakeSite:
+    """Serves one page with an ETag, answering 304 to a matching If-None-Match."""
+
+    def __init__(self) -> None:
+        self.version = 1
+        self.people = {"President": "Ada Lovelace", "Vice President": "Alan Turing"}
+        self.statuses = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        etag = f'"v{self.version}"'
+        if request.headers.get("if-none-match") == etag:
+            self.statuses.append(304)
+            return httpx.Response(304, headers={"ETag": etag})
+        self.statuses.append(200)
+        body = "".join(f"<p>{office}: {name}.</p>" for office, name in self.people.items())
+        return httpx.Response(200, headers={"ETag": etag}, text=f"<html><body>{body}</body></html>")
+
+
+class FakeLLM:
+    """Reads the asked-for office off the page text included in the prompt."""
+
+    async def completion(self, prompt: str, **kwargs) -> str:
+        office = "Vice President" if "current Vice President" in prompt else "President"
+        return re.search(rf"(?<!Vice ){office}: ([^.]+)\.", prompt).group(1)
+
+
+def _answer(service, fetcher_name):
+    question_id = next(
+        question_id
+        for question_id, func in DYNAMIC_QUESTION_MAP_2008.items()
+        if func.__name__ == fetcher_name
+    )
+    return service.get_question_by_id(BankType.TEST_2008, question_id).answers[0]
+
+
+def test_co_located_fetchers_keep_their_own_validators(tmp_path, monkeypatch):
+    (tmp_path / "db").mkdir()
+    for config in TEST_CONFIGS.values():
+        shutil.copy(config.questions_file, tmp_path / "db")
+    monkeypatch.chdir(tmp_path)
+
+    site = FakeSite()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(site.handler))
+    service = QuestionsService(
+        FakeLLM(),
+        page_fetcher_factory=lambda: PageFetcher(
+            client=client, validator_store=ValidatorStore("./db/http_validators.json")
+        ),
+    )
+    service.load_banks()
+
+    async def run():
+        try:
+            # Both fetchers read the page once, sharing the download
+            await service.update_dynamic_questions(fetchers=["get_president", "get_vice_president"])
+            assert site.statuses == [200]
+            assert _answer(service, "get_vice_president") == "Alan Turing"
+
+            site.version = 2
+            site.people["Vice President"] = "Grace Hopper"
+            # The president's run sees the new page first...
+            report = await service.update_dynamic_questions(fetchers=["get_president"])
+            assert report.extracted == 1
+            # ...which must not make the new page look unchanged to the vice president
+            report = await service.update_dynamic_questions(fetchers=["get_vice_president"])
+            assert report.extracted == 1 and report.not_modified == 0
+            assert _answer(service, "get_vice_president") == "Grace Hopper"
+
+            # Nothing changed since the vice president's own last read
+            report = await service.update_dynamic_questions(fetchers=["get_vice_president"])
+            assert report.not_modified == 1
+            assert site.statuses == [200, 200, 200, 304]
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+
+
+def test_validator_store_round_trip_drops_url_keyed_entries(tmp_path):
+    path = tmp_path / "http_validators.json"
+    path.write_text('{"https://example.com/": {"etag": "\\"old\\""}}')
+    store = ValidatorStore(str(path))
+    assert store.validators == {}
+    store.set("get_president", ADMINISTRATION_URL, {"etag": '"v1"'})
+    store.save()
+
+    assert [entry.name for entry in tmp_path.iterdir()] == ["http_validators.json"]
+    reloaded = ValidatorStore(str(path))
+    assert reloaded.conditional_headers("get_president", ADMINISTRATION_URL) == {"If-None-Match": '"v1"'}
+    assert reloaded.conditional_headers("get_vice_president", ADMINISTRATION_URL) == {}
+
+
+STATES_PAGE = "<html><body>" + "".join(
+    f"<p>{state}: Governor of {state}</p>" for state in ("Alabama", "Alaska", "Arizona", "Arkansas")
+) + "</body></html>"
+
+
+class ChunkLLM:
+    """Echoes the state lines of the page part in the prompt."""
+
+    async def completion(self, prompt: str, **kwargs) -> str:
+        return "\n".join(line for line in prompt.splitlines() if ": Governor of" in line)
+
+
+def _chunk_page(monkeypatch, max_page_chunks):
+    monkeypatch.setattr(dynamic, "MAX_PAGE_CHUNKS", max_page_chunks)
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, text=STATES_PAGE))
+    )
+
+    fetcher = PageFetcher(client=client, validator_store=ValidatorStore("unused.json"))
+
+    async def run():
+        async with client, fetcher:
+            chunks = await fetcher.fetch_page_chunks("https://example.com/", "governors", max_chars=30)
+            return chunks, await extract_state_mapping(ChunkLLM(), chunks, lambda text: text)
+
+    return asyncio.run(run())
+
+
+def test_every_chunk_of_a_long_page_is_extracted(monkeypatch):
+    chunks, mapping = _chunk_page(monkeypatch, max_page_chunks=4)
+    assert len(chunks) == 4
+    assert mapping.splitlines() == [
+        f"{state}: Governor of {state}" for state in ("Alabama", "Alaska", "Arizona", "Arkansas")
+    ]
+
+
+def test_pages_with_too_many_chunks_fail_instead_of_being_cut_short(monkeypatch):
+    with pytest.raises(ValueError, match="MAX_PAGE_CHUNKS"):
+        _chunk_page(monkeypatch, max_page_chunks=3)
@@ -0,0 +1,60 @@
+import json
+
+from collections import Counter
+
+from src.QuestionsService import Question, QuestionBank, QuestionsService
+from src.QuestionsService import TestType as BankType
+
+
+def _question(**overrides):
+    fields = dict(
+        id=1,
+        section="American Government",
+        question="Who is the Governor of your state now?",
+        answers=("Alabama: Kay Ivey",),
+        is_required_for_65_plus=False,
+        is_dynamic_answer=True,
+        last_time_updated="2026-01-10T12:00:00",
+        source_fingerprint="abc123",
+    )
+    fields.update(overrides)
+    return Question(**fields)
+
+
+def test_source_fingerprint_is_persisted_but_not_served():
+    question = _question()
+    assert question.to_dict()["sourceFingerprint"] == "abc123"
+    assert "source_fingerprint" not in question.to_api_dict()
+    assert "sourceFingerprint" not in question.to_api_dict()
+
+
+def test_encoded_bodies_leave_out_the_fingerprint():
+    bank = QuestionBank.build(BankType.TEST_2008, [_question()])
+    for body in (bank.encoded_questions[1], bank.encoded_dynamic_questions):
+        assert b"abc123" not in body.raw
+        assert json.loads(body.raw)
+
+
+def _service_with(questions):
+    service = QuestionsService(llm_client=None)
+    service.banks[BankType.TEST_2008] = QuestionBank.build(BankType.TEST_2008, questions)
+    return service
+
+
+def test_draw_exam_stratifies_the_65_plus_questions():
+    questions = [
+        _question(
+            id=i,
+            section="History" if i < 10 else "Civics",
+            is_required_for_65_plus=i in (0, 1, 10, 11, 12, 13),
+            is_dynamic_answer=False,
+        )
+        for i in range(20)
+    ]
+    service = _service_with(questions)
+    for seed in range(20):
+        drawn = service.draw_exam(BankType.TEST_2008, 3, seed=seed, stratified=True, for_65_plus=True)
+        assert all(q.is_required_for_65_plus for q in drawn)
+        assert Counter(q.section for q in drawn) == {"History": 1, "Civics": 2}
+        unstratified = service.draw_exam(BankType.TEST_2008, 6, seed=seed, for_65_plus=True)
+        assert {q.id for q in unstratified} == {0, 1, 10, 11, 12, 13}
@@ -0,0 +1,74 @@
+import asyncio
+
+from src.RateLimiter import RateLimitMiddleware, TokenBuckets, charge_request
+
+
+def _scope(peer, forwarded=None, method="POST", path="/api/submit-answer"):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded is not None else []
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "client": (peer, 12345),
+        "headers": headers,
+    }
+
+
+async def _ok(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _call(middleware, scope):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    asyncio.run(middleware(scope, receive, send))
+    return messages[0]
+
+
+def test_client_key_ignores_forwarded_for_without_trusted_proxies():
+    middleware = RateLimitMiddleware(_ok)
+    assert middleware.client_key(_scope("10.0.0.5", "203.0.113.7")) == "10.0.0.5"
+
+
+def test_client_key_takes_the_client_from_trusted_proxies():
+    middleware = RateLimitMiddleware(_ok, trusted_proxies="10.0.0.0/8")
+    # The rightmost address our proxies did not add; the spoofed leftmost one is ignored
+    scope = _scope("10.0.0.5", "198.51.100.1, 203.0.113.7, 10.0.0.9")
+    assert middleware.client_key(scope) == "203.0.113.7"
+    # An untrusted peer's header is not believed
+    assert middleware.client_key(_scope("192.0.2.1", "203.0.113.7")) == "192.0.2.1"
+    # Nothing but proxies in the chain: fall back to the peer
+    assert middleware.client_key(_scope("10.0.0.5", "10.0.0.9")) == "10.0.0.5"
+
+
+def test_over_the_limit_requests_get_429_with_retry_after():
+    middleware = RateLimitMiddleware(_ok, grading=TokenBuckets(per_minute=6, burst=2))
+    statuses = [_call(middleware, _scope("192.0.2.1"))["status"] for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    start = _call(middleware, _scope("192.0.2.1"))
+    assert start["status"] == 429
+    assert 1 <= int(dict(start["headers"])[b"retry-after"]) <= 10
+    # Other clients and unlimited routes are unaffected
+    assert _call(middleware, _scope("192.0.2.2"))["status"] == 200
+    assert _call(middleware, _scope("192.0.2.1", method="GET", path="/api/questions"))["status"] == 200
+
+
+def test_batches_are_charged_per_answer():
+    async def batch_of_five(scope, receive, send):
+        charge_request(scope, 4)
+        await _ok(scope, receive, send)
+
+    middleware = RateLimitMiddleware(
+        batch_of_five, grading=TokenBuckets(per_minute=60, burst=10)
+    )
+    assert _call(middleware, _scope("192.0.2.1", path="/api/submit-answers"))["status"] == 200
+    assert _call(middleware, _scope("192.0.2.1", path="/api/submit-answers"))["status"] == 200
+    # Ten tokens spent: the bucket is empty
+    assert _call(middleware, _scope("192.0.2.1", path="/api/submit-answers"))["status"] == 429
@@ -0,0 +1,27 @@
+import json
+import random
+
+from src.RefreshScheduler import RefreshScheduler
+
+
+def test_schedule_is_saved_atomically_and_reloaded(tmp_path):
+    state_file = tmp_path / "refresh_schedule.json"
+    state_file.write_text("{}")
+    state_file.chmod(0o640)
+    scheduler = RefreshScheduler(
+        default_ttl_days=30, ttl_days={}, jitter=0.0, state_file=str(state_file), rng=random.Random(1)
+    )
+    scheduler.load({"get_president": None}, now=1_000_000.0)
+    scheduler.record_run(scheduler.pop_due(1_000_000.0), succeeded=True, now=1_000_000.0)
+    scheduler.save()
+
+    # Written through a temporary file, which keeps the permissions of the one it replaces
+    assert [path.name for path in tmp_path.iterdir()] == ["refresh_schedule.json"]
+    assert state_file.stat().st_mode & 0o777 == 0o640
+    assert list(json.loads(state_file.read_text())["nextRun"]) == ["get_president"]
+
+    reloaded = RefreshScheduler(
+        default_ttl_days=30, ttl_days={}, jitter=0.0, state_file=str(state_file)
+    )
+    reloaded.load({"get_president": None}, now=1_000_000.0)
+    assert reloaded.seconds_until_next(1_000_000.0) == 14 * 24 * 60 * 60
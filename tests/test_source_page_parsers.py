@@ -0,0 +1,113 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.SourcePageParsers import (
+    MIN_STATES_RECOGNIZED,
+    US_STATES,
+    format_state_mapping,
+    merge_state_mappings,
+    parse_governors,
+    parse_representatives,
+    parse_senators,
+    parse_state_capitals,
+    parse_state_mapping_text,
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "source_pages")
+
+
+def load_page(name: str) -> BeautifulSoup:
+    with open(os.path.join(FIXTURES, name)) as file:
+        return BeautifulSoup(file.read(), "html.parser")
+
+
+def keep_states(soup: BeautifulSoup, count: int) -> BeautifulSoup:
+    """Drop everything about all but the first `count` states from a fixture page."""
+    kept = set(US_STATES[:count])
+    for table in soup.find_all("table"):
+        caption = table.find("caption")
+        if caption is not None:
+            # One table per state
+            if caption.get_text(strip=True) not in kept:
+                table.decompose()
+            continue
+        # One row per state, the state in the first cell
+        for row in table.find_all("tr"):
+            cell = row.find("td")
+            if cell is not None and cell.get_text(strip=True) not in kept:
+                row.decompose()
+    for heading in soup.find_all("h3"):
+        if heading.get_text(strip=True) not in kept:
+            listing = heading.find_next_sibling("ul")
+            if listing is not None:
+                listing.decompose()
+            heading.decompose()
+    return soup
+
+
+def test_governors():
+    mapping = parse_governors(load_page("governors.html"))
+    assert mapping is not None
+    assert all(mapping.get(state) for state in US_STATES)
+    assert mapping["Alabama"] == ["Kay Ivey"]
+    # Footnote markers are dropped
+    assert all("[" not in name for names in mapping.values() for name in names)
+
+
+def test_state_capitals_ignore_the_capital_since_column():
+    mapping = parse_state_capitals(load_page("state_capitals.html"))
+    assert mapping is not None
+    assert mapping["California"] == ["Sacramento"]
+    assert mapping["Arkansas"] == ["Little Rock"]
+
+
+def test_senators_from_a_per_state_listing():
+    mapping = parse_senators(load_page("senators.html"))
+    assert mapping is not None
+    assert all(len(mapping[state]) == 2 for state in US_STATES)
+    # Party markers are stripped
+    assert mapping["Alaska"] == ["Lisa Murkowski", "Dan Sullivan"]
+
+
+def test_representatives_from_captioned_tables():
+    mapping = parse_representatives(load_page("representatives.html"))
+    assert mapping is not None
+    assert mapping["Alabama"][:2] == ["Barry Moore (1st)", "Shomari Figures (2nd)"]
+    assert sum(len(names) for names in mapping.values()) >= 435
+
+
+@pytest.mark.parametrize(
+    "page, parser",
+    [
+        ("governors.html", parse_governors),
+        ("state_capitals.html", parse_state_capitals),
+        ("senators.html", parse_senators),
+        ("representatives.html", parse_representatives),
+    ],
+)
+def test_pages_with_too_few_states_are_rejected(page, parser):
+    assert parser(keep_states(load_page(page), MIN_STATES_RECOGNIZED)) is not None
+    assert parser(keep_states(load_page(page), MIN_STATES_RECOGNIZED - 1)) is None
+
+
+def test_unrelated_page_is_rejected():
+    soup = BeautifulSoup("<html><body><p>Page not found</p></body></html>", "html.parser")
+    assert parse_governors(soup) is None
+    assert parse_senators(soup) is None
+    assert parse_representatives(soup) is None
+
+
+def test_mapping_text_round_trip():
+    mapping = parse_senators(load_page("senators.html"))
+    assert mapping is not None
+    assert parse_state_mapping_text(format_state_mapping(mapping, bracketed=True)) == mapping
+
+
+def test_merge_state_mappings_dedupes_in_state_order():
+    merged = merge_state_mappings(
+        [{"Texas": ["A"], "Alabama": ["B"]}, {"Alabama": ["B", "C"], "Guam": ["D"]}]
+    )
+    assert list(merged) == ["Alabama", "Texas", "Guam"]
+    assert merged["Alabama"] == ["B", "C"]
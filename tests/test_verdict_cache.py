@@ -0,0 +1,207 @@
+import asyncio
+
+import pytest
+
+import src.VerdictCache as verdict_cache_module
+from src.VerdictCache import VerdictCache, normalize_answer
+
+KEY = ("2008", 1, "george washington", 0)
+
+
+class SlowVerdict:
+    """A compute function that blocks until released, counting its calls."""
+
+    def __init__(self, verdict=True):
+        self.verdict = verdict
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return self.verdict
+
+
+def test_normalize_answer_ignores_case_spacing_and_edge_punctuation():
+    assert normalize_answer("  George   Washington. ") == normalize_answer("george washington")
+
+
+def test_concurrent_misses_share_one_computation():
+    async def run():
+        cache = VerdictCache()
+        compute = SlowVerdict()
+        leader = asyncio.ensure_future(cache.get_or_compute(KEY, compute))
+        follower = asyncio.ensure_future(cache.get_or_compute(KEY, compute))
+        await asyncio.sleep(0)
+        compute.release.set()
+        results = [await leader, await follower]
+        assert compute.calls == 1
+        assert results == [(True, "miss"), (True, "coalesced")]
+        assert await cache.get_or_compute(KEY, compute) == (True, "hit")
+
+    asyncio.run(run())
+
+
+def test_a_cancelled_leader_does_not_cancel_its_followers():
+    async def run():
+        cache = VerdictCache()
+        compute = SlowVerdict()
+        leader = asyncio.ensure_future(cache.get_or_compute(KEY, compute))
+        follower = asyncio.ensure_future(cache.get_or_compute(KEY, compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        compute.release.set()
+        assert await follower == (True, "coalesced")
+        assert leader.cancelled()
+        assert not compute.cancelled
+        assert cache.get(KEY) is True
+
+    asyncio.run(run())
+
+
+def test_the_computation_is_cancelled_once_nobody_waits():
+    async def run():
+        cache = VerdictCache()
+        compute = SlowVerdict()
+        waiters = [asyncio.ensure_future(cache.get_or_compute(KEY, compute)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert compute.cancelled
+        assert cache.get_stats()["inFlight"] == 0
+
+    asyncio.run(run())
+
+
+def test_batch_lookups_count_and_coalesce_like_single_ones():
+    hit, pending, packed, unpacked = (("2008", question, "x", 0) for question in range(4))
+    packed_keys = []
+
+    async def compute_many(missed):
+        packed_keys.append(missed)
+        # The batch call settles only one of its keys
+        return {packed: True}
+
+    async def compute_one(key):
+        assert key == unpacked
+        return False
+
+    async def run():
+        cache = VerdictCache()
+        cache.put(hit, True)
+        slow = SlowVerdict(verdict=False)
+        single = asyncio.ensure_future(cache.get_or_compute(pending, slow))
+        await asyncio.sleep(0)
+        batch = asyncio.ensure_future(
+            cache.get_or_compute_many(
+                [hit, pending, packed, unpacked, packed], compute_many, compute_one
+            )
+        )
+        await asyncio.sleep(0)
+        slow.release.set()
+        assert await batch == [
+            (True, "hit"),
+            (False, "coalesced"),
+            (True, "miss"),
+            (False, "miss"),
+            (True, "miss"),
+        ]
+        assert await single == (False, "miss")
+        assert slow.calls == 1
+        assert packed_keys == [[packed, unpacked]]
+        assert cache.get(unpacked) is False
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["coalesced"]) == (1, 3, 2)
+
+    asyncio.run(run())
+
+
+def test_a_cancelled_batch_lookup_cancels_its_batch_call():
+    keys = [("2008", question, "x", 0) for question in range(3)]
+    batch_call = SlowVerdict()
+
+    async def compute_many(missed):
+        await batch_call()
+        return {}
+
+    async def run():
+        cache = VerdictCache()
+        lookup = asyncio.ensure_future(
+            cache.get_or_compute_many(keys, compute_many, SlowVerdict())
+        )
+        await asyncio.sleep(0.01)
+        lookup.cancel()
+        await asyncio.gather(lookup, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert batch_call.cancelled
+        assert cache.get_stats()["inFlight"] == 0
+
+    asyncio.run(run())
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    async def failing():
+        await asyncio.sleep(0)
+        raise RuntimeError("LLM down")
+
+    async def run():
+        cache = VerdictCache()
+        results = await asyncio.gather(
+            cache.get_or_compute(KEY, failing),
+            cache.get_or_compute(KEY, failing),
+            return_exceptions=True,
+        )
+        assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+        assert cache.get(KEY) is None
+
+    asyncio.run(run())
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(verdict_cache_module.time, "monotonic", lambda: now[0])
+    cache = VerdictCache(ttl_seconds=60)
+    cache.put(KEY, False)
+    now[0] += 59
+    assert cache.get(KEY) is False
+    now[0] += 1
+    assert cache.get(KEY) is None
+    assert cache.stats.expirations == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = VerdictCache(max_entries=2)
+    first, second, third = (("2008", i, "answer", 0) for i in range(3))
+    cache.put(first, True)
+    cache.put(second, True)
+    cache.get(first)
+    cache.put(third, True)
+    assert cache.get(second) is None
+    assert cache.get(first) is True and cache.get(third) is True
+
+
+def test_invalidate_question_drops_only_that_question():
+    cache = VerdictCache()
+    cache.put(("2008", 1, "a", 0), True)
+    cache.put(("2008", 1, "b", 0), False)
+    cache.put(("2008", 2, "a", 0), True)
+    cache.put(("2025", 1, "a", 0), True)
+    cache.invalidate_question("2008", 1)
+    assert len(cache) == 2
+    assert cache.stats.invalidations == 2
+    assert cache.get(("2008", 2, "a", 0)) is True
+
+
+@pytest.mark.parametrize("max_entries", [0, -1])
+def test_a_zero_size_cache_stores_nothing(max_entries):
+    cache = VerdictCache(max_entries=max_entries)
+    cache.put(KEY, True)
+    assert cache.get(KEY) is None